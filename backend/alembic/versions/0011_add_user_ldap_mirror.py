@@ -0,0 +1,25 @@
+"""add ldap mirror columns to users
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("users", sa.Column("ldap_dn", sa.String(length=512), nullable=True))
+    op.add_column("users", sa.Column("ldap_removed_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("users", "ldap_removed_at")
+    op.drop_column("users", "ldap_dn")
@@ -0,0 +1,31 @@
+"""add settings version
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "ovh_settings",
+        sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+    )
+    op.add_column(
+        "ldap_settings",
+        sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("ldap_settings", "version")
+    op.drop_column("ovh_settings", "version")
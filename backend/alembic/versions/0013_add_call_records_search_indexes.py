@@ -0,0 +1,77 @@
+"""add call records dashboard index and digit columns
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0013"
+down_revision = "0012"
+branch_labels = None
+depends_on = None
+
+PHONE_SEPARATORS = ("+", " ", ".", "-", "(", ")", "/")
+
+
+def digits_of(column: str, dialect: str) -> str:
+    """Same expression as app.models.digits_of."""
+    if dialect == "postgresql":
+        return f"regexp_replace({column}, '\\D', '', 'g')"
+    sql = column
+    for separator in PHONE_SEPARATORS:
+        sql = f"replace({sql}, '{separator}', '')"
+    return sql
+
+
+def upgrade() -> None:
+    # Leads with started_at, so it replaces the single-column index; the
+    # dashboard aggregates read only these columns and skip the table.
+    op.create_index(
+        "ix_call_records_started_at_is_missed",
+        "call_records",
+        ["started_at", "is_missed"],
+        postgresql_include=["direction", "duration"],
+    )
+    op.drop_index("ix_call_records_started_at", table_name="call_records")
+
+    # The number search compared regexp_replace() of both numbers against
+    # every pattern, for every row; keep the digits next to the numbers.
+    bind = op.get_bind()
+    for column in ("calling_number", "called_number"):
+        op.add_column(
+            "call_records",
+            sa.Column(
+                column.replace("_number", "_digits"),
+                sa.String(length=64),
+                sa.Computed(digits_of(column, bind.dialect.name), persisted=True),
+            ),
+        )
+
+    # Substring searches can use trigram indexes where the server ships
+    # pg_trgm (the postgres image does); without it they scan the digits.
+    has_trigrams = bind.dialect.name == "postgresql" and bind.execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ).first()
+    if has_trigrams:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for column in ("calling_digits", "called_digits"):
+            op.create_index(
+                f"ix_call_records_{column}_trgm",
+                "call_records",
+                [column],
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+            )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_call_records_called_digits_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_call_records_calling_digits_trgm")
+    op.drop_column("call_records", "called_digits")
+    op.drop_column("call_records", "calling_digits")
+    op.create_index("ix_call_records_started_at", "call_records", ["started_at"])
+    op.drop_index("ix_call_records_started_at_is_missed", table_name="call_records")
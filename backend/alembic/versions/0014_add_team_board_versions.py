@@ -0,0 +1,52 @@
+"""add team board versions
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0014"
+down_revision = "0013"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    for table in ("team_leads", "team_lead_categories"):
+        op.add_column(
+            table,
+            sa.Column("version", sa.Integer(), nullable=False, server_default="0"),
+        )
+        op.alter_column(table, "version", server_default=None)
+        op.create_index(f"ix_{table}_version", table, ["version"])
+    board = op.create_table(
+        "team_board",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("pruned_version", sa.Integer(), nullable=False),
+    )
+    op.bulk_insert(board, [{"id": 1, "version": 0, "pruned_version": 0}])
+    op.create_table(
+        "team_board_deletions",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("kind", sa.String(length=16), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        "ix_team_board_deletions_version", "team_board_deletions", ["version"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_team_board_deletions_version", table_name="team_board_deletions")
+    op.drop_table("team_board_deletions")
+    op.drop_table("team_board")
+    for table in ("team_lead_categories", "team_leads"):
+        op.drop_index(f"ix_{table}_version", table_name=table)
+        op.drop_column(table, "version")
@@ -1,3 +1,10 @@
+import asyncio
+import random
+import secrets
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
@@ -5,30 +12,70 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from passlib.hash import argon2
+import orjson
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.config import settings
-from app.database import get_db
-from app.models import User, Role
+from app.database import detached_copy, get_async_db, get_db
+from app.events import INTERNAL_TOPIC
+from app.models import RefreshToken, User, Role
+from app.schemas import TokenResponse
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+REFRESH_TOKEN_TYPE = "refresh"
+# A rotated refresh token stays usable briefly, for tabs refreshing at once.
+REFRESH_TOKEN_REUSE_GRACE = timedelta(seconds=30)
+
+
+def argon2_params() -> dict:
+    params = {
+        "rounds": settings.argon2_time_cost,
+        "memory_cost": settings.argon2_memory_cost,
+        "parallelism": settings.argon2_parallelism,
+    }
+    return {name: value for name, value in params.items() if value is not None}
+
 
 class AuthService:
+    def __init__(self) -> None:
+        self.hasher = argon2.using(type="ID", **argon2_params())
+
     def hash_password(self, password: str) -> str:
-        return argon2.using(type="ID").hash(password)
+        return self.hasher.hash(password)
 
     def verify_password(self, password: str, password_hash: str) -> bool:
         return argon2.verify(password, password_hash)
 
-    def create_access_token(self, subject: str, role: str) -> str:
-        expire = datetime.now(timezone.utc) + timedelta(
-            minutes=settings.access_token_expire_minutes
+    def needs_rehash(self, password_hash: str) -> bool:
+        return self.hasher.needs_update(password_hash)
+
+    def jittered_expiry(self, lifetime: timedelta) -> datetime:
+        """Shorten ``lifetime`` randomly so tokens issued together do not expire together."""
+        jitter = random.uniform(0, settings.token_expiry_jitter_ratio)
+        return datetime.now(timezone.utc) + lifetime * (1 - jitter)
+
+    def create_access_token(
+        self, subject: str, role: str, expire: Optional[datetime] = None
+    ) -> str:
+        expire = expire or self.jittered_expiry(
+            timedelta(minutes=settings.access_token_expire_minutes)
         )
         to_encode = {"sub": subject, "role": role, "exp": int(expire.timestamp())}
         return jwt.encode(to_encode, settings.jwt_secret, algorithm=settings.jwt_algorithm)
 
+    def create_refresh_token(self, subject: str, jti: str, expire: datetime) -> str:
+        to_encode = {
+            "sub": subject,
+            "type": REFRESH_TOKEN_TYPE,
+            "jti": jti,
+            "exp": int(expire.timestamp()),
+        }
+        return jwt.encode(to_encode, settings.jwt_secret, algorithm=settings.jwt_algorithm)
+
     def decode_token(self, token: str) -> dict:
         return jwt.decode(
             token,
@@ -37,21 +84,300 @@ class AuthService:
             options={"verify_exp": True},
         )
 
+    def decode_access_token(self, token: str) -> dict:
+        payload = self.decode_token(token)
+        if payload.get("type") == REFRESH_TOKEN_TYPE:
+            raise JWTError("Refresh tokens cannot be used as access tokens")
+        return payload
+
 
 auth_service = AuthService()
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
-) -> User:
+class PasswordHasherBusy(Exception):
+    pass
+
+
+class PasswordHasher:
+    """Argon2 on its own bounded thread pool, away from the request threadpool.
+
+    argon2-cffi releases the GIL, so threads run hashes in parallel. Callers
+    wait at most ``queue_timeout`` seconds for a slot before getting
+    PasswordHasherBusy.
+    """
+
+    def __init__(self, workers: int, queue_timeout: float) -> None:
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="argon2")
+        self._slots = asyncio.Semaphore(workers)
+
+    async def _run(self, func, *args):
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await self._slots.acquire()
+        except TimeoutError as exc:
+            raise PasswordHasherBusy() from exc
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self._slots.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(auth_service.hash_password, password)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._run(auth_service.verify_password, password, password_hash)
+
+
+password_hasher = PasswordHasher(
+    settings.password_hash_workers, settings.password_hash_queue_timeout_seconds
+)
+
+
+LOGIN_THROTTLE_MAX_KEYS = 10000
+
+
+class LoginThrottle:
+    """Sliding-window count of failed logins per username and per client IP."""
+
+    def __init__(
+        self, max_user_failures: int, max_ip_failures: int, window_seconds: float
+    ) -> None:
+        self.max_user_failures = max_user_failures
+        self.max_ip_failures = max_ip_failures
+        self.window_seconds = window_seconds
+        self._failures: dict[str, deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def _recent(self, key: str, now: float) -> deque[float]:
+        failures = self._failures.get(key)
+        if failures is None:
+            return deque()
+        while failures and failures[0] <= now - self.window_seconds:
+            failures.popleft()
+        if not failures:
+            self._failures.pop(key, None)
+        return failures
+
+    def _limits(self, username: str, ip: Optional[str]) -> list[tuple[str, int]]:
+        limits = [(f"user:{username.lower()}", self.max_user_failures)]
+        if ip:
+            limits.append((f"ip:{ip}", self.max_ip_failures))
+        return limits
+
+    def retry_after(self, username: str, ip: Optional[str]) -> int:
+        """Return the seconds to wait before another attempt, 0 if allowed."""
+        now = time.monotonic()
+        wait = 0.0
+        with self._lock:
+            for key, limit in self._limits(username, ip):
+                failures = self._recent(key, now)
+                if len(failures) >= limit:
+                    wait = max(wait, failures[0] + self.window_seconds - now)
+        return int(wait) + 1 if wait else 0
+
+    def record_failure(self, username: str, ip: Optional[str]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if len(self._failures) > LOGIN_THROTTLE_MAX_KEYS:
+                for key in list(self._failures):
+                    self._recent(key, now)
+            for key, _ in self._limits(username, ip):
+                self._failures.setdefault(key, deque()).append(now)
+
+    def reset(self, username: str) -> None:
+        with self._lock:
+            self._failures.pop(f"user:{username.lower()}", None)
+
+
+login_throttle = LoginThrottle(
+    settings.login_max_failures_per_user,
+    settings.login_max_failures_per_ip,
+    settings.login_failure_window_seconds,
+)
+
+USER_CHANGED = "user_changed"
+
+
+class UserCache:
+    """Decoded tokens and short-lived user rows, so requests skip the users query.
+
+    Entries are dropped on user changes, including those made by other
+    processes, which arrive as ``user_changed`` events.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._tokens: dict[str, dict] = {}
+        self._users: dict[str, tuple[float, User]] = {}
+        self._lock = threading.Lock()
+
+    def decode_token(self, token: str) -> dict:
+        payload = self._tokens.get(token)
+        if payload is not None and payload.get("exp", 0) > time.time():
+            return payload
+        payload = auth_service.decode_access_token(token)
+        with self._lock:
+            if len(self._tokens) >= self.max_entries:
+                self._tokens.pop(next(iter(self._tokens)))
+            self._tokens[token] = payload
+        return payload
+
+    def _cached_user(self, username: str) -> Optional[User]:
+        cached = self._users.get(username)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        return None
+
+    def _store_user(self, username: str, user: Optional[User]) -> Optional[User]:
+        if not user:
+            return None
+        user = detached_copy(user)
+        with self._lock:
+            if len(self._users) >= self.max_entries:
+                self._users.pop(next(iter(self._users)))
+            self._users[username] = (time.monotonic() + self.ttl_seconds, user)
+        return user
+
+    def get_user(self, db: Session, username: str) -> Optional[User]:
+        user = self._cached_user(username)
+        if user is None:
+            user = db.query(User).filter(User.username == username).first()
+            user = self._store_user(username, user)
+        return user
+
+    async def get_user_async(self, db: AsyncSession, username: str) -> Optional[User]:
+        user = self._cached_user(username)
+        if user is None:
+            result = await db.execute(select(User).where(User.username == username))
+            user = self._store_user(username, result.scalars().first())
+        return user
+
+    def invalidate(self, username: Optional[str] = None) -> None:
+        with self._lock:
+            if username is None:
+                self._users.clear()
+            else:
+                self._users.pop(username, None)
+
+    def on_event(self, topics: frozenset[str], message: str) -> None:
+        if INTERNAL_TOPIC not in topics:
+            return
+        event = orjson.loads(message)
+        if event.get("type") == USER_CHANGED:
+            self.invalidate((event.get("payload") or {}).get("username"))
+
+
+user_cache = UserCache(settings.user_cache_ttl_seconds)
+
+
+def user_changed_event(username: str) -> dict:
+    return {"type": USER_CHANGED, "payload": {"username": username}}
+
+
+def issue_tokens(db: Session, username: str, role: Role) -> TokenResponse:
+    """Create an access token and a stored refresh token for ``username``."""
+    now = datetime.utcnow()
+    db.query(RefreshToken).filter(RefreshToken.expires_at < now).delete()
+    access_expire = auth_service.jittered_expiry(
+        timedelta(minutes=settings.access_token_expire_minutes)
+    )
+    refresh_expire = auth_service.jittered_expiry(
+        timedelta(hours=settings.refresh_token_expire_hours)
+    )
+    jti = secrets.token_urlsafe(32)
+    db.add(
+        RefreshToken(
+            jti=jti,
+            username=username,
+            expires_at=refresh_expire.astimezone(timezone.utc).replace(tzinfo=None),
+        )
+    )
+    db.commit()
+    return TokenResponse(
+        access_token=auth_service.create_access_token(username, role.value, access_expire),
+        refresh_token=auth_service.create_refresh_token(username, jti, refresh_expire),
+        expires_in=int((access_expire - datetime.now(timezone.utc)).total_seconds()),
+    )
+
+
+def refresh_tokens(db: Session, token: str) -> TokenResponse:
+    """Rotate a refresh token without checking the password again.
+
+    Presenting a token rotated more than REFRESH_TOKEN_REUSE_GRACE ago means it
+    was copied, so every refresh token of that user is revoked.
+    """
+    invalid = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    try:
+        payload = auth_service.decode_token(token)
+    except JWTError as exc:
+        raise invalid from exc
+    if payload.get("type") != REFRESH_TOKEN_TYPE:
+        raise invalid
+    row = db.get(RefreshToken, payload.get("jti"))
+    if not row or row.username != payload.get("sub"):
+        raise invalid
+    now = datetime.utcnow()
+    if row.revoked_at:
+        if now - row.revoked_at > REFRESH_TOKEN_REUSE_GRACE:
+            revoke_refresh_tokens(db, row.username)
+            raise invalid
+    else:
+        row.revoked_at = now
+    user = user_cache.get_user(db, row.username)
+    if not user:
+        db.commit()
+        raise invalid
+    return issue_tokens(db, user.username, user.role)
+
+
+def revoke_refresh_token(db: Session, token: str) -> None:
     try:
         payload = auth_service.decode_token(token)
+    except JWTError:
+        return
+    if payload.get("type") != REFRESH_TOKEN_TYPE:
+        return
+    db.query(RefreshToken).filter(
+        RefreshToken.jti == payload.get("jti"), RefreshToken.revoked_at.is_(None)
+    ).update({RefreshToken.revoked_at: datetime.utcnow()})
+    db.commit()
+
+
+def revoke_refresh_tokens(db: Session, username: str) -> None:
+    # Deleted rather than marked revoked: the reuse grace must not apply to
+    # them, and presenting one later must not look like a copied token and
+    # revoke the tokens issued afterwards.
+    db.query(RefreshToken).filter(RefreshToken.username == username).delete()
+    db.commit()
+
+
+def token_username(token: str) -> str:
+    try:
+        payload = user_cache.decode_token(token)
     except JWTError as exc:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token") from exc
     username = payload.get("sub")
     if not username:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    user = db.query(User).filter(User.username == username).first()
+    return username
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+) -> User:
+    user = user_cache.get_user(db, token_username(token))
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    return user
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """get_current_user for async routes, which must not hold a threadpool slot."""
+    user = await user_cache.get_user_async(db, token_username(token))
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     return user
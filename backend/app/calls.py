@@ -0,0 +1,239 @@
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import Select, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import CallDirection, CallRecord, TeamLead
+from app.schemas import CallRecordOut, DashboardSummary, HourlyPoint, TimeseriesPoint
+
+
+def build_number_search_patterns(value: str) -> List[str]:
+    digits = "".join(char for char in value if char.isdigit())
+    if not digits:
+        return []
+    patterns = {digits}
+    trimmed = digits.lstrip("0")
+    if trimmed:
+        patterns.add(trimmed)
+        patterns.add(f"33{trimmed}")
+        patterns.add(f"0033{trimmed}")
+    if digits.startswith("33") and not digits.startswith("0033") and len(digits) > 2:
+        rest = digits[2:]
+        patterns.add(f"0{rest}")
+        patterns.add(f"0033{rest}")
+    if digits.startswith("0033") and len(digits) > 4:
+        rest = digits[4:]
+        patterns.add(f"0{rest}")
+        patterns.add(f"33{rest}")
+    return sorted(patterns, key=len, reverse=True)
+
+
+def minimal_search_patterns(patterns: List[str]) -> List[str]:
+    """Drop the patterns that contain another one, which a substring search already finds."""
+    return [
+        pattern
+        for pattern in patterns
+        if not any(other != pattern and other in pattern for other in patterns)
+    ]
+
+
+def build_number_variants(value: Optional[str]) -> List[str]:
+    if not value:
+        return []
+    digits = "".join(char for char in value if char.isdigit())
+    if not digits:
+        return []
+    variants = set(build_number_search_patterns(digits))
+    variants.add(digits)
+    return sorted(variants, key=len, reverse=True)
+
+
+def build_team_lead_index(leads: List[TeamLead]) -> dict:
+    index: dict[str, TeamLead] = {}
+    for lead in leads:
+        for variant in build_number_variants(lead.phone):
+            index.setdefault(variant, lead)
+    return index
+
+
+def match_team_lead(number: Optional[str], index: dict) -> Optional[TeamLead]:
+    for variant in build_number_variants(number):
+        lead = index.get(variant)
+        if lead:
+            return lead
+    return None
+
+
+def calls_query(
+    direction: Optional[CallDirection] = None,
+    missed: Optional[bool] = None,
+    number: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> Select:
+    """The filtered, newest-first call list behind GET /calls and its CSV export."""
+    query = select(CallRecord)
+    if direction:
+        query = query.where(CallRecord.direction == direction)
+    if missed is not None:
+        query = query.where(CallRecord.is_missed == missed)
+    if number:
+        patterns = minimal_search_patterns(build_number_search_patterns(number))
+        if patterns:
+            conditions = []
+            for pattern in patterns:
+                conditions.append(CallRecord.calling_digits.like(f"%{pattern}%"))
+                conditions.append(CallRecord.called_digits.like(f"%{pattern}%"))
+            query = query.where(or_(*conditions))
+        else:
+            query = query.where(
+                (CallRecord.calling_number.ilike(f"%{number}%"))
+                | (CallRecord.called_number.ilike(f"%{number}%"))
+            )
+    if start:
+        query = query.where(CallRecord.started_at >= start)
+    if end:
+        query = query.where(CallRecord.started_at <= end)
+    return query.order_by(CallRecord.started_at.desc())
+
+
+def enrich_with_leads(items: List[CallRecord], leads: List[TeamLead]) -> List[CallRecordOut]:
+    lead_index = build_team_lead_index(leads)
+    enriched_calls = []
+    for item in items:
+        calling_lead = match_team_lead(item.calling_number, lead_index)
+        called_lead = match_team_lead(item.called_number, lead_index)
+        payload = CallRecordOut.model_validate(item).model_dump()
+        if calling_lead:
+            payload.update(
+                {
+                    "calling_team_name": calling_lead.team_name,
+                    "calling_leader_first_name": calling_lead.leader_first_name,
+                }
+            )
+        if called_lead:
+            payload.update(
+                {
+                    "called_team_name": called_lead.team_name,
+                    "called_leader_first_name": called_lead.leader_first_name,
+                }
+            )
+        enriched_calls.append(CallRecordOut(**payload))
+    return enriched_calls
+
+
+def enrich_calls(db: Session, items: List[CallRecord]) -> List[CallRecordOut]:
+    if not items:
+        return []
+    return enrich_with_leads(items, db.query(TeamLead).all())
+
+
+async def enrich_calls_async(db: AsyncSession, items: List[CallRecord]) -> List[CallRecordOut]:
+    if not items:
+        return []
+    leads = (await db.execute(select(TeamLead))).scalars().all()
+    return enrich_with_leads(items, list(leads))
+
+
+def dashboard_summary_statement() -> Select:
+    """All summary figures in one pass over the last seven days of calls."""
+    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    week_start = datetime.utcnow() - timedelta(days=7)
+    today = CallRecord.started_at >= today_start
+    missed = CallRecord.is_missed.is_(True)
+    inbound = CallRecord.direction == CallDirection.INBOUND
+    outbound = CallRecord.direction == CallDirection.OUTBOUND
+    return select(
+        func.count().filter(today).label("today_total"),
+        func.count().filter(today, missed).label("today_missed"),
+        func.count().label("week_total"),
+        func.count().filter(missed).label("week_missed"),
+        func.count().filter(today, inbound).label("today_inbound"),
+        func.count().filter(today, outbound).label("today_outbound"),
+        func.count().filter(inbound).label("week_inbound"),
+        func.count().filter(outbound).label("week_outbound"),
+        func.avg(CallRecord.duration).filter(today).label("today_avg_duration"),
+        func.avg(CallRecord.duration).label("week_avg_duration"),
+    ).where(CallRecord.started_at >= week_start)
+
+
+def dashboard_summary_from_row(row) -> DashboardSummary:
+    return DashboardSummary(
+        today_total=row.today_total or 0,
+        today_missed=row.today_missed or 0,
+        week_total=row.week_total or 0,
+        week_missed=row.week_missed or 0,
+        today_inbound=row.today_inbound or 0,
+        today_outbound=row.today_outbound or 0,
+        week_inbound=row.week_inbound or 0,
+        week_outbound=row.week_outbound or 0,
+        today_avg_duration=int(round(row.today_avg_duration or 0)),
+        week_avg_duration=int(round(row.week_avg_duration or 0)),
+    )
+
+
+def compute_dashboard_summary(db: Session) -> DashboardSummary:
+    return dashboard_summary_from_row(db.execute(dashboard_summary_statement()).one())
+
+
+async def compute_dashboard_summary_async(db: AsyncSession) -> DashboardSummary:
+    return dashboard_summary_from_row((await db.execute(dashboard_summary_statement())).one())
+
+
+def dashboard_hourly_statement() -> Select:
+    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    tomorrow_start = today_start + timedelta(days=1)
+    hour = func.extract("hour", CallRecord.started_at)
+    return (
+        select(hour, func.count())
+        .where(CallRecord.started_at >= today_start, CallRecord.started_at < tomorrow_start)
+        .group_by(hour)
+    )
+
+
+def dashboard_hourly_from_rows(rows) -> List[HourlyPoint]:
+    totals = {int(row[0]): row[1] for row in rows}
+    return [HourlyPoint(hour=hour, total=totals.get(hour, 0)) for hour in range(24)]
+
+
+def compute_dashboard_hourly(db: Session) -> List[HourlyPoint]:
+    return dashboard_hourly_from_rows(db.execute(dashboard_hourly_statement()).all())
+
+
+async def compute_dashboard_hourly_async(db: AsyncSession) -> List[HourlyPoint]:
+    return dashboard_hourly_from_rows((await db.execute(dashboard_hourly_statement())).all())
+
+
+def timeseries_start(days: int) -> date:
+    return (datetime.utcnow() - timedelta(days=days - 1)).date()
+
+
+def dashboard_timeseries_statement(start_date: date) -> Select:
+    day = func.date(CallRecord.started_at)
+    return (
+        select(
+            day,
+            func.count(),
+            func.count().filter(CallRecord.is_missed.is_(True)),
+        )
+        .where(CallRecord.started_at >= datetime.combine(start_date, datetime.min.time()))
+        .group_by(day)
+    )
+
+
+def dashboard_timeseries_from_rows(rows, start_date: date, days: int) -> List[TimeseriesPoint]:
+    counts = {str(row[0]): (row[1], row[2]) for row in rows}
+    points = []
+    for i in range(days):
+        key = str(start_date + timedelta(days=i))
+        total, missed = counts.get(key, (0, 0))
+        points.append(TimeseriesPoint(date=key, total=total, missed=missed))
+    return points
+
+
+async def compute_dashboard_timeseries_async(db: AsyncSession, days: int) -> List[TimeseriesPoint]:
+    start_date = timeseries_start(days)
+    rows = (await db.execute(dashboard_timeseries_statement(start_date))).all()
+    return dashboard_timeseries_from_rows(rows, start_date, days)
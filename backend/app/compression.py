@@ -0,0 +1,123 @@
+import gzip
+import os
+import re
+from typing import Optional
+
+import anyio
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Vite writes content-hashed files under assets/; anything else may change in place.
+IMMUTABLE_PREFIX = "assets" + os.sep
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+PRECOMPRESSED_SUFFIXES = (("br", ".br"), ("gzip", ".gz"))
+COMPRESSIBLE_TYPES = ("application/json",)
+BROTLI_QUALITY = 4
+GZIP_LEVEL = 6
+
+
+def accepted_encodings(headers: Headers) -> set[str]:
+    """Return the codings of Accept-Encoding, leaving out those refused with q=0."""
+    encodings = set()
+    for part in headers.get("accept-encoding", "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if re.fullmatch(r"\s*q=0(\.0*)?\s*", params):
+            continue
+        if coding:
+            encodings.add(coding.strip().lower())
+    return encodings
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """The frontend build, served from its ``.br``/``.gz`` siblings when present.
+
+    The siblings are written at image build time by scripts.precompress_static.
+    Hashed assets are cached for a year; other files are revalidated with
+    their ETag on every load.
+    """
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        encodings = accepted_encodings(Headers(scope=scope))
+        response: Optional[Response] = None
+        for encoding, suffix in PRECOMPRESSED_SUFFIXES:
+            if encoding not in encodings:
+                continue
+            full_path, stat_result = await anyio.to_thread.run_sync(
+                self.lookup_path, path + suffix
+            )
+            if stat_result is not None and os.path.isfile(full_path):
+                response = self.file_response(full_path, stat_result, scope)
+                response.headers["Content-Encoding"] = encoding
+                break
+        if response is None:
+            response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            immutable = path.startswith(IMMUTABLE_PREFIX)
+            response.headers["Cache-Control"] = (
+                IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL
+            )
+            response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+
+class CompressionMiddleware:
+    """Brotli or gzip for JSON responses of at least ``minimum_size`` bytes.
+
+    Only responses sent in a single body message are compressed, so event
+    streams and other streamed responses go out untouched.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encodings = accepted_encodings(Headers(scope=scope))
+        if "br" in encodings:
+            encoding = "br"
+        elif "gzip" in encodings:
+            encoding = "gzip"
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if start is None:
+                await send(message)
+                return
+            initial, start = start, None
+            headers = MutableHeaders(raw=initial["headers"])
+            body = message.get("body", b"")
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+            ):
+                await send(initial)
+                await send(message)
+                return
+            if encoding == "br":
+                body = brotli.compress(body, quality=BROTLI_QUALITY)
+            else:
+                body = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(initial)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
@@ -12,19 +12,71 @@ def get_bool_env(name: str, default: bool = False) -> bool:
     return value.strip().lower() in {"1", "true", "yes", "on"}
 
 
+def get_optional_int_env(name: str) -> int | None:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return None
+    return int(value)
+
+
 class Settings:
     def __init__(self) -> None:
         self.database_url = get_env(
             "DATABASE_URL",
             "postgresql+psycopg2://telephonie:telephonie@db:5432/telephonie",
         )
+        self.async_database_url = get_env("ASYNC_DATABASE_URL")
+        self.async_db_pool_size = int(get_env("ASYNC_DB_POOL_SIZE", "10"))
+        self.async_db_max_overflow = int(get_env("ASYNC_DB_MAX_OVERFLOW", "10"))
+        self.async_db_pool_timeout_seconds = float(
+            get_env("ASYNC_DB_POOL_TIMEOUT_SECONDS", "10")
+        )
+        self.database_read_url = get_env("DATABASE_READ_URL")
+        self.replica_max_lag_seconds = float(get_env("REPLICA_MAX_LAG_SECONDS", "5"))
+        self.replica_check_interval_seconds = float(
+            get_env("REPLICA_CHECK_INTERVAL_SECONDS", "2")
+        )
         self.redis_url = get_env("REDIS_URL", "redis://redis:6379/0")
         self.jwt_secret = get_env("JWT_SECRET", "change-me")
         self.jwt_algorithm = get_env("JWT_ALGORITHM", "HS256")
         self.access_token_expire_minutes = int(
-            get_env("ACCESS_TOKEN_EXPIRE_MINUTES", "480")
+            get_env("ACCESS_TOKEN_EXPIRE_MINUTES", "15")
         )
+        self.refresh_token_expire_hours = int(get_env("REFRESH_TOKEN_EXPIRE_HOURS", "12"))
+        self.token_expiry_jitter_ratio = float(get_env("TOKEN_EXPIRY_JITTER_RATIO", "0.1"))
+        self.argon2_time_cost = get_optional_int_env("ARGON2_TIME_COST")
+        self.argon2_memory_cost = get_optional_int_env("ARGON2_MEMORY_COST")
+        self.argon2_parallelism = get_optional_int_env("ARGON2_PARALLELISM")
+        self.password_hash_workers = int(get_env("PASSWORD_HASH_WORKERS", "2"))
+        self.password_hash_queue_timeout_seconds = float(
+            get_env("PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS", "5")
+        )
+        self.login_max_failures_per_user = int(get_env("LOGIN_MAX_FAILURES_PER_USER", "5"))
+        self.login_max_failures_per_ip = int(get_env("LOGIN_MAX_FAILURES_PER_IP", "20"))
+        self.login_failure_window_seconds = float(
+            get_env("LOGIN_FAILURE_WINDOW_SECONDS", "300")
+        )
+        self.user_cache_ttl_seconds = float(get_env("USER_CACHE_TTL_SECONDS", "30"))
         self.sync_interval_seconds = int(get_env("SYNC_INTERVAL_SECONDS", "4"))
+        self.event_bus_backend = get_env("EVENT_BUS_BACKEND", "redis").strip().lower()
+        self.events_stream_maxlen = int(get_env("EVENTS_STREAM_MAXLEN", "1000"))
+        self.ws_queue_size = int(get_env("WS_QUEUE_SIZE", "100"))
+        self.ws_max_overflows = int(get_env("WS_MAX_OVERFLOWS", "3"))
+        self.ws_send_timeout_seconds = float(get_env("WS_SEND_TIMEOUT_SECONDS", "10"))
+        self.ws_heartbeat_interval_seconds = float(
+            get_env("WS_HEARTBEAT_INTERVAL_SECONDS", "20")
+        )
+        self.ingest_secret = get_env("INGEST_SECRET")
+        self.ingest_signature_tolerance_seconds = int(
+            get_env("INGEST_SIGNATURE_TOLERANCE_SECONDS", "300")
+        )
+        self.ingest_max_batch = int(get_env("INGEST_MAX_BATCH", "500"))
+        self.team_lead_bulk_max = int(get_env("TEAM_LEAD_BULK_MAX", "2000"))
+        self.recent_calls_size = int(get_env("RECENT_CALLS_SIZE", "100"))
+        self.sql_instrumentation = get_bool_env("SQL_INSTRUMENTATION", False)
+        self.slow_request_ms = float(get_env("SLOW_REQUEST_MS", "500"))
+        self.slow_query_ms = float(get_env("SLOW_QUERY_MS", "100"))
+        self.compression_minimum_size = int(get_env("COMPRESSION_MINIMUM_SIZE", "1024"))
         self.ovh_endpoint = get_env("OVH_ENDPOINT", "ovh-eu")
         self.ldap_enabled = get_bool_env("LDAP_ENABLED", False)
         self.ldap_url = get_env("LDAP_URL", "ldap://lldap:3890")
@@ -46,6 +98,9 @@ class Settings:
         self.ldap_group_role_map = get_env(
             "LDAP_GROUP_ROLE_MAP", "telephonie:OPERATEUR"
         )
+        self.ldap_pool_size = int(get_env("LDAP_POOL_SIZE", "4"))
+        self.ldap_cache_ttl_seconds = float(get_env("LDAP_CACHE_TTL_SECONDS", "300"))
+        self.ldap_mirror_interval_seconds = int(get_env("LDAP_MIRROR_INTERVAL_SECONDS", "300"))
 
 
 settings = Settings()
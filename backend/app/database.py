@@ -1,13 +1,133 @@
-from sqlalchemy import create_engine
+import asyncio
+import time
+from collections import Counter
+from typing import Optional, TypeVar
+
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 from app.config import settings
+from app.instrumentation import TimedAsyncQueuePool, TimedQueuePool, sql_instrumentation
+
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def async_database_url(url: str) -> str:
+    """Return ``url`` with its driver swapped for the asyncio one of the same database."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    async_url = parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+    return async_url.render_as_string(hide_password=False)
 
-engine = create_engine(settings.database_url, pool_pre_ping=True)
+
+engine = create_engine(settings.database_url, pool_pre_ping=True, poolclass=TimedQueuePool)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
+
+def create_pooled_async_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        pool_pre_ping=True,
+        poolclass=TimedAsyncQueuePool,
+        pool_size=settings.async_db_pool_size,
+        max_overflow=settings.async_db_max_overflow,
+        pool_timeout=settings.async_db_pool_timeout_seconds,
+    )
+
+
+# Used by the hot read endpoints so they wait on the database, not on a
+# threadpool slot. Alembic, the sync worker and writes keep the engine above.
+async_engine = create_pooled_async_engine(
+    settings.async_database_url or async_database_url(settings.database_url)
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+read_engine: Optional[AsyncEngine] = None
+if settings.database_read_url:
+    read_engine = create_pooled_async_engine(async_database_url(settings.database_read_url))
+AsyncReadSessionLocal = async_sessionmaker(read_engine or async_engine, expire_on_commit=False)
+
+sql_instrumentation.attach(
+    engine, async_engine.sync_engine, *([read_engine.sync_engine] if read_engine else [])
+)
+
+# Seconds of replay lag; 0 when everything received is replayed, which is
+# also what a server that is not a standby reports.
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+REPLICA_CHECK_TIMEOUT_SECONDS = 2.0
+
+
+class ReadRouter:
+    """Sends read-only sessions to DATABASE_READ_URL while the replica keeps up.
+
+    The replica's replay lag is checked at most every ``check_interval``
+    seconds; reads go to the primary while it exceeds ``max_lag_seconds``,
+    while the replica is unreachable, and until the next check after a read
+    on the replica failed.
+    """
+
+    def __init__(
+        self, engine: Optional[AsyncEngine], max_lag_seconds: float, check_interval: float
+    ) -> None:
+        self.engine = engine
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self.lag: Optional[float] = None
+        self.error: Optional[str] = None
+        self.reads: Counter = Counter()
+        self._checked_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    async def _check(self) -> None:
+        try:
+            async with asyncio.timeout(REPLICA_CHECK_TIMEOUT_SECONDS):
+                async with self.engine.connect() as connection:
+                    if connection.dialect.name == "postgresql":
+                        lag = (await connection.execute(REPLICA_LAG_QUERY)).scalar()
+                    else:
+                        lag = 0
+            self.lag, self.error = float(lag or 0), None
+        except (DBAPIError, OSError, TimeoutError) as exc:
+            self.lag, self.error = None, str(exc) or type(exc).__name__
+        self._checked_at = time.monotonic()
+
+    async def use_replica(self) -> bool:
+        if self.engine is None:
+            return False
+        if time.monotonic() - self._checked_at > self.check_interval:
+            async with self._lock:
+                if time.monotonic() - self._checked_at > self.check_interval:
+                    await self._check()
+        return self.lag is not None and self.lag <= self.max_lag_seconds
+
+    def mark_failed(self, exc: Exception) -> None:
+        self.lag, self.error = None, str(exc)
+
+    def stats(self) -> dict:
+        return {
+            "replica_configured": self.engine is not None,
+            "replica_lag_seconds": self.lag,
+            "replica_error": self.error,
+            "max_lag_seconds": self.max_lag_seconds,
+            "reads": dict(self.reads),
+        }
+
+
+read_router = ReadRouter(
+    read_engine, settings.replica_max_lag_seconds, settings.replica_check_interval_seconds
+)
+
 Base = declarative_base()
 
+T = TypeVar("T")
+
 
 def get_db():
     db = SessionLocal()
@@ -15,3 +135,27 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db():
+    """Session for read-only routes: the replica when it keeps up, else the primary."""
+    replica = await read_router.use_replica()
+    read_router.reads["replica" if replica else "primary"] += 1
+    async with (AsyncReadSessionLocal if replica else AsyncSessionLocal)() as db:
+        try:
+            yield db
+        except (DBAPIError, OSError) as exc:
+            if replica:
+                read_router.mark_failed(exc)
+            raise
+
+
+def detached_copy(row: T) -> T:
+    """Return a session-free copy of ``row``, safe to share between requests."""
+    model = type(row)
+    return model(**{attr.key: getattr(row, attr.key) for attr in inspect(model).column_attrs})
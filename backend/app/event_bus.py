@@ -0,0 +1,230 @@
+import abc
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Optional
+
+from app.config import settings
+from app.events import (
+    ConnectionRegistry,
+    EventSubscriber,
+    append_event,
+    dumps,
+    format_event,
+    parse_stream_id,
+    read_events_since,
+)
+
+if TYPE_CHECKING:
+    import redis.asyncio as redis
+
+LATENCY_SAMPLES = 1000
+
+logger = logging.getLogger(__name__)
+
+
+class PublishStats:
+    """Publish latencies over the most recent events."""
+
+    def __init__(self, size: int = LATENCY_SAMPLES) -> None:
+        self.samples: deque[float] = deque(maxlen=size)
+        self.published = 0
+        self.errors = 0
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+        self.published += 1
+
+    def snapshot(self) -> dict:
+        samples = sorted(self.samples)
+        if not samples:
+            return {"published": self.published, "errors": self.errors}
+        return {
+            "published": self.published,
+            "errors": self.errors,
+            "latency_ms": {
+                "p50": round(samples[len(samples) // 2] * 1000, 3),
+                "p95": round(samples[max(int(len(samples) * 0.95) - 1, 0)] * 1000, 3),
+                "max": round(samples[-1] * 1000, 3),
+            },
+        }
+
+
+class EventBus(abc.ABC):
+    """Publishes realtime events and delivers them to the local connection registry."""
+
+    name = "base"
+
+    def __init__(self, registry: ConnectionRegistry) -> None:
+        self.registry = registry
+        self.publish_stats = PublishStats()
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def publish(self, payload: dict) -> Optional[str]:
+        """Publish an event and return its sequence id, or None if it was lost."""
+        started = time.perf_counter()
+        try:
+            seq = await self._publish(dumps(payload))
+        except Exception:
+            self.publish_stats.errors += 1
+            logger.exception("Failed to publish %s event", payload.get("type"))
+            return None
+        self.publish_stats.record(time.perf_counter() - started)
+        return seq
+
+    @abc.abstractmethod
+    async def _publish(self, data: str) -> str:
+        """Store ``data`` and return its sequence id."""
+
+    @abc.abstractmethod
+    async def read_since(
+        self, since: str
+    ) -> tuple[list[tuple[str, str, frozenset[str]]], Optional[str]]:
+        """Return the events after ``since``, or the resync marker id if some were lost."""
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "publish": self.publish_stats.snapshot()}
+
+
+class InProcessEventBus(EventBus):
+    """Single-process bus keeping the last events in memory for replay."""
+
+    name = "memory"
+
+    def __init__(self, registry: ConnectionRegistry, maxlen: Optional[int] = None) -> None:
+        super().__init__(registry)
+        self._events: deque[tuple[str, str]] = deque(
+            maxlen=maxlen or settings.events_stream_maxlen
+        )
+        self._last_id = (0, 0)
+        self._max_deleted_id: Optional[tuple[int, int]] = None
+
+    def _next_id(self) -> str:
+        milliseconds = int(time.time() * 1000)
+        last_milliseconds, last_sequence = self._last_id
+        if milliseconds > last_milliseconds:
+            self._last_id = (milliseconds, 0)
+        else:
+            self._last_id = (last_milliseconds, last_sequence + 1)
+        return "{}-{}".format(*self._last_id)
+
+    async def _publish(self, data: str) -> str:
+        seq = self._next_id()
+        if len(self._events) == self._events.maxlen:
+            self._max_deleted_id = parse_stream_id(self._events[0][0])
+        self._events.append((seq, data))
+        message, topics = format_event(seq, data)
+        self.registry.broadcast(seq, topics, message)
+        return seq
+
+    async def read_since(
+        self, since: str
+    ) -> tuple[list[tuple[str, str, frozenset[str]]], Optional[str]]:
+        last_id = "{}-{}".format(*self._last_id)
+        try:
+            since_id = parse_stream_id(since)
+        except ValueError:
+            return [], last_id
+        if since_id > self._last_id:
+            return [], last_id
+        if self._max_deleted_id is not None and since_id < self._max_deleted_id:
+            return [], last_id
+        return [
+            (seq, *format_event(seq, data))
+            for seq, data in self._events
+            if parse_stream_id(seq) > since_id
+        ], None
+
+
+class RedisEventBus(EventBus):
+    """Bus backed by a capped Redis Stream, shared by every backend process.
+
+    Events published while a pipeline is in flight are sent together in the
+    next one, so bursts cost one round trip instead of one per event.
+    """
+
+    name = "redis"
+
+    def __init__(self, registry: ConnectionRegistry, redis_url: str) -> None:
+        super().__init__(registry)
+        self.redis_url = redis_url
+        self.redis_client: Optional["redis.Redis"] = None
+        self.batches = 0
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._subscriber_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        import redis.asyncio as redis
+
+        self.redis_client = redis.from_url(self.redis_url, decode_responses=True)
+        self._subscriber_task = asyncio.create_task(
+            EventSubscriber(self.registry).run(self.redis_client)
+        )
+
+    async def stop(self) -> None:
+        tasks = [task for task in (self._subscriber_task, self._flush_task) if task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.redis_client:
+            await self.redis_client.aclose()
+            self.redis_client = None
+
+    async def _publish(self, data: str) -> str:
+        if not self.redis_client:
+            raise RuntimeError("Redis event bus is not started")
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((data, future))
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush())
+        return await future
+
+    async def _flush(self) -> None:
+        try:
+            while self._pending:
+                batch, self._pending = self._pending, []
+                try:
+                    async with self.redis_client.pipeline(transaction=False) as pipe:
+                        for data, _ in batch:
+                            append_event(pipe, data)
+                        ids = await pipe.execute()
+                except asyncio.CancelledError:
+                    for _, future in batch + self._pending:
+                        future.cancel()
+                    raise
+                except Exception as exc:
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(exc)
+                    continue
+                self.batches += 1
+                for (_, future), seq in zip(batch, ids):
+                    if not future.done():
+                        future.set_result(seq)
+        finally:
+            self._flush_task = None
+
+    async def read_since(
+        self, since: str
+    ) -> tuple[list[tuple[str, str, frozenset[str]]], Optional[str]]:
+        if not self.redis_client:
+            return [], None
+        return await read_events_since(self.redis_client, since)
+
+    def stats(self) -> dict:
+        return {**super().stats(), "batches": self.batches}
+
+
+def create_event_bus(registry: ConnectionRegistry) -> EventBus:
+    if settings.event_bus_backend == "memory":
+        return InProcessEventBus(registry)
+    if settings.event_bus_backend == "redis":
+        return RedisEventBus(registry, settings.redis_url)
+    raise ValueError(f"Unknown EVENT_BUS_BACKEND: {settings.event_bus_backend}")
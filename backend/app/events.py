@@ -0,0 +1,342 @@
+import asyncio
+import json
+import logging
+import time
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional
+
+import orjson
+from fastapi import WebSocket
+from starlette.websockets import WebSocketState
+
+from app.config import settings
+
+if TYPE_CHECKING:
+    import redis.asyncio as redis
+
+    from app.event_bus import EventBus
+
+EVENTS_STREAM = "events:stream"
+RESYNC_REQUIRED = "resync_required"
+PING_MESSAGE = '{"type":"ping"}'
+AUTH_OK_MESSAGE = '{"type":"auth_ok"}'
+AUTH_FAILED_MESSAGE = '{"type":"auth_failed"}'
+TOPICS = frozenset({"calls", "dashboard", "team_leads", "sync"})
+# Events for backend processes only; no client can subscribe to this topic.
+INTERNAL_TOPIC = "internal"
+EVENT_TOPICS = {
+    "user_changed": frozenset({INTERNAL_TOPIC}),
+    "settings_changed": frozenset({INTERNAL_TOPIC}),
+    "instrumentation_changed": frozenset({INTERNAL_TOPIC}),
+    "calls_changed": frozenset({"calls", "dashboard"}),
+    "team_leads_updated": frozenset({"team_leads"}),
+    "team_lead_categories_updated": frozenset({"team_leads"}),
+    "sync_complete": frozenset({"sync"}),
+    "sync_error": frozenset({"sync"}),
+}
+
+logger = logging.getLogger(__name__)
+
+
+def parse_stream_id(value: str) -> tuple[int, int]:
+    milliseconds, _, sequence = value.partition("-")
+    return int(milliseconds), int(sequence or 0)
+
+
+def is_stale(seq: Optional[str], skip_until: Optional[str]) -> bool:
+    return bool(skip_until and seq and parse_stream_id(seq) <= parse_stream_id(skip_until))
+
+
+def parse_topics(value: Optional[str]) -> set[str]:
+    """The known topics in a comma-separated list, or all of them if it names none."""
+    topics = {topic.strip() for topic in (value or "").split(",") if topic.strip() in TOPICS}
+    return topics or set(TOPICS)
+
+
+def dumps(data) -> str:
+    return orjson.dumps(data).decode()
+
+
+def format_event(seq: str, data: str) -> tuple[str, frozenset[str]]:
+    event = orjson.loads(data)
+    return dumps({"seq": seq, **event}), EVENT_TOPICS.get(event.get("type"), TOPICS)
+
+
+def append_event(redis_client, data: str):
+    """Queue an XADD on a client (returns an awaitable) or on a pipeline."""
+    return redis_client.xadd(
+        EVENTS_STREAM,
+        {"data": data},
+        maxlen=settings.events_stream_maxlen,
+        approximate=True,
+    )
+
+
+async def read_events_since(
+    redis_client: "redis.Redis", since: str
+) -> tuple[list[tuple[str, str, frozenset[str]]], Optional[str]]:
+    """Return the events after ``since``, or the resync marker id if some were trimmed."""
+    from redis.exceptions import ResponseError
+
+    try:
+        since_id = parse_stream_id(since)
+    except ValueError:
+        since_id = None
+    try:
+        info = await redis_client.xinfo_stream(EVENTS_STREAM)
+    except ResponseError:
+        return [], None
+    last_id = info.get("last-generated-id") or "0-0"
+    if since_id is None or since_id > parse_stream_id(last_id):
+        return [], last_id
+    max_deleted = info.get("max-deleted-entry-id")
+    first_entry = info.get("first-entry")
+    if max_deleted is not None:
+        trimmed = since_id < parse_stream_id(max_deleted)
+    else:
+        trimmed = bool(first_entry) and since_id < parse_stream_id(first_entry[0])
+    if trimmed:
+        return [], last_id
+    entries = await redis_client.xrange(EVENTS_STREAM, min=f"({since}", max="+")
+    return [
+        (entry_id, *format_event(entry_id, fields["data"])) for entry_id, fields in entries
+    ], None
+
+
+class Connection:
+    """A subscriber with its topics and bounded outgoing queue."""
+
+    def __init__(self, topics: set[str]) -> None:
+        self.topics = topics
+        self.queue: asyncio.Queue[tuple[Optional[str], str]] = asyncio.Queue(
+            maxsize=settings.ws_queue_size
+        )
+        self.overflows = 0
+        self.evicted = asyncio.Event()
+
+    def matches(self, topics: frozenset[str]) -> bool:
+        return not self.topics.isdisjoint(topics)
+
+    def enqueue(self, seq: Optional[str], message: str) -> int:
+        """Queue a message and return how many messages were dropped to make room."""
+        try:
+            self.queue.put_nowait((seq, message))
+            return 0
+        except asyncio.QueueFull:
+            pass
+        dropped = self.queue.qsize() + 1
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait((seq, dumps({"type": RESYNC_REQUIRED, "seq": seq})))
+        self.overflows += 1
+        if self.overflows > settings.ws_max_overflows:
+            self.evicted.set()
+        return dropped
+
+
+class WebSocketConnection(Connection):
+    """A WebSocket subscriber with its sender task and heartbeat.
+
+    The connection lasts while its access token is valid; clients extend it
+    by sending ``{"action": "auth", "token": ...}`` with a refreshed token.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        topics: set[str],
+        expires_at: Optional[float] = None,
+        authenticate: Optional[Callable[[str], Awaitable[Optional[float]]]] = None,
+    ) -> None:
+        super().__init__(topics)
+        self.websocket = websocket
+        self.last_seen = time.monotonic()
+        self.expires_at = expires_at
+        self.authenticate = authenticate
+
+    async def handle_control(self, text: str) -> None:
+        """Apply a subscribe, unsubscribe or auth control message."""
+        self.last_seen = time.monotonic()
+        try:
+            message = json.loads(text)
+        except ValueError:
+            return
+        if not isinstance(message, dict):
+            return
+        if message.get("action") == "auth":
+            await self._reauthenticate(message.get("token"))
+            return
+        if not isinstance(message.get("topics"), list):
+            return
+        topics = {topic for topic in message["topics"] if topic in TOPICS}
+        if message.get("action") == "subscribe":
+            self.topics |= topics
+        elif message.get("action") == "unsubscribe":
+            self.topics -= topics
+
+    async def _reauthenticate(self, token: object) -> None:
+        expires_at = None
+        if self.authenticate and isinstance(token, str):
+            expires_at = await self.authenticate(token)
+        if expires_at is None:
+            self.enqueue(None, AUTH_FAILED_MESSAGE)
+            return
+        self.expires_at = expires_at
+        self.enqueue(None, AUTH_OK_MESSAGE)
+
+    async def send(self, message: str) -> None:
+        async with asyncio.timeout(settings.ws_send_timeout_seconds):
+            await self.websocket.send_text(message)
+
+    async def close(self) -> None:
+        if self.websocket.client_state != WebSocketState.CONNECTED:
+            return
+        try:
+            async with asyncio.timeout(settings.ws_send_timeout_seconds):
+                await self.websocket.close()
+        except Exception:
+            logger.debug("WebSocket close failed", exc_info=True)
+
+    async def serve(self, skip_until: Optional[str] = None) -> None:
+        """Run sender, receiver and heartbeat until the first of them stops."""
+        tasks = [
+            asyncio.create_task(self._send_loop(skip_until)),
+            asyncio.create_task(self._receive_loop()),
+            asyncio.create_task(self._heartbeat_loop()),
+            asyncio.create_task(self.evicted.wait()),
+        ]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _send_loop(self, skip_until: Optional[str]) -> None:
+        while True:
+            seq, message = await self.queue.get()
+            if is_stale(seq, skip_until):
+                continue
+            await self.send(message)
+
+    async def _receive_loop(self) -> None:
+        while True:
+            await self.handle_control(await self.websocket.receive_text())
+
+    async def _heartbeat_loop(self) -> None:
+        interval = settings.ws_heartbeat_interval_seconds
+        while True:
+            await asyncio.sleep(interval)
+            if time.monotonic() - self.last_seen > interval * 2:
+                return
+            if self.expires_at is not None and time.time() > self.expires_at + interval:
+                return
+            self.enqueue(None, PING_MESSAGE)
+
+
+class ConnectionRegistry:
+    def __init__(self) -> None:
+        self._connections: set[Connection] = set()
+        self.last_seq: Optional[str] = None
+        self.topic_stats: dict[str, dict[str, int]] = {
+            topic: {"messages": 0, "bytes": 0} for topic in TOPICS
+        }
+        self.dropped_messages = 0
+        self.overflows = 0
+        self.listeners: list[Callable[[frozenset[str], str], None]] = []
+
+    def __len__(self) -> int:
+        return len(self._connections)
+
+    def add(self, connection: Connection) -> None:
+        self._connections.add(connection)
+
+    def discard(self, connection: Connection) -> None:
+        self._connections.discard(connection)
+
+    def stats(self) -> dict:
+        subscribers = {topic: 0 for topic in TOPICS}
+        depths = []
+        for connection in self._connections:
+            depths.append(connection.queue.qsize())
+            for topic in connection.topics:
+                subscribers[topic] += 1
+        return {
+            "connections": len(self._connections),
+            "queue_depth": {"max": max(depths, default=0), "total": sum(depths)},
+            "dropped_messages": self.dropped_messages,
+            "overflows": self.overflows,
+            "topics": {
+                topic: {**self.topic_stats[topic], "subscribers": subscribers[topic]}
+                for topic in sorted(TOPICS)
+            },
+        }
+
+    def _record(self, connection: Connection, topics: frozenset[str], message: str) -> None:
+        size = len(message.encode())
+        for topic in connection.topics & topics:
+            self.topic_stats[topic]["messages"] += 1
+            self.topic_stats[topic]["bytes"] += size
+
+    async def replay(
+        self, connection: Connection, event_bus: "EventBus", since: str
+    ) -> tuple[list[tuple[str, str]], Optional[str], bool]:
+        """Return the missed ``(seq, message)`` pairs for ``connection``, the last
+        seq and a resync flag.
+
+        Live events broadcast meanwhile wait in the connection queue; senders
+        skip the ones already covered by the replay.
+        """
+        entries, resync_seq = await event_bus.read_since(since)
+        if resync_seq is not None:
+            return [], resync_seq, True
+        messages: list[tuple[str, str]] = []
+        last_seq: Optional[str] = None
+        for seq, message, topics in entries:
+            if connection.matches(topics):
+                self._record(connection, topics, message)
+                messages.append((seq, message))
+            last_seq = seq
+        return messages, last_seq, False
+
+    def broadcast(self, seq: str, topics: frozenset[str], message: str) -> None:
+        self.last_seq = seq
+        for listener in self.listeners:
+            listener(topics, message)
+        for connection in self._connections:
+            if not connection.matches(topics):
+                continue
+            self._record(connection, topics, message)
+            dropped = connection.enqueue(seq, message)
+            if dropped:
+                self.dropped_messages += dropped
+                self.overflows += 1
+
+
+class EventSubscriber:
+    """Single reader of the event stream per process, fanned out to local sockets."""
+
+    def __init__(self, registry: ConnectionRegistry, retry_delay_seconds: float = 1.0) -> None:
+        self.registry = registry
+        self.retry_delay_seconds = retry_delay_seconds
+
+    async def run(self, redis_client: "redis.Redis") -> None:
+        last_id = "$"
+        while True:
+            try:
+                response = await redis_client.xread({EVENTS_STREAM: last_id}, block=0)
+                for _, entries in response:
+                    for entry_id, fields in entries:
+                        last_id = entry_id
+                        message, topics = format_event(entry_id, fields["data"])
+                        self.registry.broadcast(entry_id, topics, message)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(
+                    "Event subscriber lost Redis connection. Retrying in %.1fs.",
+                    self.retry_delay_seconds,
+                )
+                await asyncio.sleep(self.retry_delay_seconds)
+
+
+connections = ConnectionRegistry()
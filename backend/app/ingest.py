@@ -0,0 +1,35 @@
+import hashlib
+import hmac
+import time
+from typing import Mapping
+
+from fastapi import HTTPException
+
+from app.config import settings
+
+SIGNATURE_HEADER = "X-Ingest-Signature"
+TIMESTAMP_HEADER = "X-Ingest-Timestamp"
+
+
+def sign_ingest_body(secret: str, timestamp: str, body: bytes) -> str:
+    """Return the ``sha256=<hex>`` HMAC of ``<timestamp>.<body>``."""
+    digest = hmac.new(secret.encode(), timestamp.encode() + b"." + body, hashlib.sha256)
+    return f"sha256={digest.hexdigest()}"
+
+
+def verify_ingest_signature(headers: Mapping[str, str], body: bytes) -> None:
+    if not settings.ingest_secret:
+        raise HTTPException(status_code=503, detail="Call ingestion is disabled")
+    timestamp = headers.get(TIMESTAMP_HEADER)
+    signature = headers.get(SIGNATURE_HEADER)
+    if not timestamp or not signature:
+        raise HTTPException(status_code=401, detail="Missing ingest signature")
+    try:
+        skew = abs(time.time() - int(timestamp))
+    except ValueError:
+        raise HTTPException(status_code=401, detail="Invalid ingest timestamp")
+    if skew > settings.ingest_signature_tolerance_seconds:
+        raise HTTPException(status_code=401, detail="Expired ingest signature")
+    expected = sign_ingest_body(settings.ingest_secret, timestamp, body)
+    if not hmac.compare_digest(expected, signature):
+        raise HTTPException(status_code=401, detail="Invalid ingest signature")
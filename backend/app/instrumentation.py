@@ -0,0 +1,260 @@
+import logging
+import re
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+import orjson
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.events import INTERNAL_TOPIC
+
+logger = logging.getLogger(__name__)
+
+INSTRUMENTATION_CHANGED = "instrumentation_changed"
+RECENT_SLOW_REQUESTS = 100
+RECENT_SLOW_QUERIES = 100
+TOP_STATEMENTS = 5
+STRING_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'")
+PLACEHOLDER_PATTERN = re.compile(r"%\(\w+\)s|%s|\$\d+")
+NUMBER_LITERAL_PATTERN = re.compile(r"\b\d+(?:\.\d+)?\b")
+PLACEHOLDER_LIST_PATTERN = re.compile(r"\?(?:\s*,\s*\?)+")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """One-line SQL with placeholders and literals as ``?`` and lists of them collapsed."""
+    sql = WHITESPACE_PATTERN.sub(" ", statement).strip()
+    sql = STRING_LITERAL_PATTERN.sub("?", sql)
+    sql = PLACEHOLDER_PATTERN.sub("?", sql)
+    sql = NUMBER_LITERAL_PATTERN.sub("?", sql)
+    return PLACEHOLDER_LIST_PATTERN.sub("?, ...", sql)
+
+
+def parameter_shape(parameters, executemany: bool = False) -> str:
+    """The type names of bound parameters, never their values."""
+    if executemany:
+        rows = list(parameters or ())
+        return f"{len(rows)} x {parameter_shape(rows[0]) if rows else '()'}"
+    if isinstance(parameters, dict):
+        fields = (f"{key}: {type(value).__name__}" for key, value in parameters.items())
+        return "{" + ", ".join(fields) + "}"
+    return "(" + ", ".join(type(value).__name__ for value in parameters or ()) + ")"
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds", "pool_wait_seconds", "statements")
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.pool_wait_seconds = 0.0
+        self.statements: Counter = Counter()
+
+    def server_timing(self, elapsed: float) -> str:
+        return (
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.queries} SQL", '
+            f"pool;dur={self.pool_wait_seconds * 1000:.1f}, "
+            f"app;dur={elapsed * 1000:.1f}"
+        )
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar(
+    "current_request", default=None
+)
+
+
+class SqlInstrumentation:
+    """Counts SQL statements, database time and pool waits per HTTP request.
+
+    While enabled, cursor events on the attached engines add to the
+    RequestStats of the current request, statements slower than
+    ``slow_query_ms`` are logged with their normalized SQL and parameter
+    types, and requests slower than ``slow_request_ms`` are kept for
+    GET /debug/requests. Disabling removes the event listeners, so the only
+    cost left is a flag check per request and per pool checkout.
+    """
+
+    def __init__(self, enabled: bool, slow_request_ms: float, slow_query_ms: float) -> None:
+        self.enabled = enabled
+        self.slow_request_ms = slow_request_ms
+        self.slow_query_ms = slow_query_ms
+        self.slow_requests: deque = deque(maxlen=RECENT_SLOW_REQUESTS)
+        self.slow_queries: deque = deque(maxlen=RECENT_SLOW_QUERIES)
+        self._engines: list[Engine] = []
+
+    def attach(self, *engines: Engine) -> None:
+        for engine in engines:
+            self._engines.append(engine)
+            if self.enabled:
+                self._listen(engine)
+
+    def configure(self, enabled: bool, slow_request_ms: float, slow_query_ms: float) -> None:
+        self.slow_request_ms = slow_request_ms
+        self.slow_query_ms = slow_query_ms
+        if enabled == self.enabled:
+            return
+        for engine in self._engines:
+            if enabled:
+                self._listen(engine)
+            else:
+                event.remove(engine, "before_cursor_execute", self._before_cursor_execute)
+                event.remove(engine, "after_cursor_execute", self._after_cursor_execute)
+        self.enabled = enabled
+
+    def _listen(self, engine: Engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("query_started")
+        if not started:
+            return
+        elapsed = time.perf_counter() - started.pop()
+        stats = current_request.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+            stats.statements[statement] += 1
+        if elapsed * 1000 >= self.slow_query_ms:
+            sql = normalize_sql(statement)
+            shape = parameter_shape(parameters, executemany)
+            self.slow_queries.append(
+                {
+                    "at": datetime.now(timezone.utc).isoformat(),
+                    "duration_ms": round(elapsed * 1000, 1),
+                    "sql": sql,
+                    "parameters": shape,
+                }
+            )
+            logger.warning("Slow query (%.1f ms): %s parameters=%s", elapsed * 1000, sql, shape)
+
+    def record_pool_wait(self, elapsed: float) -> None:
+        stats = current_request.get()
+        if stats is not None:
+            stats.pool_wait_seconds += elapsed
+
+    def finish_request(
+        self, scope: Scope, status: int, elapsed: float, stats: RequestStats
+    ) -> None:
+        if elapsed * 1000 < self.slow_request_ms:
+            return
+        query = scope.get("query_string", b"").decode("latin-1")
+        self.slow_requests.append(
+            {
+                "at": datetime.now(timezone.utc).isoformat(),
+                "method": scope["method"],
+                "path": scope["path"] + (f"?{query}" if query else ""),
+                "status": status,
+                "duration_ms": round(elapsed * 1000, 1),
+                "queries": stats.queries,
+                "db_ms": round(stats.db_seconds * 1000, 1),
+                "pool_wait_ms": round(stats.pool_wait_seconds * 1000, 1),
+                "top_statements": [
+                    {"count": count, "sql": normalize_sql(statement)}
+                    for statement, count in stats.statements.most_common(TOP_STATEMENTS)
+                ],
+            }
+        )
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "slow_request_ms": self.slow_request_ms,
+            "slow_query_ms": self.slow_query_ms,
+            "slow_requests": list(reversed(self.slow_requests)),
+            "slow_queries": list(reversed(self.slow_queries)),
+        }
+
+    def on_event(self, topics: frozenset[str], message: str) -> None:
+        if INTERNAL_TOPIC not in topics:
+            return
+        event_data = orjson.loads(message)
+        if event_data.get("type") != INSTRUMENTATION_CHANGED:
+            return
+        payload = event_data.get("payload") or {}
+        self.configure(
+            bool(payload.get("enabled")),
+            float(payload.get("slow_request_ms", self.slow_request_ms)),
+            float(payload.get("slow_query_ms", self.slow_query_ms)),
+        )
+
+
+sql_instrumentation = SqlInstrumentation(
+    settings.sql_instrumentation, settings.slow_request_ms, settings.slow_query_ms
+)
+
+
+def instrumentation_changed_event(
+    enabled: bool, slow_request_ms: float, slow_query_ms: float
+) -> dict:
+    return {
+        "type": INSTRUMENTATION_CHANGED,
+        "payload": {
+            "enabled": enabled,
+            "slow_request_ms": slow_request_ms,
+            "slow_query_ms": slow_query_ms,
+        },
+    }
+
+
+class _CheckoutTimer:
+    # SQLAlchemy has no event before a checkout starts waiting, so the wait
+    # is timed around the pool's own _do_get.
+    def _do_get(self):
+        if not sql_instrumentation.enabled:
+            return super()._do_get()
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            sql_instrumentation.record_pool_wait(time.perf_counter() - started)
+
+
+class TimedQueuePool(_CheckoutTimer, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_CheckoutTimer, AsyncAdaptedQueuePool):
+    pass
+
+
+class InstrumentationMiddleware:
+    """Adds a Server-Timing header with the request's query count, database
+    time and pool wait, and hands slow requests to ``sql_instrumentation``."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not sql_instrumentation.enabled:
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = current_request.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", stats.server_timing(time.perf_counter() - started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_request.reset(token)
+            sql_instrumentation.finish_request(scope, status, time.perf_counter() - started, stats)
@@ -1,10 +1,15 @@
+import re
 import socket
-from dataclasses import dataclass
+import threading
+import time
+from dataclasses import astuple, dataclass
+from typing import Callable, Optional, TypeVar
 from urllib.parse import urlparse
 
 from ldap3 import ALL, Connection, Server, SUBTREE
-from ldap3.core.exceptions import LDAPException
+from ldap3.core.exceptions import LDAPBindError, LDAPCommunicationError, LDAPException
 from ldap3.utils.conv import escape_filter_chars
+from sqlalchemy.orm import Session
 
 from app.config import settings
 from app.models import LdapSettings, Role
@@ -33,6 +38,15 @@ class LdapUser:
     role: Role
 
 
+@dataclass
+class LdapDirectory:
+    """Users (DN -> uid) and groups (DN -> (name, member DNs)) read in bulk."""
+
+    users: dict[str, str]
+    groups: dict[str, tuple[str, frozenset[str]]]
+    latest_timestamp: Optional[str]
+
+
 class LdapAuthError(Exception):
     pass
 
@@ -41,6 +55,107 @@ class LdapAccessDenied(Exception):
     pass
 
 
+T = TypeVar("T")
+
+DIRECTORY_PAGE_SIZE = 500
+MODIFY_TIMESTAMP = "modifyTimestamp"
+
+
+def bind_connection(server: Server, user: str, password: str) -> Connection:
+    """Open and bind a connection, reading the server schema only if not yet known."""
+    connection = Connection(server, user=user, password=password)
+    if not connection.bind(read_server_info=server.info is None):
+        connection.unbind()
+        raise LDAPBindError(connection.last_error or "LDAP bind failed")
+    return connection
+
+
+class LdapConnectionPool:
+    """Bound admin connections to one server, reused across logins.
+
+    A connection that fails on the socket is dropped along with the idle
+    ones, which are likely dead too, and the operation is retried once on a
+    fresh connection.
+    """
+
+    def __init__(self, server: Server, bind_dn: str, bind_password: str, size: int) -> None:
+        self.server = server
+        self.bind_dn = bind_dn
+        self.bind_password = bind_password
+        self.size = size
+        self.closed = False
+        self._idle: list[Connection] = []
+        self._lock = threading.Lock()
+
+    def _acquire(self) -> Connection:
+        with self._lock:
+            connection = self._idle.pop() if self._idle else None
+        if connection is None or connection.closed:
+            connection = bind_connection(self.server, self.bind_dn, self.bind_password)
+        return connection
+
+    def _release(self, connection: Connection) -> None:
+        with self._lock:
+            if not self.closed and len(self._idle) < self.size:
+                self._idle.append(connection)
+                return
+        connection.unbind()
+
+    def _drop_idle(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            try:
+                connection.unbind()
+            except LDAPException:
+                pass
+
+    def run(self, operation: Callable[[Connection], T]) -> T:
+        for attempt in range(2):
+            connection = self._acquire()
+            try:
+                result = operation(connection)
+            except LDAPCommunicationError:
+                self._drop_idle()
+                if attempt:
+                    raise
+                continue
+            except BaseException:
+                self._release(connection)
+                raise
+            self._release(connection)
+            return result
+        raise AssertionError("unreachable")
+
+    def close(self) -> None:
+        self.closed = True
+        self._drop_idle()
+
+
+class TtlCache:
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: dict[str, tuple[float, object]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        cached = self._entries.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        return None
+
+    def set(self, key: str, value) -> None:
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
 def ldap_config_from_settings(row: LdapSettings | None = None) -> LdapConfig:
     if row:
         return LdapConfig(
@@ -71,26 +186,101 @@ def ldap_config_from_settings(row: LdapSettings | None = None) -> LdapConfig:
     )
 
 
+def get_or_create_ldap_settings(db: Session) -> LdapSettings:
+    settings_row = db.query(LdapSettings).first()
+    if settings_row:
+        return settings_row
+    config = ldap_config_from_settings()
+    settings_row = LdapSettings(
+        enabled=config.enabled,
+        url=config.url,
+        bind_dn=config.bind_dn,
+        bind_password=config.bind_password,
+        user_base_dn=config.user_base_dn,
+        user_filter=config.user_filter,
+        group_base_dn=config.group_base_dn,
+        group_filter=config.group_filter,
+        group_name_attr=config.group_name_attr,
+        group_required=config.group_required,
+        group_role_map=config.group_role_map,
+    )
+    db.add(settings_row)
+    db.commit()
+    db.refresh(settings_row)
+    return settings_row
+
+
 class LdapService:
+    """LDAP logins over one long-lived Server and a pool of admin connections.
+
+    User DNs and group memberships are cached for ``cache_ttl_seconds``; the
+    password itself is always checked with a bind. Everything is rebuilt when
+    the LDAP settings change.
+    """
+
+    def __init__(self, pool_size: int, cache_ttl_seconds: float) -> None:
+        self.pool_size = pool_size
+        self._config_key: Optional[tuple] = None
+        self._server_instance: Optional[Server] = None
+        self._pool: Optional[LdapConnectionPool] = None
+        self._users = TtlCache(cache_ttl_seconds)
+        self._groups = TtlCache(cache_ttl_seconds)
+        self._lock = threading.Lock()
+
     def is_enabled(self, config: LdapConfig) -> bool:
         return config.enabled
 
-    def _server(self, config: LdapConfig) -> Server:
+    def _new_server(self, config: LdapConfig) -> Server:
         parsed = urlparse(config.url)
         host = parsed.hostname or config.url
         port = parsed.port or (636 if parsed.scheme == "ldaps" else 389)
         return Server(host, port=port, use_ssl=parsed.scheme == "ldaps", get_info=ALL)
 
+    def _sync_config(self, config: LdapConfig) -> None:
+        """Drop the server, pool and caches if ``config`` differs from the last one seen."""
+        key = astuple(config)
+        if key == self._config_key:
+            return
+        with self._lock:
+            if key != self._config_key:
+                self._reset()
+                self._config_key = key
+
+    def _reset(self) -> None:
+        if self._pool:
+            self._pool.close()
+        self._config_key = None
+        self._server_instance = None
+        self._pool = None
+        self._users.clear()
+        self._groups.clear()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._reset()
+
+    def _server(self, config: LdapConfig) -> Server:
+        self._sync_config(config)
+        with self._lock:
+            if self._server_instance is None:
+                self._server_instance = self._new_server(config)
+            return self._server_instance
+
+    def _admin_pool(self, config: LdapConfig) -> LdapConnectionPool:
+        if not config.bind_dn or not config.bind_password:
+            raise LdapAuthError("LDAP bind settings are incomplete")
+        server = self._server(config)
+        with self._lock:
+            if self._pool is None:
+                self._pool = LdapConnectionPool(
+                    server, config.bind_dn, config.bind_password, self.pool_size
+                )
+            return self._pool
+
     def _admin_connection(self, config: LdapConfig) -> Connection:
         if not config.bind_dn or not config.bind_password:
             raise LdapAuthError("LDAP bind settings are incomplete")
-        connection = Connection(
-            self._server(config),
-            user=config.bind_dn,
-            password=config.bind_password,
-            auto_bind=True,
-        )
-        return connection
+        return bind_connection(self._new_server(config), config.bind_dn, config.bind_password)
 
     def _user_filter(self, config: LdapConfig, username: str) -> str:
         escaped_username = escape_filter_chars(username)
@@ -116,6 +306,90 @@ class LdapService:
                 continue
         return result
 
+    def role(self, config: LdapConfig) -> Role:
+        return self._role_map(config).get(config.group_required or "", Role.OPERATEUR)
+
+    def membership_attribute(self, config: LdapConfig) -> Optional[str]:
+        """Return ``member`` for a group filter like ``(member={user_dn})``."""
+        match = re.search(r"\(([\w-]+)=\{user_dn\}\)", config.group_filter or "")
+        return match.group(1) if match else None
+
+    def _paged_search(
+        self, pool: LdapConnectionPool, base_dn: str, search_filter: str, attributes: list[str]
+    ) -> list[dict]:
+        def search(connection: Connection) -> list[dict]:
+            entries = connection.extend.standard.paged_search(
+                search_base=base_dn,
+                search_filter=search_filter,
+                search_scope=SUBTREE,
+                attributes=attributes,
+                paged_size=DIRECTORY_PAGE_SIZE,
+                generator=False,
+            )
+            return [entry for entry in entries if entry.get("type") == "searchResEntry"]
+
+        return pool.run(search)
+
+    def read_directory(self, config: LdapConfig, since: Optional[str] = None) -> LdapDirectory:
+        """Read users and groups with one paged search each.
+
+        With ``since`` (a modifyTimestamp value) only entries changed from then
+        on are returned, if the server schema knows modifyTimestamp.
+        """
+        member_attr = self.membership_attribute(config)
+        if not member_attr:
+            raise LdapAuthError("LDAP group filter does not reference {user_dn}")
+        try:
+            pool = self._admin_pool(config)
+            schema = pool.run(lambda connection: connection.server.schema)
+            timestamps = schema is None or MODIFY_TIMESTAMP in schema.attribute_types
+            extra = [MODIFY_TIMESTAMP] if timestamps else []
+            since_filter = ""
+            if since and timestamps:
+                since_filter = f"({MODIFY_TIMESTAMP}>={escape_filter_chars(since)})"
+            user_filter = config.user_filter.format(username="*")
+            group_filter = config.group_filter.format(user_dn="*")
+            user_entries = self._paged_search(
+                pool, config.user_base_dn, f"(&{user_filter}{since_filter})", ["uid", *extra]
+            )
+            group_entries = self._paged_search(
+                pool,
+                config.group_base_dn,
+                f"(&{group_filter}{since_filter})",
+                [config.group_name_attr, member_attr, *extra],
+            )
+        except LDAPException as exc:
+            raise LdapAuthError("LDAP directory read failed") from exc
+
+        def raw_values(entry: dict, name: str) -> list[str]:
+            values = entry.get("raw_attributes", {}).get(name) or []
+            return [value.decode() if isinstance(value, bytes) else str(value) for value in values]
+
+        seen: list[str] = []
+        users: dict[str, str] = {}
+        for entry in user_entries:
+            uid = raw_values(entry, "uid")
+            if uid:
+                users[entry["dn"]] = uid[0]
+            seen.extend(raw_values(entry, MODIFY_TIMESTAMP))
+        groups: dict[str, tuple[str, frozenset[str]]] = {}
+        for entry in group_entries:
+            names = raw_values(entry, config.group_name_attr)
+            if names:
+                groups[entry["dn"]] = (names[0], frozenset(raw_values(entry, member_attr)))
+            seen.extend(raw_values(entry, MODIFY_TIMESTAMP))
+        latest = max(seen) if seen else (since if since_filter else None)
+        return LdapDirectory(users, groups, latest)
+
+    def verify_password(self, config: LdapConfig, user_dn: str, password: str) -> None:
+        """Check ``password`` with a bind as ``user_dn``, without any search."""
+        if not password:
+            raise LdapAuthError("Missing LDAP credentials")
+        try:
+            bind_connection(self._server(config), user_dn, password).unbind()
+        except LDAPException as exc:
+            raise LdapAuthError("LDAP authentication failed") from exc
+
     def find_user(self, connection: Connection, config: LdapConfig, username: str):
         connection.search(
             search_base=config.user_base_dn,
@@ -148,20 +422,26 @@ class LdapService:
         if not username or not password:
             raise LdapAuthError("Missing LDAP credentials")
         try:
-            with self._admin_connection(config) as admin_connection:
-                entry = self.find_user(admin_connection, config, username)
+            pool = self._admin_pool(config)
+            cached_user = self._users.get(username)
+            if cached_user is None:
+                entry = pool.run(lambda connection: self.find_user(connection, config, username))
                 if not entry:
                     raise LdapAuthError("LDAP user not found")
-                user_dn = str(entry.entry_dn)
                 uid_attr = getattr(entry, "uid", None)
-                ldap_username = (
-                    str(uid_attr.value) if uid_attr and uid_attr.value else username
+                cached_user = (
+                    str(entry.entry_dn),
+                    str(uid_attr.value) if uid_attr and uid_attr.value else username,
                 )
-                with Connection(
-                    self._server(config), user=user_dn, password=password, auto_bind=True
-                ):
-                    pass
-                groups = self.list_user_groups(admin_connection, config, user_dn)
+                self._users.set(username, cached_user)
+            user_dn, ldap_username = cached_user
+            bind_connection(pool.server, user_dn, password).unbind()
+            groups = self._groups.get(user_dn)
+            if groups is None:
+                groups = pool.run(
+                    lambda connection: self.list_user_groups(connection, config, user_dn)
+                )
+                self._groups.set(user_dn, groups)
         except LdapAccessDenied:
             raise
         except LDAPException as exc:
@@ -170,8 +450,9 @@ class LdapService:
         if config.group_required and config.group_required not in groups:
             raise LdapAccessDenied("LDAP user is not in the required group")
 
-        role = self._role_map(config).get(config.group_required or "", Role.OPERATEUR)
-        return LdapUser(username=ldap_username, dn=user_dn, groups=groups, role=role)
+        return LdapUser(
+            username=ldap_username, dn=user_dn, groups=groups, role=self.role(config)
+        )
 
     def diagnose(
         self,
@@ -202,7 +483,8 @@ class LdapService:
             add("URL/port TCP", False, str(exc))
 
         try:
-            with self._admin_connection(config) as connection:
+            connection = self._admin_connection(config)
+            try:
                 add("Bind admin", True, config.bind_dn or "")
                 connection.search(config.user_base_dn, "(objectClass=*)", SUBTREE, size_limit=1)
                 add("Users base DN", bool(connection.entries), config.user_base_dn or "")
@@ -214,6 +496,8 @@ class LdapService:
                 )
                 connection.search(config.group_base_dn, group_filter, SUBTREE, size_limit=1)
                 add("Required group", bool(connection.entries), config.group_required or "")
+            finally:
+                connection.unbind()
         except (LDAPException, LdapAuthError) as exc:
             add("Bind admin", False, str(exc))
             add("Users base DN", False, "Skipped")
@@ -234,4 +518,4 @@ class LdapService:
         return checks
 
 
-ldap_service = LdapService()
+ldap_service = LdapService(settings.ldap_pool_size, settings.ldap_cache_ttl_seconds)
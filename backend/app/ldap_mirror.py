@@ -0,0 +1,179 @@
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.auth import revoke_refresh_tokens
+from app.ldap_auth import LdapConfig, LdapDirectory, LdapService
+from app.models import User, UserSource
+
+logger = logging.getLogger(__name__)
+
+FULL_RESYNC_INTERVAL = timedelta(hours=1)
+
+
+class LdapMirrorReport:
+    """Outcome of one mirror pass, shown on /debug/ldap."""
+
+    def __init__(self, mode: str) -> None:
+        self.mode = mode
+        self.started_at = datetime.utcnow()
+        self.duration_ms = 0.0
+        self.users_read = 0
+        self.groups_read = 0
+        self.created = 0
+        self.updated = 0
+        self.flagged = 0
+        self.error: Optional[str] = None
+        self.changed_usernames: list[str] = []
+
+    def as_dict(self) -> dict:
+        return {
+            "mode": self.mode,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration_ms, 1),
+            "users_read": self.users_read,
+            "groups_read": self.groups_read,
+            "created": self.created,
+            "updated": self.updated,
+            "flagged": self.flagged,
+            "error": self.error,
+        }
+
+
+class LdapMirror:
+    """Copies LDAP users and their role into ``users`` ahead of their first login.
+
+    Users and groups are kept in memory between passes so that, when the
+    server has modifyTimestamp, a pass only reads entries changed since the
+    previous one. A full pass runs at start and every FULL_RESYNC_INTERVAL;
+    only full passes notice entries deleted from the directory, although a
+    deleted user normally drops out of its groups, which every pass sees.
+    """
+
+    def __init__(self, service: LdapService) -> None:
+        self.service = service
+        self.last_report: Optional[LdapMirrorReport] = None
+        self._config: Optional[LdapConfig] = None
+        self._users: dict[str, str] = {}
+        self._groups: dict[str, tuple[str, frozenset[str]]] = {}
+        self._latest_timestamp: Optional[str] = None
+        self._last_full_at: Optional[datetime] = None
+        self._synced_at: Optional[datetime] = None
+
+    def is_current(self, config: LdapConfig, max_age: timedelta) -> bool:
+        """Whether the mirrored users reflect the groups of ``config`` as of ``max_age`` ago.
+
+        True when the latest pass succeeded and started less than ``max_age``
+        ago, and the last full pass used ``config``.
+        """
+        return (
+            self._synced_at is not None
+            and config == self._config
+            and datetime.utcnow() - self._synced_at < max_age
+        )
+
+    def _needs_full_pass(self, config: LdapConfig) -> bool:
+        return (
+            config != self._config
+            or not self._latest_timestamp
+            or not self._last_full_at
+            or datetime.utcnow() - self._last_full_at > FULL_RESYNC_INTERVAL
+        )
+
+    def _merge(self, config: LdapConfig, directory: LdapDirectory, full: bool) -> None:
+        if full:
+            self._users = directory.users
+            self._groups = directory.groups
+            self._config = config
+            self._last_full_at = datetime.utcnow()
+        else:
+            self._users.update(directory.users)
+            self._groups.update(directory.groups)
+        self._latest_timestamp = directory.latest_timestamp
+
+    def _groups_by_member(self) -> dict[str, set[str]]:
+        result: dict[str, set[str]] = {}
+        for name, members in self._groups.values():
+            for member in members:
+                result.setdefault(member, set()).add(name)
+        return result
+
+    def _apply(
+        self, db: Session, config: LdapConfig, report: LdapMirrorReport, full: bool
+    ) -> None:
+        groups_by_member = self._groups_by_member()
+        role = self.service.role(config)
+        users = {user.username: user for user in db.query(User).all()}
+        now = datetime.utcnow()
+        removed: list[str] = []
+
+        def flag(user: User) -> None:
+            if user.ldap_removed_at is None:
+                user.ldap_removed_at = now
+                report.flagged += 1
+                removed.append(user.username)
+
+        for dn, username in self._users.items():
+            member_of = groups_by_member.get(dn, set())
+            allowed = not config.group_required or config.group_required in member_of
+            user = users.get(username)
+            if user is None:
+                if allowed:
+                    db.add(
+                        User(
+                            username=username,
+                            password_hash=None,
+                            role=role,
+                            must_change_password=False,
+                            source=UserSource.LDAP,
+                            ldap_dn=dn,
+                        )
+                    )
+                    report.created += 1
+                continue
+            if user.source != UserSource.LDAP:
+                continue
+            if not allowed:
+                flag(user)
+            elif user.role != role or user.ldap_dn != dn or user.ldap_removed_at is not None:
+                user.role = role
+                user.ldap_dn = dn
+                user.ldap_removed_at = None
+                report.updated += 1
+                report.changed_usernames.append(username)
+        # An empty listing more likely means a wrong base DN than an empty directory.
+        if full and self._users:
+            listed = set(self._users.values())
+            for username, user in users.items():
+                if user.source == UserSource.LDAP and username not in listed:
+                    flag(user)
+        db.commit()
+        for username in removed:
+            revoke_refresh_tokens(db, username)
+        report.changed_usernames.extend(removed)
+
+    def run(self, db: Session, config: LdapConfig) -> LdapMirrorReport:
+        full = self._needs_full_pass(config)
+        report = LdapMirrorReport("full" if full else "incremental")
+        started = time.perf_counter()
+        try:
+            directory = self.service.read_directory(
+                config, None if full else self._latest_timestamp
+            )
+            report.users_read = len(directory.users)
+            report.groups_read = len(directory.groups)
+            self._merge(config, directory, full)
+            self._apply(db, config, report, full)
+            self._synced_at = report.started_at
+        except Exception as exc:
+            db.rollback()
+            self._synced_at = None
+            report.error = str(exc)
+            logger.exception("LDAP mirror failed")
+        report.duration_ms = (time.perf_counter() - started) * 1000
+        self.last_report = report
+        logger.info("LDAP mirror: %s", report.as_dict())
+        return report
@@ -1,31 +1,88 @@
 import asyncio
 import csv
 import io
+import json
 import logging
+import re
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Union
 
-import redis.asyncio as redis
-from alembic import command
-from alembic.config import Config
-from fastapi import Depends, FastAPI, HTTPException, Query, WebSocket, WebSocketDisconnect
+from anyio import from_thread
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
 from jose import JWTError
-from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, StreamingResponse
-from fastapi.staticfiles import StaticFiles
-from sqlalchemy import func, inspect, or_, text
-from sqlalchemy.exc import OperationalError
+from fastapi.responses import (
+    FileResponse,
+    HTMLResponse,
+    JSONResponse,
+    Response,
+    StreamingResponse,
+)
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import func, inspect, select, text
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.auth import auth_service, get_current_user, require_role
+from app.auth import (
+    PasswordHasherBusy,
+    auth_service,
+    get_current_user,
+    get_current_user_async,
+    issue_tokens,
+    login_throttle,
+    password_hasher,
+    refresh_tokens,
+    require_role,
+    revoke_refresh_token,
+    revoke_refresh_tokens,
+    user_cache,
+    user_changed_event,
+)
+from app.calls import (
+    calls_query,
+    compute_dashboard_hourly_async,
+    compute_dashboard_summary_async,
+    compute_dashboard_timeseries_async,
+    enrich_calls_async,
+)
+from app.compression import CompressionMiddleware, PrecompressedStaticFiles
 from app.config import settings
-from app.database import Base, SessionLocal, engine, get_db
+from app.database import (
+    AsyncSessionLocal,
+    Base,
+    SessionLocal,
+    async_engine,
+    engine,
+    get_async_read_db,
+    get_db,
+    read_engine,
+    read_router,
+)
+from app.event_bus import create_event_bus
+from app.events import (
+    RESYNC_REQUIRED,
+    Connection,
+    WebSocketConnection,
+    connections,
+    is_stale,
+    parse_topics,
+)
+from app.ingest import verify_ingest_signature
+from app.instrumentation import (
+    InstrumentationMiddleware,
+    instrumentation_changed_event,
+    sql_instrumentation,
+)
 from app.ldap_auth import (
     LdapAccessDenied,
     LdapAuthError,
-    ldap_config_from_settings,
+    LdapConfig,
+    get_or_create_ldap_settings,
     ldap_service,
 )
+from app.ldap_mirror import LdapMirror, LdapMirrorReport
 from app.models import (
     CallRecord,
     LdapSettings,
@@ -42,6 +99,7 @@ from app.schemas import (
     ChangePasswordRequest,
     DashboardSummary,
     HourlyPoint,
+    InstrumentationSettings,
     LdapDiagnosticRequest,
     LdapSettingsIn,
     LdapSettingsOut,
@@ -49,8 +107,12 @@ from app.schemas import (
     MeResponse,
     OvhSettingsIn,
     OvhSettingsOut,
+    RefreshTokenRequest,
+    TeamBoardChanges,
+    TeamLeadBulkResult,
     TeamLeadIn,
     TeamLeadCategoryIn,
+    TeamLeadCategoryOrder,
     TeamLeadCategoryOut,
     TeamLeadCategoryUpdate,
     TeamLeadCounterUpdate,
@@ -62,43 +124,113 @@ from app.schemas import (
     UserOut,
     UserUpdate,
 )
-from app.sync import SyncWorker, extract_status, get_settings, get_sync_range, sync_consumptions
+from app.recent_calls import RecentCallsCache
+from app.settings_cache import (
+    LDAP as LDAP_SETTINGS,
+    OVH as OVH_SETTINGS,
+    settings_cache,
+    settings_changed_event,
+)
+from app.snapshots import SNAPSHOT_FIELDS, SnapshotCache
+from app.team_board import (
+    CATEGORY as DELETED_CATEGORY,
+    LEAD as DELETED_LEAD,
+    next_board_version,
+    parse_bulk_rows,
+    record_deletions,
+    team_board_changes,
+    upsert_team_leads,
+)
+from app.sync import (
+    SyncWorker,
+    calls_changed_event,
+    extract_status,
+    get_settings,
+    get_sync_range,
+    ingest_payloads,
+    sync_consumptions,
+)
 
 app = FastAPI(title="Secours Calls Dashboard")
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_minimum_size)
+app.add_middleware(InstrumentationMiddleware)
 
 logger = logging.getLogger(__name__)
 
-redis_client: Optional[redis.Redis] = None
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many password checks in progress, retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
 queue: asyncio.Queue = asyncio.Queue()
 worker: Optional[SyncWorker] = None
 scheduler_task: Optional[asyncio.Task] = None
 worker_task: Optional[asyncio.Task] = None
+ldap_mirror_task: Optional[asyncio.Task] = None
+warm_up_task: Optional[asyncio.Task] = None
+startup_report: dict = {}
+ldap_mirror = LdapMirror(ldap_service)
+event_bus = create_event_bus(connections)
+snapshots = SnapshotCache(SessionLocal)
+connections.listeners.append(snapshots.on_event)
+recent_calls = RecentCallsCache(settings.recent_calls_size, AsyncSessionLocal)
+connections.listeners.append(recent_calls.on_event)
+connections.listeners.append(user_cache.on_event)
+connections.listeners.append(settings_cache.on_event)
+connections.listeners.append(sql_instrumentation.on_event)
+
+SSE_RETRY_MILLISECONDS = 3000
 
 
 @app.on_event("startup")
 async def on_startup() -> None:
+    global worker, scheduler_task, worker_task, ldap_mirror_task, warm_up_task
+    started = time.perf_counter()
+
+    def mark(phase: str) -> None:
+        startup_report[phase] = round((time.perf_counter() - started) * 1000, 1)
+
     await wait_for_database()
-    run_migrations()
-    Base.metadata.create_all(bind=engine)
+    mark("database_ms")
+    if schema_is_current():
+        startup_report["migrations"] = "skipped"
+    else:
+        run_migrations()
+        Base.metadata.create_all(bind=engine)
+        startup_report["migrations"] = "applied"
+    mark("schema_ms")
     bootstrap_admin()
-    global redis_client, worker, scheduler_task, worker_task
-    redis_client = redis.from_url(settings.redis_url, decode_responses=True)
-    worker = SyncWorker(queue, SessionLocal, publish_event)
+    await event_bus.start()
+    worker = SyncWorker(queue, SessionLocal, event_bus.publish)
     worker_task = asyncio.create_task(worker.run())
     scheduler_task = asyncio.create_task(run_scheduler())
+    if settings.ldap_mirror_interval_seconds > 0:
+        ldap_mirror_task = asyncio.create_task(run_ldap_mirror())
+    mark("startup_ms")
+    logger.info("Startup finished: %s", startup_report)
+    warm_up_task = asyncio.create_task(warm_up())
 
 
 @app.on_event("shutdown")
 async def on_shutdown() -> None:
-    global redis_client, worker, scheduler_task, worker_task
     if scheduler_task:
         scheduler_task.cancel()
+    if ldap_mirror_task:
+        ldap_mirror_task.cancel()
+    if warm_up_task:
+        warm_up_task.cancel()
     if worker:
         worker.stop()
     if worker_task:
         worker_task.cancel()
-    if redis_client:
-        await redis_client.close()
+    await event_bus.stop()
+    await async_engine.dispose()
+    if read_engine:
+        await read_engine.dispose()
 
 
 async def wait_for_database(max_attempts: int = 8, delay_seconds: float = 1.5) -> None:
@@ -127,6 +259,32 @@ async def wait_for_database(max_attempts: int = 8, delay_seconds: float = 1.5) -
             delay = min(delay * 1.5, 10.0)
 
 
+def warm_caches() -> None:
+    db = SessionLocal()
+    try:
+        recent_calls.warm(db)
+        settings_cache.ovh_client(db)
+        settings_cache.ldap_config(db)
+    finally:
+        db.close()
+
+
+async def warm_up() -> None:
+    """Fill the in-memory caches while the server already accepts requests.
+
+    Requests arriving first fill the same caches on demand, so this only
+    moves the cost of the first dashboard loads off the users.
+    """
+    started = time.perf_counter()
+    try:
+        await run_in_threadpool(warm_caches)
+        await snapshots.get(set(SNAPSHOT_FIELDS))
+    except Exception:
+        logger.exception("Cache warm-up failed")
+    startup_report["warm_up_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    logger.info("Caches warmed in %.0f ms", startup_report["warm_up_ms"])
+
+
 def bootstrap_admin() -> None:
     db = SessionLocal()
     try:
@@ -145,30 +303,6 @@ def bootstrap_admin() -> None:
         db.close()
 
 
-def get_or_create_ldap_settings(db: Session) -> LdapSettings:
-    settings_row = db.query(LdapSettings).first()
-    if settings_row:
-        return settings_row
-    config = ldap_config_from_settings()
-    settings_row = LdapSettings(
-        enabled=config.enabled,
-        url=config.url,
-        bind_dn=config.bind_dn,
-        bind_password=config.bind_password,
-        user_base_dn=config.user_base_dn,
-        user_filter=config.user_filter,
-        group_base_dn=config.group_base_dn,
-        group_filter=config.group_filter,
-        group_name_attr=config.group_name_attr,
-        group_required=config.group_required,
-        group_role_map=config.group_role_map,
-    )
-    db.add(settings_row)
-    db.commit()
-    db.refresh(settings_row)
-    return settings_row
-
-
 def ldap_settings_response(settings_row: LdapSettings) -> LdapSettingsOut:
     return LdapSettingsOut(
         enabled=settings_row.enabled,
@@ -185,8 +319,45 @@ def ldap_settings_response(settings_row: LdapSettings) -> LdapSettingsOut:
     )
 
 
+ALEMBIC_DIR = Path(__file__).resolve().parents[1] / "alembic"
+REVISION_PATTERN = re.compile(r'^(revision|down_revision)\s*=\s*(?:"([^"]*)"|None)', re.MULTILINE)
+
+
+def script_heads() -> set[str]:
+    """Read the head revisions from the migration files without loading Alembic.
+
+    Returns an empty set, which never matches the database, if a file does
+    not declare its revisions in the usual form.
+    """
+    revisions: set[str] = set()
+    parents: set[str] = set()
+    for path in (ALEMBIC_DIR / "versions").glob("*.py"):
+        declared = dict(REVISION_PATTERN.findall(path.read_text()))
+        if not declared.get("revision"):
+            return set()
+        revisions.add(declared["revision"])
+        if declared.get("down_revision"):
+            parents.add(declared["down_revision"])
+    return revisions - parents
+
+
+def schema_is_current() -> bool:
+    """Tell, in one query, whether the database is already at the migration head."""
+    try:
+        with engine.connect() as connection:
+            rows = connection.execute(text("SELECT version_num FROM alembic_version"))
+            applied = set(rows.scalars())
+    except DBAPIError:
+        return False
+    heads = script_heads()
+    return bool(heads) and applied == heads
+
+
 def run_migrations() -> None:
-    alembic_ini = Path(__file__).resolve().parents[1] / "alembic.ini"
+    from alembic import command
+    from alembic.config import Config
+
+    alembic_ini = ALEMBIC_DIR.parent / "alembic.ini"
     config = Config(str(alembic_ini))
     config.set_main_option("sqlalchemy.url", settings.database_url)
     ovh_columns: set[str] = set()
@@ -256,9 +427,49 @@ def ensure_users_schema() -> None:
         connection.commit()
 
 
-async def publish_event(payload: dict) -> None:
-    if redis_client:
-        await redis_client.publish("events", JSONResponse(content=payload).body.decode())
+async def notify_user_changed(username: str) -> None:
+    """Drop the cached user here and, through the event bus, in other processes."""
+    user_cache.invalidate(username)
+    await event_bus.publish(user_changed_event(username))
+
+
+async def notify_settings_changed(kind: str, version: int) -> None:
+    settings_cache.invalidate(kind)
+    await event_bus.publish(settings_changed_event(kind, version))
+
+
+def team_leads_event(
+    version: int, leads: List[TeamLead] = (), deleted_ids: List[int] = ()
+) -> dict:
+    """``version`` is the board version of the change: a client holding
+    ``version - 1`` applies the payload, any other fetches
+    /team-leads?since=<its version>."""
+    return {
+        "type": "team_leads_updated",
+        "payload": {
+            "version": version,
+            "team_leads": [
+                TeamLeadOut.model_validate(lead).model_dump(mode="json") for lead in leads
+            ],
+            "deleted_ids": list(deleted_ids),
+        },
+    }
+
+
+def team_lead_categories_event(
+    version: int, categories: List[TeamLeadCategory] = (), deleted_ids: List[int] = ()
+) -> dict:
+    return {
+        "type": "team_lead_categories_updated",
+        "payload": {
+            "version": version,
+            "categories": [
+                TeamLeadCategoryOut.model_validate(category).model_dump(mode="json")
+                for category in categories
+            ],
+            "deleted_ids": list(deleted_ids),
+        },
+    }
 
 
 async def run_scheduler() -> None:
@@ -267,24 +478,76 @@ async def run_scheduler() -> None:
         await asyncio.sleep(settings.sync_interval_seconds)
 
 
-@app.post("/auth/login", response_model=TokenResponse)
-def login(data: LoginRequest, db: Session = Depends(get_db)) -> TokenResponse:
-    user = db.query(User).filter(User.username == data.username).first()
-    user_source = user.source if user else None
-    if user and (user_source is None or user_source == UserSource.LOCAL):
-        if not user.password_hash or not auth_service.verify_password(
-            data.password, user.password_hash
-        ):
-            raise HTTPException(status_code=401, detail="Invalid credentials")
-        token = auth_service.create_access_token(user.username, user.role.value)
-        return TokenResponse(access_token=token)
+def mirror_ldap_directory() -> Optional[LdapMirrorReport]:
+    db = SessionLocal()
+    try:
+        config = settings_cache.ldap_config(db)
+        if not ldap_service.is_enabled(config):
+            return None
+        return ldap_mirror.run(db, config)
+    finally:
+        db.close()
+
+
+async def run_ldap_mirror() -> None:
+    while True:
+        report = await run_in_threadpool(mirror_ldap_directory)
+        for username in report.changed_usernames if report else []:
+            await notify_user_changed(username)
+        await asyncio.sleep(settings.ldap_mirror_interval_seconds)
+
 
-    if user and user_source != UserSource.LDAP:
+def client_ip(request: Request) -> Optional[str]:
+    return request.client.host if request.client else None
+
+
+def ldap_mirror_is_current(config: LdapConfig) -> bool:
+    interval = settings.ldap_mirror_interval_seconds
+    return interval > 0 and ldap_mirror.is_current(config, timedelta(seconds=interval))
+
+
+def local_account(db: Session, username: str) -> Optional[tuple[str, Role, Optional[str]]]:
+    """The name, role and password hash of a local account, None for any other login."""
+    user = db.query(User).filter(User.username == username).first()
+    if not user or user.source not in (None, UserSource.LOCAL):
+        return None
+    account = user.username, user.role, user.password_hash
+    # Hand the connection back to the pool while Argon2 runs.
+    db.rollback()
+    return account
+
+
+def store_password_hash(db: Session, username: str, password_hash: str) -> None:
+    db.query(User).filter(User.username == username).update({User.password_hash: password_hash})
+    db.commit()
+
+
+def authenticate_directory_login(data: LoginRequest, db: Session) -> tuple[str, Role, bool]:
+    """Check a login without a local account against LDAP.
+
+    Returns the user name, the role and whether the user row changed.
+    """
+    user = db.query(User).filter(User.username == data.username).first()
+    if user and user.source != UserSource.LDAP:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    ldap_config = settings_cache.ldap_config(db)
+    mirrored = user and user.ldap_dn and not user.ldap_removed_at
+    if mirrored and ldap_mirror_is_current(ldap_config):
+        # The mirror checked the required group less than an interval ago,
+        # so only the password bind is left; see LdapMirror.
+        username, role, user_dn = user.username, user.role, user.ldap_dn
+        db.rollback()
+        if not ldap_service.is_enabled(ldap_config):
+            raise HTTPException(status_code=401, detail="Invalid credentials")
+        try:
+            ldap_service.verify_password(ldap_config, user_dn, data.password)
+        except LdapAuthError:
+            raise HTTPException(status_code=401, detail="Invalid credentials")
+        return username, role, False
+
     try:
-        ldap_settings = get_or_create_ldap_settings(db)
-        ldap_config = ldap_config_from_settings(ldap_settings)
+        db.rollback()
         ldap_user = ldap_service.authenticate(ldap_config, data.username, data.password)
     except LdapAccessDenied:
         raise HTTPException(status_code=403, detail="LDAP access denied")
@@ -296,6 +559,7 @@ def login(data: LoginRequest, db: Session = Depends(get_db)) -> TokenResponse:
         if user and user.source != UserSource.LDAP:
             raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    changed = False
     if not user:
         user = User(
             username=ldap_user.username,
@@ -303,35 +567,118 @@ def login(data: LoginRequest, db: Session = Depends(get_db)) -> TokenResponse:
             role=ldap_user.role,
             must_change_password=False,
             source=UserSource.LDAP,
+            ldap_dn=ldap_user.dn,
         )
         db.add(user)
     else:
+        changed = (
+            user.role != ldap_user.role
+            or user.must_change_password
+            or user.ldap_removed_at is not None
+        )
         user.role = ldap_user.role
         user.must_change_password = False
         user.source = UserSource.LDAP
+        user.ldap_dn = ldap_user.dn
+        user.ldap_removed_at = None
     db.commit()
     db.refresh(user)
-    token = auth_service.create_access_token(user.username, user.role.value)
-    return TokenResponse(access_token=token)
+    return user.username, user.role, changed
 
 
-@app.post("/auth/change-password", response_model=MeResponse)
-def change_password(
-    data: ChangePasswordRequest,
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-) -> MeResponse:
+async def authenticate_login(data: LoginRequest, db: Session) -> tuple[str, Role]:
+    """Argon2 is awaited on the loop; database and LDAP calls run in the threadpool."""
+    account = await run_in_threadpool(local_account, db, data.username)
+    if account is None:
+        username, role, changed = await run_in_threadpool(
+            authenticate_directory_login, data, db
+        )
+        if changed:
+            await notify_user_changed(username)
+        return username, role
+
+    username, role, password_hash = account
+    if not password_hash or not await password_hasher.verify(data.password, password_hash):
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    if auth_service.needs_rehash(password_hash):
+        new_hash = await password_hasher.hash(data.password)
+        await run_in_threadpool(store_password_hash, db, username, new_hash)
+    return username, role
+
+
+@app.post("/auth/login", response_model=TokenResponse)
+async def login(
+    data: LoginRequest, request: Request, db: Session = Depends(get_db)
+) -> TokenResponse:
+    ip = client_ip(request)
+    retry_after = login_throttle.retry_after(data.username, ip)
+    if retry_after:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many login attempts",
+            headers={"Retry-After": str(retry_after)},
+        )
+    try:
+        username, role = await authenticate_login(data, db)
+    except HTTPException as exc:
+        if exc.status_code == 401:
+            login_throttle.record_failure(data.username, ip)
+        raise
+    login_throttle.reset(data.username)
+    return await run_in_threadpool(issue_tokens, db, username, role)
+
+
+@app.post("/auth/refresh", response_model=TokenResponse)
+def refresh(data: RefreshTokenRequest, db: Session = Depends(get_db)) -> TokenResponse:
+    return refresh_tokens(db, data.refresh_token)
+
+
+@app.post("/auth/logout")
+def logout(data: RefreshTokenRequest, db: Session = Depends(get_db)) -> dict:
+    revoke_refresh_token(db, data.refresh_token)
+    return {"status": "ok"}
+
+
+def local_password_hash(db: Session, user_id: int) -> str:
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
     if user.source == UserSource.LDAP:
         raise HTTPException(status_code=400, detail="LDAP password is managed externally")
     if not user.password_hash:
         raise HTTPException(status_code=400, detail="Local password is not set")
-    if not auth_service.verify_password(data.current_password, user.password_hash):
-        raise HTTPException(status_code=400, detail="Invalid current password")
-    user.password_hash = auth_service.hash_password(data.new_password)
+    password_hash = user.password_hash
+    # Hand the connection back to the pool while Argon2 runs.
+    db.rollback()
+    return password_hash
+
+
+def store_new_password(db: Session, user_id: int, password_hash: str) -> TokenResponse:
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+    user.password_hash = password_hash
     user.must_change_password = False
     db.commit()
-    db.refresh(user)
-    return MeResponse.model_validate(user)
+    # Other sessions must sign in again with the new password; this one
+    # carries on with the tokens returned here.
+    revoke_refresh_tokens(db, user.username)
+    return issue_tokens(db, user.username, user.role)
+
+
+@app.post("/auth/change-password", response_model=TokenResponse)
+async def change_password(
+    data: ChangePasswordRequest,
+    current_user: User = Depends(get_current_user_async),
+    db: Session = Depends(get_db),
+) -> TokenResponse:
+    password_hash = await run_in_threadpool(local_password_hash, db, current_user.id)
+    if not await password_hasher.verify(data.current_password, password_hash):
+        raise HTTPException(status_code=400, detail="Invalid current password")
+    new_hash = await password_hasher.hash(data.new_password)
+    tokens = await run_in_threadpool(store_new_password, db, current_user.id, new_hash)
+    await notify_user_changed(current_user.username)
+    return tokens
 
 
 @app.get("/me", response_model=MeResponse)
@@ -339,56 +686,8 @@ def me(user: User = Depends(get_current_user)) -> MeResponse:
     return MeResponse.model_validate(user)
 
 
-def build_number_search_patterns(value: str) -> List[str]:
-    digits = "".join(char for char in value if char.isdigit())
-    if not digits:
-        return []
-    patterns = {digits}
-    trimmed = digits.lstrip("0")
-    if trimmed:
-        patterns.add(trimmed)
-        patterns.add(f"33{trimmed}")
-        patterns.add(f"0033{trimmed}")
-    if digits.startswith("33") and not digits.startswith("0033") and len(digits) > 2:
-        rest = digits[2:]
-        patterns.add(f"0{rest}")
-        patterns.add(f"0033{rest}")
-    if digits.startswith("0033") and len(digits) > 4:
-        rest = digits[4:]
-        patterns.add(f"0{rest}")
-        patterns.add(f"33{rest}")
-    return sorted(patterns, key=len, reverse=True)
-
-
-def build_number_variants(value: Optional[str]) -> List[str]:
-    if not value:
-        return []
-    digits = "".join(char for char in value if char.isdigit())
-    if not digits:
-        return []
-    variants = set(build_number_search_patterns(digits))
-    variants.add(digits)
-    return sorted(variants, key=len, reverse=True)
-
-
-def build_team_lead_index(leads: List[TeamLead]) -> dict:
-    index: dict[str, TeamLead] = {}
-    for lead in leads:
-        for variant in build_number_variants(lead.phone):
-            index.setdefault(variant, lead)
-    return index
-
-
-def match_team_lead(number: Optional[str], index: dict) -> Optional[TeamLead]:
-    for variant in build_number_variants(number):
-        lead = index.get(variant)
-        if lead:
-            return lead
-    return None
-
-
 @app.get("/calls", response_model=List[CallRecordOut])
-def list_calls(
+async def list_calls(
     page: int = Query(1, ge=1),
     page_size: int = Query(25, ge=1, le=100),
     direction: Optional[CallDirection] = None,
@@ -397,79 +696,46 @@ def list_calls(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     export: Optional[str] = None,
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    query = db.query(CallRecord)
-    if direction:
-        query = query.filter(CallRecord.direction == direction)
-    if missed is not None:
-        query = query.filter(CallRecord.is_missed == missed)
-    if number:
-        patterns = build_number_search_patterns(number)
-        if patterns:
-            normalized_calling = func.regexp_replace(CallRecord.calling_number, r"\D", "", "g")
-            normalized_called = func.regexp_replace(CallRecord.called_number, r"\D", "", "g")
-            conditions = []
-            for pattern in patterns:
-                conditions.append(normalized_calling.like(f"%{pattern}%"))
-                conditions.append(normalized_called.like(f"%{pattern}%"))
-            query = query.filter(or_(*conditions))
-        else:
-            query = query.filter(
-                (CallRecord.calling_number.ilike(f"%{number}%"))
-                | (CallRecord.called_number.ilike(f"%{number}%"))
-            )
-    if start_date:
-        query = query.filter(CallRecord.started_at >= parse_date_input(start_date))
-    if end_date:
-        query = query.filter(CallRecord.started_at <= parse_date_input(end_date, end_of_day=True))
-    query = query.order_by(CallRecord.started_at.desc())
+    unfiltered = not any((direction, missed is not None, number, start_date, end_date, export))
+    if page == 1 and unfiltered:
+        cached = await recent_calls.first_page(page_size)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
+    query = calls_query(
+        direction=direction,
+        missed=missed,
+        number=number,
+        start=parse_date_input(start_date) if start_date else None,
+        end=parse_date_input(end_date, end_of_day=True) if end_date else None,
+    )
     if export == "csv":
         if user.role != Role.ADMIN:
             raise HTTPException(status_code=403, detail="Not authorized")
-        return export_calls_csv(query)
-    items = query.offset((page - 1) * page_size).limit(page_size).all()
-    leads = db.query(TeamLead).all()
-    lead_index = build_team_lead_index(leads)
-    enriched_calls = []
-    for item in items:
-        calling_lead = match_team_lead(item.calling_number, lead_index)
-        called_lead = match_team_lead(item.called_number, lead_index)
-        payload = CallRecordOut.model_validate(item).model_dump()
-        if calling_lead:
-            payload.update(
-                {
-                    "calling_team_name": calling_lead.team_name,
-                    "calling_leader_first_name": calling_lead.leader_first_name,
-                }
-            )
-        if called_lead:
-            payload.update(
-                {
-                    "called_team_name": called_lead.team_name,
-                    "called_leader_first_name": called_lead.leader_first_name,
-                }
-            )
-        enriched_calls.append(CallRecordOut(**payload))
-    return enriched_calls
+        return export_calls_csv((await db.execute(query.with_only_columns(*CSV_COLUMNS))).all())
+    items = (await db.execute(query.offset((page - 1) * page_size).limit(page_size))).scalars()
+    return await enrich_calls_async(db, list(items))
+
+
+# The export never needs raw_payload, by far the largest column.
+CSV_COLUMNS = (
+    CallRecord.started_at,
+    CallRecord.direction,
+    CallRecord.calling_number,
+    CallRecord.called_number,
+    CallRecord.duration,
+    CallRecord.status,
+    CallRecord.is_missed,
+)
 
 
-def export_calls_csv(query):
+def export_calls_csv(records) -> Response:
     output = io.StringIO()
     writer = csv.writer(output)
-    writer.writerow(
-        [
-            "started_at",
-            "direction",
-            "calling_number",
-            "called_number",
-            "duration",
-            "status",
-            "is_missed",
-        ]
-    )
-    for record in query.all():
+    writer.writerow([column.key for column in CSV_COLUMNS])
+    for record in records:
         writer.writerow(
             [
                 record.started_at.isoformat(),
@@ -481,9 +747,9 @@ def export_calls_csv(query):
                 record.is_missed,
             ]
         )
-    output.seek(0)
-    return StreamingResponse(
-        output,
+    # One body rather than StreamingResponse over the buffer, which sent every line separately.
+    return Response(
+        content=output.getvalue(),
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=calls.csv"},
     )
@@ -499,137 +765,55 @@ def parse_date_input(value: str, end_of_day: bool = False) -> datetime:
 
 
 @app.get("/dashboard/summary", response_model=DashboardSummary)
-def dashboard_summary(
-    user: User = Depends(get_current_user), db: Session = Depends(get_db)
+async def dashboard_summary(
+    user: User = Depends(get_current_user_async), db: AsyncSession = Depends(get_async_read_db)
 ) -> DashboardSummary:
-    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    week_start = datetime.utcnow() - timedelta(days=7)
-    today_base_query = db.query(CallRecord).filter(CallRecord.started_at >= today_start)
-    week_base_query = db.query(CallRecord).filter(CallRecord.started_at >= week_start)
-    today_total = (
-        today_base_query.with_entities(func.count(CallRecord.id)).scalar()
-    )
-    today_missed = (
-        today_base_query.with_entities(func.count(CallRecord.id))
-        .filter(CallRecord.is_missed.is_(True))
-        .scalar()
-    )
-    week_total = (
-        week_base_query.with_entities(func.count(CallRecord.id)).scalar()
-    )
-    week_missed = (
-        week_base_query.with_entities(func.count(CallRecord.id))
-        .filter(CallRecord.is_missed.is_(True))
-        .scalar()
-    )
-    today_inbound = (
-        today_base_query.with_entities(func.count(CallRecord.id))
-        .filter(CallRecord.direction == CallDirection.INBOUND)
-        .scalar()
-    )
-    today_outbound = (
-        today_base_query.with_entities(func.count(CallRecord.id))
-        .filter(CallRecord.direction == CallDirection.OUTBOUND)
-        .scalar()
-    )
-    week_inbound = (
-        week_base_query.with_entities(func.count(CallRecord.id))
-        .filter(CallRecord.direction == CallDirection.INBOUND)
-        .scalar()
-    )
-    week_outbound = (
-        week_base_query.with_entities(func.count(CallRecord.id))
-        .filter(CallRecord.direction == CallDirection.OUTBOUND)
-        .scalar()
-    )
-    today_avg_duration = today_base_query.with_entities(func.avg(CallRecord.duration)).scalar()
-    week_avg_duration = week_base_query.with_entities(func.avg(CallRecord.duration)).scalar()
-    return DashboardSummary(
-        today_total=today_total or 0,
-        today_missed=today_missed or 0,
-        week_total=week_total or 0,
-        week_missed=week_missed or 0,
-        today_inbound=today_inbound or 0,
-        today_outbound=today_outbound or 0,
-        week_inbound=week_inbound or 0,
-        week_outbound=week_outbound or 0,
-        today_avg_duration=int(round(today_avg_duration or 0)),
-        week_avg_duration=int(round(week_avg_duration or 0)),
-    )
+    return await compute_dashboard_summary_async(db)
 
 
 @app.get("/dashboard/timeseries", response_model=List[TimeseriesPoint])
-def dashboard_timeseries(
+async def dashboard_timeseries(
     days: int = Query(7, ge=1, le=30),
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-):
-    start_date = (datetime.utcnow() - timedelta(days=days - 1)).date()
-    start = datetime.combine(start_date, datetime.min.time())
-    results = (
-        db.query(func.date(CallRecord.started_at), func.count(CallRecord.id))
-        .filter(CallRecord.started_at >= start)
-        .group_by(func.date(CallRecord.started_at))
-        .all()
-    )
-    missed = (
-        db.query(func.date(CallRecord.started_at), func.count(CallRecord.id))
-        .filter(CallRecord.started_at >= start, CallRecord.is_missed.is_(True))
-        .group_by(func.date(CallRecord.started_at))
-        .all()
-    )
-    totals = {str(row[0]): row[1] for row in results}
-    missed_map = {str(row[0]): row[1] for row in missed}
-    points = []
-    for i in range(days):
-        date_value = start_date + timedelta(days=i)
-        key = str(date_value)
-        points.append(
-            TimeseriesPoint(
-                date=key, total=totals.get(key, 0), missed=missed_map.get(key, 0)
-            )
-        )
-    return points
+    user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> List[TimeseriesPoint]:
+    return await compute_dashboard_timeseries_async(db, days)
 
 
 @app.get("/dashboard/hourly", response_model=List[HourlyPoint])
-def dashboard_hourly(
-    user: User = Depends(get_current_user), db: Session = Depends(get_db)
+async def dashboard_hourly(
+    user: User = Depends(get_current_user_async), db: AsyncSession = Depends(get_async_read_db)
 ) -> List[HourlyPoint]:
-    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    tomorrow_start = today_start + timedelta(days=1)
-    results = (
-        db.query(func.extract("hour", CallRecord.started_at), func.count(CallRecord.id))
-        .filter(CallRecord.started_at >= today_start, CallRecord.started_at < tomorrow_start)
-        .group_by(func.extract("hour", CallRecord.started_at))
-        .all()
+    return await compute_dashboard_hourly_async(db)
+
+
+@app.get("/team-leads", response_model=Union[List[TeamLeadOut], TeamBoardChanges])
+async def list_team_leads(
+    since: Optional[int] = Query(None, ge=0),
+    user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> Union[List[TeamLeadOut], TeamBoardChanges]:
+    """Every team lead or, with ``since``, the board changes after that version."""
+    if since is not None:
+        return await team_board_changes(db, since)
+    leads = await db.execute(
+        select(TeamLead).order_by(TeamLead.team_name, TeamLead.leader_last_name)
     )
-    totals = {int(row[0]): row[1] for row in results}
-    return [HourlyPoint(hour=hour, total=totals.get(hour, 0)) for hour in range(24)]
-
-
-@app.get("/team-leads", response_model=List[TeamLeadOut])
-def list_team_leads(
-    user: User = Depends(get_current_user), db: Session = Depends(get_db)
-) -> List[TeamLeadOut]:
-    leads = db.query(TeamLead).order_by(TeamLead.team_name, TeamLead.leader_last_name).all()
-    return [TeamLeadOut.model_validate(lead) for lead in leads]
+    return [TeamLeadOut.model_validate(lead) for lead in leads.scalars()]
 
 
 @app.get("/team-lead-categories", response_model=List[TeamLeadCategoryOut])
-def list_team_lead_categories(
-    user: User = Depends(get_current_user), db: Session = Depends(get_db)
+async def list_team_lead_categories(
+    user: User = Depends(get_current_user_async), db: AsyncSession = Depends(get_async_read_db)
 ) -> List[TeamLeadCategoryOut]:
-    categories = (
-        db.query(TeamLeadCategory)
-        .order_by(TeamLeadCategory.position, TeamLeadCategory.name)
-        .all()
+    categories = await db.execute(
+        select(TeamLeadCategory).order_by(TeamLeadCategory.position, TeamLeadCategory.name)
     )
-    return [TeamLeadCategoryOut.model_validate(category) for category in categories]
+    return [TeamLeadCategoryOut.model_validate(category) for category in categories.scalars()]
 
 
 @app.post("/team-lead-categories", response_model=TeamLeadCategoryOut)
-async def create_team_lead_category(
+def create_team_lead_category(
     data: TeamLeadCategoryIn, user: User = Depends(get_current_user), db: Session = Depends(get_db)
 ) -> TeamLeadCategoryOut:
     existing = (
@@ -644,19 +828,53 @@ async def create_team_lead_category(
         position = data.position
     category = TeamLeadCategory(name=data.name, position=position)
     db.add(category)
+    category.version = next_board_version(db)
     db.commit()
     db.refresh(category)
-    await publish_event({"type": "team_lead_categories_updated"})
+    from_thread.run(event_bus.publish, team_lead_categories_event(category.version, [category]))
     return TeamLeadCategoryOut.model_validate(category)
 
 
+# Declared before /team-lead-categories/{category_id}, which would match "order".
+@app.patch("/team-lead-categories/order", response_model=List[TeamLeadCategoryOut])
+def reorder_team_lead_categories(
+    data: TeamLeadCategoryOrder,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> List[TeamLeadCategoryOut]:
+    # Taken first: the board lock keeps concurrent writes out until commit.
+    version = next_board_version(db)
+    categories = {category.id: category for category in db.query(TeamLeadCategory).all()}
+    if len(data.ids) != len(set(data.ids)) or set(data.ids) != set(categories):
+        raise HTTPException(status_code=400, detail="Expected every category id exactly once")
+    ordered = [categories[category_id] for category_id in data.ids]
+    changed = [
+        category
+        for position, category in enumerate(ordered, start=1)
+        if category.position != position
+    ]
+    if not changed:
+        return [TeamLeadCategoryOut.model_validate(category) for category in ordered]
+    for position, category in enumerate(ordered, start=1):
+        category.position = position
+    for category in changed:
+        category.version = version
+    response = [TeamLeadCategoryOut.model_validate(category) for category in ordered]
+    event = team_lead_categories_event(version, changed)
+    db.commit()
+    from_thread.run(event_bus.publish, event)
+    return response
+
+
 @app.patch("/team-lead-categories/{category_id}", response_model=TeamLeadCategoryOut)
-async def update_team_lead_category(
+def update_team_lead_category(
     category_id: int,
     data: TeamLeadCategoryUpdate,
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> TeamLeadCategoryOut:
+    # Taken first: the board lock keeps concurrent writes out until commit.
+    version = next_board_version(db)
     category = db.query(TeamLeadCategory).filter(TeamLeadCategory.id == category_id).first()
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
@@ -670,16 +888,17 @@ async def update_team_lead_category(
         )
         if duplicate:
             raise HTTPException(status_code=400, detail="Category already exists")
+    category.version = version
     for field, value in updates.items():
         setattr(category, field, value)
     db.commit()
     db.refresh(category)
-    await publish_event({"type": "team_lead_categories_updated"})
+    from_thread.run(event_bus.publish, team_lead_categories_event(category.version, [category]))
     return TeamLeadCategoryOut.model_validate(category)
 
 
 @app.delete("/team-lead-categories/{category_id}")
-async def delete_team_lead_category(
+def delete_team_lead_category(
     category_id: int, user: User = Depends(get_current_user), db: Session = Depends(get_db)
 ) -> dict:
     category = db.query(TeamLeadCategory).filter(TeamLeadCategory.id == category_id).first()
@@ -694,13 +913,16 @@ async def delete_team_lead_category(
             detail="Impossible de supprimer une catégorie utilisée par un chef d'équipe.",
         )
     db.delete(category)
+    version = next_board_version(db)
+    record_deletions(db, DELETED_CATEGORY, [category_id], version)
     db.commit()
-    await publish_event({"type": "team_lead_categories_updated"})
+    event = team_lead_categories_event(version, deleted_ids=[category_id])
+    from_thread.run(event_bus.publish, event)
     return {"status": "deleted"}
 
 
 @app.post("/team-leads", response_model=TeamLeadOut)
-async def create_team_lead(
+def create_team_lead(
     data: TeamLeadIn, user: User = Depends(get_current_user), db: Session = Depends(get_db)
 ) -> TeamLeadOut:
     if data.category_id is not None:
@@ -720,19 +942,62 @@ async def create_team_lead(
         category_id=data.category_id,
     )
     db.add(lead)
+    lead.version = next_board_version(db)
     db.commit()
     db.refresh(lead)
-    await publish_event({"type": "team_leads_updated"})
+    from_thread.run(event_bus.publish, team_leads_event(lead.version, [lead]))
     return TeamLeadOut.model_validate(lead)
 
 
+def bulk_upsert(db: Session, body: bytes, content_type: str) -> tuple[TeamLeadBulkResult, dict]:
+    """Parse, apply and commit a bulk request; return the response and its event."""
+    items = parse_bulk_rows(body, content_type)
+    if not items:
+        raise HTTPException(status_code=422, detail="Expected at least one team lead")
+    if len(items) > settings.team_lead_bulk_max:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.team_lead_bulk_max} team leads per request",
+        )
+    # Taken first: the board lock keeps concurrent writes out until commit.
+    version = next_board_version(db)
+    leads, created = upsert_team_leads(db, items)
+    for lead in leads:
+        lead.version = version
+    db.flush()
+    # Serialized before the commit expires the leads, which would reload each one.
+    event = team_leads_event(version, leads)
+    result = TeamLeadBulkResult(
+        version=version,
+        created=created,
+        updated=len(leads) - created,
+        team_leads=[TeamLeadOut.model_validate(lead) for lead in leads],
+    )
+    db.commit()
+    return result, event
+
+
+@app.post("/team-leads/bulk", response_model=TeamLeadBulkResult)
+async def bulk_upsert_team_leads(
+    request: Request, user: User = Depends(get_current_user), db: Session = Depends(get_db)
+) -> TeamLeadBulkResult:
+    """Create or update team leads from a JSON list or a CSV file, all or nothing."""
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+    result, event = await run_in_threadpool(bulk_upsert, db, body, content_type)
+    await event_bus.publish(event)
+    return result
+
+
 @app.patch("/team-leads/{lead_id}", response_model=TeamLeadOut)
-async def update_team_lead(
+def update_team_lead(
     lead_id: int,
     data: TeamLeadUpdate,
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> TeamLeadOut:
+    # Taken first: the board lock keeps concurrent writes out until commit.
+    version = next_board_version(db)
     lead = db.query(TeamLead).filter(TeamLead.id == lead_id).first()
     if not lead:
         raise HTTPException(status_code=404, detail="Team lead not found")
@@ -745,6 +1010,7 @@ async def update_team_lead(
         )
         if not category:
             raise HTTPException(status_code=400, detail="Category not found")
+    lead.version = version
     if "status" in updates:
         next_status = updates["status"]
         if next_status == "En intervention":
@@ -758,37 +1024,42 @@ async def update_team_lead(
         setattr(lead, field, value)
     db.commit()
     db.refresh(lead)
-    await publish_event({"type": "team_leads_updated"})
+    from_thread.run(event_bus.publish, team_leads_event(lead.version, [lead]))
     return TeamLeadOut.model_validate(lead)
 
 
 @app.post("/team-leads/{lead_id}/intervention-count", response_model=TeamLeadOut)
-async def update_team_lead_intervention_count(
+def update_team_lead_intervention_count(
     lead_id: int,
     data: TeamLeadCounterUpdate,
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> TeamLeadOut:
+    # Taken first: the board lock keeps concurrent clicks from losing counts.
+    version = next_board_version(db)
     lead = db.query(TeamLead).filter(TeamLead.id == lead_id).first()
     if not lead:
         raise HTTPException(status_code=404, detail="Team lead not found")
+    lead.version = version
     lead.intervention_count = max(0, (lead.intervention_count or 0) + data.delta)
     db.commit()
     db.refresh(lead)
-    await publish_event({"type": "team_leads_updated"})
+    from_thread.run(event_bus.publish, team_leads_event(lead.version, [lead]))
     return TeamLeadOut.model_validate(lead)
 
 
 @app.delete("/team-leads/{lead_id}")
-async def delete_team_lead(
+def delete_team_lead(
     lead_id: int, user: User = Depends(get_current_user), db: Session = Depends(get_db)
 ) -> dict:
     lead = db.query(TeamLead).filter(TeamLead.id == lead_id).first()
     if not lead:
         raise HTTPException(status_code=404, detail="Team lead not found")
     db.delete(lead)
+    version = next_board_version(db)
+    record_deletions(db, DELETED_LEAD, [lead_id], version)
     db.commit()
-    await publish_event({"type": "team_leads_updated"})
+    from_thread.run(event_bus.publish, team_leads_event(version, deleted_ids=[lead_id]))
     return {"status": "deleted"}
 
 
@@ -798,14 +1069,16 @@ def list_users(db: Session = Depends(get_db)) -> List[UserOut]:
     return [UserOut.model_validate(user) for user in users]
 
 
-@app.post("/users", response_model=UserOut, dependencies=[Depends(require_role(Role.ADMIN))])
-def create_user(data: UserCreate, db: Session = Depends(get_db)) -> UserOut:
-    existing = db.query(User).filter(User.username == data.username).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="User already exists")
+def username_taken(db: Session, username: str) -> bool:
+    taken = db.query(User.id).filter(User.username == username).first() is not None
+    db.rollback()
+    return taken
+
+
+def add_local_user(db: Session, data: UserCreate, password_hash: str) -> UserOut:
     user = User(
         username=data.username,
-        password_hash=auth_service.hash_password(data.password),
+        password_hash=password_hash,
         role=data.role,
         must_change_password=True,
     )
@@ -815,32 +1088,61 @@ def create_user(data: UserCreate, db: Session = Depends(get_db)) -> UserOut:
     return UserOut.model_validate(user)
 
 
-@app.patch(
-    "/users/{user_id}", response_model=UserOut, dependencies=[Depends(require_role(Role.ADMIN))]
-)
-def update_user(user_id: int, data: UserUpdate, db: Session = Depends(get_db)) -> UserOut:
+@app.post("/users", response_model=UserOut, dependencies=[Depends(require_role(Role.ADMIN))])
+async def create_user(data: UserCreate, db: Session = Depends(get_db)) -> UserOut:
+    if await run_in_threadpool(username_taken, db, data.username):
+        raise HTTPException(status_code=400, detail="User already exists")
+    password_hash = await password_hasher.hash(data.password)
+    return await run_in_threadpool(add_local_user, db, data, password_hash)
+
+
+def editable_user(db: Session, user_id: int, data: UserUpdate) -> User:
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    if data.role is not None:
-        user.role = data.role
-    if data.must_change_password is not None:
-        if user.source == UserSource.LDAP:
+    if user.source == UserSource.LDAP:
+        if data.must_change_password is not None:
             raise HTTPException(
                 status_code=400,
                 detail="LDAP password state is managed externally",
             )
+        if data.password:
+            raise HTTPException(status_code=400, detail="LDAP password is managed externally")
+    return user
+
+
+def apply_user_update(
+    db: Session, user_id: int, data: UserUpdate, password_hash: Optional[str]
+) -> UserOut:
+    user = editable_user(db, user_id, data)
+    if password_hash:
+        user.password_hash = password_hash
+    if data.role is not None:
+        user.role = data.role
+    if data.must_change_password is not None:
         user.must_change_password = data.must_change_password
-    if data.password:
-        if user.source == UserSource.LDAP:
-            raise HTTPException(
-                status_code=400,
-                detail="LDAP password is managed externally",
-            )
-        user.password_hash = auth_service.hash_password(data.password)
     db.commit()
     db.refresh(user)
-    return UserOut.model_validate(user)
+    response = UserOut.model_validate(user)
+    if password_hash:
+        revoke_refresh_tokens(db, user.username)
+    return response
+
+
+@app.patch(
+    "/users/{user_id}", response_model=UserOut, dependencies=[Depends(require_role(Role.ADMIN))]
+)
+async def update_user(user_id: int, data: UserUpdate, db: Session = Depends(get_db)) -> UserOut:
+    password_hash = None
+    if data.password:
+        # Turn away unknown and LDAP accounts before hashing, then hand the
+        # connection back to the pool while Argon2 runs.
+        await run_in_threadpool(editable_user, db, user_id, data)
+        await run_in_threadpool(db.rollback)
+        password_hash = await password_hasher.hash(data.password)
+    response = await run_in_threadpool(apply_user_update, db, user_id, data, password_hash)
+    await notify_user_changed(response.username)
+    return response
 
 
 @app.delete("/users/{user_id}", dependencies=[Depends(require_role(Role.ADMIN))])
@@ -854,8 +1156,11 @@ def delete_user(
         raise HTTPException(status_code=404, detail="User not found")
     if user.id == current_user.id:
         raise HTTPException(status_code=400, detail="Cannot delete your own account")
+    username = user.username
     db.delete(user)
     db.commit()
+    revoke_refresh_tokens(db, username)
+    from_thread.run(notify_user_changed, username)
     return {"status": "deleted"}
 
 
@@ -867,10 +1172,7 @@ def test_ldap_settings(
     data: LdapDiagnosticRequest | None = None, db: Session = Depends(get_db)
 ) -> dict:
     data = data or LdapDiagnosticRequest()
-    settings_row = get_or_create_ldap_settings(db)
-    checks = ldap_service.diagnose(
-        ldap_config_from_settings(settings_row), data.username, data.password
-    )
+    checks = ldap_service.diagnose(settings_cache.ldap_config(db), data.username, data.password)
     return {"ok": all(check["ok"] for check in checks), "checks": checks}
 
 
@@ -880,8 +1182,7 @@ def test_ldap_settings(
     dependencies=[Depends(require_role(Role.ADMIN))],
 )
 def get_ldap_settings(db: Session = Depends(get_db)) -> LdapSettingsOut:
-    settings_row = get_or_create_ldap_settings(db)
-    return ldap_settings_response(settings_row)
+    return ldap_settings_response(settings_cache.ldap(db))
 
 
 @app.put(
@@ -889,7 +1190,7 @@ def get_ldap_settings(db: Session = Depends(get_db)) -> LdapSettingsOut:
     response_model=LdapSettingsOut,
     dependencies=[Depends(require_role(Role.ADMIN))],
 )
-def update_ldap_settings(
+async def update_ldap_settings(
     data: LdapSettingsIn, db: Session = Depends(get_db)
 ) -> LdapSettingsOut:
     settings_row = get_or_create_ldap_settings(db)
@@ -899,9 +1200,12 @@ def update_ldap_settings(
         setattr(settings_row, field, value)
     if bind_password:
         settings_row.bind_password = bind_password
+    settings_row.version = (settings_row.version or 0) + 1
     db.commit()
     db.refresh(settings_row)
-    return ldap_settings_response(settings_row)
+    response = ldap_settings_response(settings_row)
+    await notify_settings_changed(LDAP_SETTINGS, settings_row.version)
+    return response
 
 
 @app.get(
@@ -924,7 +1228,9 @@ def get_ovh_settings(db: Session = Depends(get_db)) -> OvhSettingsOut:
     response_model=OvhSettingsOut,
     dependencies=[Depends(require_role(Role.ADMIN))],
 )
-def update_ovh_settings(data: OvhSettingsIn, db: Session = Depends(get_db)) -> OvhSettingsOut:
+async def update_ovh_settings(
+    data: OvhSettingsIn, db: Session = Depends(get_db)
+) -> OvhSettingsOut:
     settings_row = db.query(OvhSettings).first()
     if not settings_row:
         settings_row = OvhSettings()
@@ -932,9 +1238,12 @@ def update_ovh_settings(data: OvhSettingsIn, db: Session = Depends(get_db)) -> O
     for field, value in data.model_dump().items():
         setattr(settings_row, field, value)
     settings_row.last_error = None
+    settings_row.version = (settings_row.version or 0) + 1
     db.commit()
     db.refresh(settings_row)
-    return OvhSettingsOut.model_validate(settings_row)
+    response = OvhSettingsOut.model_validate(settings_row)
+    await notify_settings_changed(OVH_SETTINGS, settings_row.version)
+    return response
 
 
 @app.post(
@@ -964,8 +1273,9 @@ def test_ovh_settings(db: Session = Depends(get_db)) -> dict:
     ]
     if missing_fields:
         log(f"Champs manquants: {', '.join(missing_fields)}")
-        settings_row.last_error = f"Missing OVH settings: {', '.join(missing_fields)}"
-        db.commit()
+        settings_cache.record_ovh_status(
+            db, last_error=f"Missing OVH settings: {', '.join(missing_fields)}"
+        )
         raise HTTPException(
             status_code=400,
             detail={
@@ -988,14 +1298,12 @@ def test_ovh_settings(db: Session = Depends(get_db)) -> dict:
         log("Récupération des consommations téléphonie.")
         client.list_consumption_ids()
         log("Liste des consommations récupérée.")
-        settings_row.last_error = None
-        db.commit()
+        settings_cache.record_ovh_status(db, last_error=None)
         return {"status": "ok", "logs": logs}
     except Exception as exc:
         message = f"{type(exc).__name__}: {exc}"
         log(f"Erreur: {message}")
-        settings_row.last_error = message
-        db.commit()
+        settings_cache.record_ovh_status(db, last_error=message)
         raise HTTPException(
             status_code=400,
             detail={"message": message, "logs": logs},
@@ -1036,8 +1344,9 @@ async def debug_sync(
     ]
     if missing_fields:
         log(f"Champs manquants: {', '.join(missing_fields)}")
-        settings_row.last_error = f"Missing OVH settings: {', '.join(missing_fields)}"
-        db.commit()
+        settings_cache.record_ovh_status(
+            db, last_error=f"Missing OVH settings: {', '.join(missing_fields)}"
+        )
         raise HTTPException(
             status_code=400,
             detail={
@@ -1142,8 +1451,7 @@ async def debug_sync(
     except Exception as exc:
         message = f"{type(exc).__name__}: {exc}"
         log(f"Erreur: {message}")
-        settings_row.last_error = message
-        db.commit()
+        settings_cache.record_ovh_status(db, last_error=message)
         raise HTTPException(
             status_code=400,
             detail={"message": message, "logs": logs},
@@ -1156,47 +1464,184 @@ async def trigger_sync() -> dict:
     return {"status": "queued"}
 
 
-@app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket) -> None:
-    token = websocket.query_params.get("token")
+@app.post("/ingest/calls")
+async def ingest_calls(request: Request, db: Session = Depends(get_db)) -> dict:
+    body = await request.body()
+    verify_ingest_signature(request.headers, body)
+    try:
+        data = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    payloads = data if isinstance(data, list) else [data]
+    if not payloads or not all(isinstance(payload, dict) for payload in payloads):
+        raise HTTPException(status_code=422, detail="Expected a call object or a list of calls")
+    if len(payloads) > settings.ingest_max_batch:
+        raise HTTPException(
+            status_code=413, detail=f"At most {settings.ingest_max_batch} calls per request"
+        )
+    # One commit per call, then the event's summary and enrichment queries:
+    # all synchronous, so they stay off the event loop.
+    result = await run_in_threadpool(ingest_payloads, db, payloads)
+    if result.new_ids or result.updated_ids:
+        event = await run_in_threadpool(
+            calls_changed_event, db, result.new_ids, result.updated_ids
+        )
+        await event_bus.publish(event)
+    return result.as_dict()
+
+
+@app.get("/debug/events", dependencies=[Depends(require_role(Role.ADMIN))])
+def debug_events() -> dict:
+    return {**connections.stats(), "event_bus": event_bus.stats()}
+
+
+@app.get("/debug/startup", dependencies=[Depends(require_role(Role.ADMIN))])
+def debug_startup() -> dict:
+    return startup_report
+
+
+@app.get("/debug/database", dependencies=[Depends(require_role(Role.ADMIN))])
+def debug_database() -> dict:
+    return read_router.stats()
+
+
+@app.get("/debug/requests", dependencies=[Depends(require_role(Role.ADMIN))])
+def debug_requests() -> dict:
+    return sql_instrumentation.stats()
+
+
+@app.put("/debug/requests", dependencies=[Depends(require_role(Role.ADMIN))])
+async def configure_request_instrumentation(payload: InstrumentationSettings) -> dict:
+    sql_instrumentation.configure(
+        payload.enabled, payload.slow_request_ms, payload.slow_query_ms
+    )
+    await event_bus.publish(
+        instrumentation_changed_event(
+            payload.enabled, payload.slow_request_ms, payload.slow_query_ms
+        )
+    )
+    return sql_instrumentation.stats()
+
+
+@app.get("/debug/ldap", dependencies=[Depends(require_role(Role.ADMIN))])
+def debug_ldap() -> dict:
+    report = ldap_mirror.last_report
+    return {
+        "mirror_interval_seconds": settings.ldap_mirror_interval_seconds,
+        "last_mirror": report.as_dict() if report else None,
+    }
+
+
+def authenticate_stream_token(token: Optional[str]) -> Optional[dict]:
+    """Return the claims of a valid access token whose user still exists."""
     if not token:
-        await websocket.close(code=1008)
-        return
+        return None
     try:
-        payload = auth_service.decode_token(token)
+        payload = user_cache.decode_token(token)
     except JWTError:
-        await websocket.close(code=1008)
-        return
+        return None
     username = payload.get("sub")
     if not username:
-        await websocket.close(code=1008)
-        return
+        return None
     db = SessionLocal()
     try:
-        user = db.query(User).filter(User.username == username).first()
-        if not user:
-            await websocket.close(code=1008)
-            return
+        user = user_cache.get_user(db, username)
     finally:
         db.close()
+    return payload if user else None
+
+
+@app.websocket("/ws")
+async def websocket_endpoint(websocket: WebSocket) -> None:
+    # A user cache miss queries the database; keep it off the event loop.
+    token = websocket.query_params.get("token")
+    claims = await run_in_threadpool(authenticate_stream_token, token)
+    if not claims:
+        await websocket.close(code=1008)
+        return
+
+    async def reauthenticate(token: str) -> Optional[float]:
+        new_claims = await run_in_threadpool(authenticate_stream_token, token)
+        if not new_claims or new_claims["sub"] != claims["sub"]:
+            return None
+        return new_claims["exp"]
+
+    since = websocket.query_params.get("since")
+    topics = parse_topics(websocket.query_params.get("topics"))
     await websocket.accept()
-    pubsub = redis_client.pubsub() if redis_client else None
-    if pubsub:
-        await pubsub.subscribe("events")
+    connection = WebSocketConnection(websocket, topics, claims["exp"], reauthenticate)
+    connections.add(connection)
     try:
-        while True:
-            if pubsub:
-                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
-                if message and message.get("data"):
-                    await websocket.send_text(message["data"])
-            await asyncio.sleep(0.2)
-    except WebSocketDisconnect:
-        if pubsub:
-            await pubsub.unsubscribe("events")
-            await pubsub.close()
-
-
-app.mount("/", StaticFiles(directory="/app/static", html=True), name="static")
+        last_seq = None
+        if since:
+            messages, last_seq, resync = await connections.replay(connection, event_bus, since)
+            if resync:
+                await connection.send(json.dumps({"type": RESYNC_REQUIRED, "seq": last_seq}))
+            for _, message in messages:
+                await connection.send(message)
+        await connection.serve(skip_until=last_seq)
+    except (WebSocketDisconnect, asyncio.TimeoutError):
+        pass
+    finally:
+        connections.discard(connection)
+        await connection.close()
+
+
+def sse_frame(seq: Optional[str], message: str) -> str:
+    event_id = f"id: {seq}\n" if seq else ""
+    return f"{event_id}data: {message}\n\n"
+
+
+@app.get("/events/stream")
+async def events_stream(
+    request: Request,
+    token: Optional[str] = None,
+    topics: Optional[str] = None,
+    since: Optional[str] = None,
+) -> StreamingResponse:
+    if not await run_in_threadpool(authenticate_stream_token, token):
+        raise HTTPException(status_code=401, detail="Invalid token")
+    since = request.headers.get("last-event-id") or since
+    connection = Connection(parse_topics(topics))
+    connections.add(connection)
+
+    async def stream():
+        try:
+            yield f"retry: {SSE_RETRY_MILLISECONDS}\n\n"
+            last_seq = None
+            resync = not since
+            if since:
+                messages, last_seq, resync = await connections.replay(
+                    connection, event_bus, since
+                )
+                for seq, message in messages:
+                    yield sse_frame(seq, message)
+            if resync:
+                last_seq = connections.last_seq
+                yield sse_frame(last_seq, await snapshots.get(connection.topics))
+            while not connection.evicted.is_set():
+                try:
+                    async with asyncio.timeout(settings.ws_heartbeat_interval_seconds):
+                        seq, message = await connection.queue.get()
+                except TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                if is_stale(seq, last_seq):
+                    continue
+                if json.loads(message).get("type") == RESYNC_REQUIRED:
+                    message = await snapshots.get(connection.topics)
+                yield sse_frame(seq, message)
+        finally:
+            connections.discard(connection)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+app.mount("/", PrecompressedStaticFiles(directory="/app/static", html=True), name="static")
 
 
 @app.get("/")
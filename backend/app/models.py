@@ -4,15 +4,19 @@ from datetime import datetime
 from sqlalchemy import (
     Boolean,
     Column,
+    Computed,
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     JSON,
     String,
     UniqueConstraint,
 )
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql.expression import ColumnElement
 
 from app.database import Base
 
@@ -40,6 +44,18 @@ class User(Base):
         nullable=False,
         default=UserSource.LOCAL,
     )
+    ldap_dn = Column(String(512), nullable=True)
+    ldap_removed_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    jti = Column(String(64), primary_key=True)
+    username = Column(String(64), nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
 
@@ -55,6 +71,7 @@ class OvhSettings(Base):
     consumer_key = Column(String(255), nullable=True)
     last_sync_at = Column(DateTime, nullable=True)
     last_error = Column(String(1024), nullable=True)
+    version = Column(Integer, default=1, nullable=False)
 
 
 class LdapSettings(Base):
@@ -72,6 +89,33 @@ class LdapSettings(Base):
     group_name_attr = Column(String(64), nullable=False)
     group_required = Column(String(128), nullable=False)
     group_role_map = Column(String(255), nullable=False)
+    version = Column(Integer, default=1, nullable=False)
+
+
+PHONE_SEPARATORS = ("+", " ", ".", "-", "(", ")", "/")
+
+
+class digits_of(ColumnElement):
+    """SQL for ``column`` with every non-digit character removed."""
+
+    inherit_cache = True
+
+    def __init__(self, column: str) -> None:
+        self.column = column
+
+
+@compiles(digits_of)
+def _digits_by_replace(element, compiler, **kw) -> str:
+    # SQLite has no regexp_replace(); strip the usual separators instead.
+    sql = element.column
+    for separator in PHONE_SEPARATORS:
+        sql = f"replace({sql}, '{separator}', '')"
+    return sql
+
+
+@compiles(digits_of, "postgresql")
+def _digits_by_regexp(element, compiler, **kw) -> str:
+    return f"regexp_replace({element.column}, '\\D', '', 'g')"
 
 
 class CallDirection(enum.Enum):
@@ -81,14 +125,26 @@ class CallDirection(enum.Enum):
 
 class CallRecord(Base):
     __tablename__ = "call_records"
-    __table_args__ = (UniqueConstraint("ovh_consumption_id"),)
+    __table_args__ = (
+        UniqueConstraint("ovh_consumption_id"),
+        # Covers the dashboard aggregates, which then never read the table.
+        Index(
+            "ix_call_records_started_at_is_missed",
+            "started_at",
+            "is_missed",
+            postgresql_include=["direction", "duration"],
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     ovh_consumption_id = Column(String(128), nullable=False, unique=True)
-    started_at = Column(DateTime, nullable=False, index=True)
+    started_at = Column(DateTime, nullable=False)
     direction = Column(Enum(CallDirection), nullable=False)
     calling_number = Column(String(64), nullable=True, index=True)
     called_number = Column(String(64), nullable=True, index=True)
+    # For the number search, which compares digits only.
+    calling_digits = Column(String(64), Computed(digits_of("calling_number"), persisted=True))
+    called_digits = Column(String(64), Computed(digits_of("called_number"), persisted=True))
     duration = Column(Integer, default=0)
     status = Column(String(64), nullable=True)
     is_missed = Column(Boolean, default=False, index=True)
@@ -108,6 +164,8 @@ class TeamLead(Base):
     intervention_started_at = Column(DateTime, nullable=True)
     intervention_count = Column(Integer, nullable=False, default=0)
     category_id = Column(Integer, ForeignKey("team_lead_categories.id"), nullable=True)
+    # The board version of the last change, see TeamBoard.
+    version = Column(Integer, nullable=False, default=0, index=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(
         DateTime,
@@ -124,6 +182,7 @@ class TeamLeadCategory(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(64), nullable=False)
     position = Column(Integer, nullable=False, default=0)
+    version = Column(Integer, nullable=False, default=0, index=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(
         DateTime,
@@ -131,3 +190,28 @@ class TeamLeadCategory(Base):
         onupdate=datetime.utcnow,
         nullable=False,
     )
+
+
+class TeamBoard(Base):
+    """One row holding the version counter of the team lead board.
+
+    Every change to team leads or categories takes the next version and
+    stores it on the changed rows, or in team_board_deletions for deleted
+    ones; deletions at or below ``pruned_version`` have been forgotten.
+    """
+
+    __tablename__ = "team_board"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    pruned_version = Column(Integer, nullable=False, default=0)
+
+
+class TeamBoardDeletion(Base):
+    __tablename__ = "team_board_deletions"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(16), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    version = Column(Integer, nullable=False, index=True)
+    deleted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,100 @@
+from typing import Optional
+
+import orjson
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.calls import enrich_calls, enrich_calls_async
+from app.models import CallRecord
+from app.schemas import CallRecordOut
+
+
+def call_sort_key(call: CallRecordOut) -> tuple:
+    return call.started_at, call.id
+
+
+class RecentCallsCache:
+    """The latest enriched calls, serving the unfiltered first page of /calls.
+
+    Kept current from calls_changed events, which already carry the enriched
+    rows; team-lead changes alter the enrichment, so they trigger a reload.
+    Reloads read from ``db_factory``, the primary: a lagging replica could
+    miss calls whose events were already applied, until the next reload.
+    """
+
+    def __init__(self, size: int, db_factory) -> None:
+        self.size = size
+        self.db_factory = db_factory
+        self._calls: tuple[CallRecordOut, ...] = ()
+        self._pages: dict[int, bytes] = {}
+        self._ready = False
+        self._generation = 0
+
+    def _statement(self) -> Select:
+        return (
+            select(CallRecord)
+            .order_by(CallRecord.started_at.desc(), CallRecord.id.desc())
+            .limit(self.size)
+        )
+
+    def _store(self, generation: int, calls: list[CallRecordOut]) -> None:
+        if generation == self._generation:
+            self._calls = tuple(calls)
+            self._pages = {}
+            self._ready = True
+
+    def warm(self, db: Session) -> None:
+        generation = self._generation
+        records = db.execute(self._statement()).scalars().all()
+        self._store(generation, enrich_calls(db, list(records)))
+
+    async def warm_async(self, db: AsyncSession) -> None:
+        generation = self._generation
+        records = (await db.execute(self._statement())).scalars().all()
+        self._store(generation, await enrich_calls_async(db, list(records)))
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._ready = False
+        self._pages = {}
+
+    def apply(self, calls: list[dict]) -> None:
+        self._generation += 1
+        if not self._ready:
+            return
+        merged = {call.id: call for call in self._calls}
+        for call in calls:
+            merged[call["id"]] = CallRecordOut.model_validate(call)
+        ordered = sorted(merged.values(), key=call_sort_key, reverse=True)
+        self._calls = tuple(ordered[: self.size])
+        self._pages = {}
+
+    def on_event(self, topics: frozenset[str], message: str) -> None:
+        if "team_leads" in topics:
+            self.invalidate()
+            return
+        if "calls" not in topics:
+            return
+        event = orjson.loads(message)
+        calls = (event.get("payload") or {}).get("calls")
+        if event.get("type") == "calls_changed" and calls is not None:
+            self.apply(calls)
+        else:
+            self.invalidate()
+
+    async def first_page(self, page_size: int) -> Optional[bytes]:
+        """Return the serialized first page, or None if it cannot be served from memory."""
+        if page_size > self.size:
+            return None
+        if not self._ready:
+            async with self.db_factory() as db:
+                await self.warm_async(db)
+        pages = self._pages
+        page = pages.get(page_size)
+        if page is None and self._ready:
+            page = orjson.dumps(
+                [call.model_dump(mode="json") for call in self._calls[:page_size]]
+            )
+            pages[page_size] = page
+        return page
@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.models import Role, CallDirection, UserSource
 
@@ -9,6 +9,12 @@ from app.models import Role, CallDirection, UserSource
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = None
+
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
 
 
 class LoginRequest(BaseModel):
@@ -39,6 +45,7 @@ class UserOut(BaseModel):
     role: Role
     must_change_password: bool
     source: UserSource
+    ldap_removed_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -48,6 +55,12 @@ class MeResponse(UserOut):
     pass
 
 
+class InstrumentationSettings(BaseModel):
+    enabled: bool
+    slow_request_ms: float = Field(500, ge=0)
+    slow_query_ms: float = Field(100, ge=0)
+
+
 class LdapDiagnosticRequest(BaseModel):
     username: Optional[str] = None
     password: Optional[str] = None
@@ -174,11 +187,35 @@ class TeamLeadOut(BaseModel):
     intervention_started_at: Optional[datetime] = None
     intervention_count: int = 0
     category_id: Optional[int]
+    version: int = 0
 
     class Config:
         from_attributes = True
 
 
+class TeamLeadBulkItem(BaseModel):
+    """A row of POST /team-leads/bulk: updates the lead with this id or,
+    without one, the lead with this team name, and creates it otherwise."""
+
+    id: Optional[int] = None
+    team_name: Optional[str] = None
+    leader_first_name: Optional[str] = None
+    leader_last_name: Optional[str] = None
+    phone: Optional[str] = None
+    status: Optional[str] = None
+    intervention_count: Optional[int] = None
+    category_id: Optional[int] = None
+    # Category name, as CSV files carry it; category_id wins over it.
+    category: Optional[str] = None
+
+
+class TeamLeadBulkResult(BaseModel):
+    version: int
+    created: int
+    updated: int
+    team_leads: List[TeamLeadOut]
+
+
 class TeamLeadCategoryIn(BaseModel):
     name: str
     position: Optional[int] = None
@@ -189,10 +226,26 @@ class TeamLeadCategoryUpdate(BaseModel):
     position: Optional[int] = None
 
 
+class TeamLeadCategoryOrder(BaseModel):
+    # Every category id, in display order.
+    ids: List[int]
+
+
 class TeamLeadCategoryOut(BaseModel):
     id: int
     name: str
     position: int
+    version: int = 0
 
     class Config:
         from_attributes = True
+
+
+class TeamBoardChanges(BaseModel):
+    version: int
+    # The lists hold the whole board rather than changes; replace, don't merge.
+    full: bool
+    team_leads: List[TeamLeadOut]
+    deleted_ids: List[int]
+    categories: List[TeamLeadCategoryOut]
+    deleted_category_ids: List[int]
@@ -0,0 +1,136 @@
+import threading
+from typing import TYPE_CHECKING, Optional
+
+import orjson
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import detached_copy
+from app.events import INTERNAL_TOPIC
+from app.ldap_auth import (
+    LdapConfig,
+    get_or_create_ldap_settings,
+    ldap_config_from_settings,
+    ldap_service,
+)
+from app.models import LdapSettings, OvhSettings
+
+if TYPE_CHECKING:
+    from app.ovh_client import OVHClient
+
+SETTINGS_CHANGED = "settings_changed"
+OVH = "ovh"
+LDAP = "ldap"
+
+
+class SettingsCache:
+    """The OVH and LDAP settings rows, held in memory with their version.
+
+    PUT /settings/ovh and PUT /settings/ldap bump the row's version and
+    publish a settings_changed event; a process reloads a row, and rebuilds
+    the OVH client or LDAP connections made from it, only when it sees a
+    version other than the one it holds. Sync status columns are written
+    through ``record_ovh_status`` so the snapshot stays current without a
+    reload.
+    """
+
+    def __init__(self) -> None:
+        self._ovh: Optional[OvhSettings] = None
+        self._ovh_client: Optional["OVHClient"] = None
+        self._ldap: Optional[LdapSettings] = None
+        self._ldap_config: Optional[LdapConfig] = None
+        self._generations = {OVH: 0, LDAP: 0}
+        self._lock = threading.Lock()
+
+    def ovh(self, db: Session) -> Optional[OvhSettings]:
+        settings_row = self._ovh
+        if settings_row is None:
+            generation = self._generations[OVH]
+            row = db.query(OvhSettings).first()
+            if row is None:
+                return None
+            settings_row = detached_copy(row)
+            with self._lock:
+                if generation == self._generations[OVH]:
+                    self._ovh = settings_row
+                    self._ovh_client = None
+        return settings_row
+
+    def ovh_client(self, db: Session) -> Optional["OVHClient"]:
+        # Loaded here so processes that never sync skip importing the ovh package.
+        from app.ovh_client import OVHClient
+
+        settings_row = self.ovh(db)
+        if settings_row is None:
+            return None
+        client = self._ovh_client
+        if client is None or client.settings is not settings_row:
+            client = OVHClient(settings_row, settings.ovh_endpoint)
+            self._ovh_client = client
+        return client
+
+    def record_ovh_status(self, db: Session, **values) -> None:
+        """Write last_sync_at/last_error to the row and to the snapshot."""
+        settings_row = self.ovh(db)
+        if settings_row is None:
+            return
+        for field, value in values.items():
+            setattr(settings_row, field, value)
+        db.query(OvhSettings).filter(OvhSettings.id == settings_row.id).update(values)
+        db.commit()
+
+    def ldap(self, db: Session) -> LdapSettings:
+        settings_row = self._ldap
+        if settings_row is None:
+            settings_row, _ = self._load_ldap(db)
+        return settings_row
+
+    def ldap_config(self, db: Session) -> LdapConfig:
+        config = self._ldap_config
+        if config is None:
+            _, config = self._load_ldap(db)
+        return config
+
+    def _load_ldap(self, db: Session) -> tuple[LdapSettings, LdapConfig]:
+        generation = self._generations[LDAP]
+        settings_row = detached_copy(get_or_create_ldap_settings(db))
+        config = ldap_config_from_settings(settings_row)
+        with self._lock:
+            if generation == self._generations[LDAP]:
+                self._ldap = settings_row
+                self._ldap_config = config
+        return settings_row, config
+
+    def version(self, kind: str) -> Optional[int]:
+        settings_row = self._ovh if kind == OVH else self._ldap
+        return settings_row.version if settings_row else None
+
+    def invalidate(self, kind: str) -> None:
+        with self._lock:
+            self._generations[kind] += 1
+            if kind == OVH:
+                self._ovh = None
+                self._ovh_client = None
+            elif kind == LDAP:
+                self._ldap = None
+                self._ldap_config = None
+        if kind == LDAP:
+            ldap_service.invalidate()
+
+    def on_event(self, topics: frozenset[str], message: str) -> None:
+        if INTERNAL_TOPIC not in topics:
+            return
+        event = orjson.loads(message)
+        if event.get("type") != SETTINGS_CHANGED:
+            return
+        payload = event.get("payload") or {}
+        kind = payload.get("kind")
+        if kind in (OVH, LDAP) and payload.get("version") != self.version(kind):
+            self.invalidate(kind)
+
+
+settings_cache = SettingsCache()
+
+
+def settings_changed_event(kind: str, version: int) -> dict:
+    return {"type": SETTINGS_CHANGED, "payload": {"kind": kind, "version": version}}
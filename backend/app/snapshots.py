@@ -0,0 +1,98 @@
+import asyncio
+import json
+import time
+from typing import Optional
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.calls import compute_dashboard_hourly, compute_dashboard_summary, enrich_calls
+from app.models import CallRecord, TeamBoard, TeamLead, TeamLeadCategory
+from app.schemas import TeamLeadCategoryOut, TeamLeadOut
+
+LATEST_CALLS_LIMIT = 5
+SNAPSHOT_TTL_SECONDS = 60
+SNAPSHOT_FIELDS = {
+    "dashboard": ("summary", "hourly"),
+    "calls": ("latest_calls",),
+    "team_leads": ("team_board_version", "team_leads", "categories"),
+}
+
+
+def build_snapshot(db: Session) -> dict:
+    latest_calls = (
+        db.query(CallRecord).order_by(CallRecord.started_at.desc()).limit(LATEST_CALLS_LIMIT).all()
+    )
+    # Read before the rows, as in team_board_changes.
+    board = db.query(TeamBoard).first()
+    leads = db.query(TeamLead).order_by(TeamLead.team_name, TeamLead.leader_last_name).all()
+    categories = (
+        db.query(TeamLeadCategory)
+        .order_by(TeamLeadCategory.position, TeamLeadCategory.name)
+        .all()
+    )
+    return {
+        "summary": compute_dashboard_summary(db).model_dump(mode="json"),
+        "hourly": [point.model_dump(mode="json") for point in compute_dashboard_hourly(db)],
+        "latest_calls": [call.model_dump(mode="json") for call in enrich_calls(db, latest_calls)],
+        "team_board_version": board.version if board else 0,
+        "team_leads": [
+            TeamLeadOut.model_validate(lead).model_dump(mode="json") for lead in leads
+        ],
+        "categories": [
+            TeamLeadCategoryOut.model_validate(category).model_dump(mode="json")
+            for category in categories
+        ],
+    }
+
+
+class SnapshotCache:
+    """Serialized dashboard snapshots shared by all stream clients of a process.
+
+    The snapshot is rebuilt at most once per relevant event (or TTL expiry), and
+    each topic combination is serialized once.
+    """
+
+    def __init__(self, db_factory) -> None:
+        self.db_factory = db_factory
+        self._snapshot: Optional[dict] = None
+        self._built_at = 0.0
+        self._generation = 0
+        self._messages: dict[frozenset[str], str] = {}
+        self._lock = asyncio.Lock()
+
+    def on_event(self, topics: frozenset[str], message: str) -> None:
+        if not topics.isdisjoint(SNAPSHOT_FIELDS):
+            self._generation += 1
+            self._snapshot = None
+            self._messages = {}
+
+    def _build(self) -> dict:
+        db = self.db_factory()
+        try:
+            return build_snapshot(db)
+        finally:
+            db.close()
+
+    async def get(self, topics: set[str]) -> str:
+        async with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or time.monotonic() - self._built_at > SNAPSHOT_TTL_SECONDS:
+                generation = self._generation
+                snapshot = await run_in_threadpool(self._build)
+                if generation == self._generation:
+                    self._snapshot = snapshot
+                    self._built_at = time.monotonic()
+                    self._messages = {}
+            key = frozenset(topics)
+            message = self._messages.get(key)
+            if message is None:
+                payload = {
+                    field: snapshot[field]
+                    for topic in sorted(key)
+                    for field in SNAPSHOT_FIELDS.get(topic, ())
+                }
+                message = json.dumps({"type": "snapshot", "payload": payload})
+                if snapshot is self._snapshot:
+                    self._messages[key] = message
+            return message
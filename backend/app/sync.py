@@ -3,11 +3,13 @@ import logging
 from datetime import datetime, timedelta
 from typing import Optional, Tuple
 
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.config import settings
+from app.calls import compute_dashboard_hourly, compute_dashboard_summary, enrich_calls
 from app.models import CallRecord, CallDirection, OvhSettings
-from app.ovh_client import OVHClient
+from app.settings_cache import settings_cache
 
 
 def extract_status(payload: dict) -> Optional[str]:
@@ -128,7 +130,7 @@ def map_payload_to_record(
 
 
 def get_settings(db: Session) -> Optional[OvhSettings]:
-    return db.query(OvhSettings).first()
+    return settings_cache.ovh(db)
 
 
 def get_sync_range(
@@ -145,37 +147,116 @@ def get_sync_range(
     return range_start, range_end, "default"
 
 
-async def sync_consumptions(db: Session, publish, range_days: Optional[int] = None) -> int:
+MAX_REPORTED_ERRORS = 10
+
+
+def calls_changed_event(db: Session, new_ids: list[int], updated_ids: list[int]) -> dict:
+    records = (
+        db.query(CallRecord)
+        .filter(CallRecord.id.in_(new_ids + updated_ids))
+        .order_by(CallRecord.started_at.desc())
+        .all()
+    )
+    calls = enrich_calls(db, records)
+    return {
+        "type": "calls_changed",
+        "payload": {
+            "new_ids": new_ids,
+            "updated_ids": updated_ids,
+            "new_count": len(new_ids),
+            "updated_count": len(updated_ids),
+            "calls": [call.model_dump(mode="json") for call in calls],
+            "summary": compute_dashboard_summary(db).model_dump(mode="json"),
+            "hourly": [point.model_dump(mode="json") for point in compute_dashboard_hourly(db)],
+        },
+    }
+
+
+class IngestResult:
+    """Ids touched by one ingest pass, published as a single calls_changed event."""
+
+    def __init__(self) -> None:
+        self.new_ids: list[int] = []
+        self.updated_ids: list[int] = []
+        self.duplicate_count = 0
+        self.errors: list[str] = []
+
+    def as_dict(self) -> dict:
+        return {
+            "new_count": len(self.new_ids),
+            "updated_count": len(self.updated_ids),
+            "duplicate_count": self.duplicate_count,
+            "error_count": len(self.errors),
+            "errors": self.errors[:MAX_REPORTED_ERRORS],
+        }
+
+
+def find_call(db: Session, consumption_id: str) -> Optional[CallRecord]:
+    return db.query(CallRecord).filter(CallRecord.ovh_consumption_id == consumption_id).first()
+
+
+def refresh_call(
+    db: Session, record: CallRecord, result: IngestResult, admin_phone_number: Optional[str]
+) -> None:
+    updated_direction = infer_direction(
+        record.raw_payload or {},
+        admin_phone_number=admin_phone_number,
+    )
+    if updated_direction != record.direction:
+        record.direction = updated_direction
+        db.commit()
+        result.updated_ids.append(record.id)
+    else:
+        result.duplicate_count += 1
+
+
+def insert_call(db: Session, record: CallRecord, result: IngestResult) -> None:
+    db.add(record)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Inserted concurrently by the poller or another push.
+        db.rollback()
+        result.duplicate_count += 1
+        return
+    db.refresh(record)
+    result.new_ids.append(record.id)
+
+
+def ingest_payloads(db: Session, payloads: list[dict]) -> IngestResult:
+    settings_row = get_settings(db)
+    admin_phone_number = settings_row.admin_phone_number if settings_row else None
+    result = IngestResult()
+    for index, payload in enumerate(payloads):
+        try:
+            record = map_payload_to_record(payload, admin_phone_number=admin_phone_number)
+            existing = find_call(db, record.ovh_consumption_id)
+            if existing:
+                refresh_call(db, existing, result, admin_phone_number)
+            else:
+                insert_call(db, record, result)
+        except Exception as exc:
+            db.rollback()
+            call_id = payload.get("id") or payload.get("consumptionId") or f"#{index}"
+            result.errors.append(f"{call_id}: {type(exc).__name__}: {exc}")
+    return result
+
+
+def run_sync_cycle(db: Session, range_days: Optional[int] = None) -> Tuple[int, list[dict]]:
+    """One synchronous sync cycle: the number of new calls and the events to publish."""
     settings_row = get_settings(db)
     if not settings_row or not settings_row.billing_account:
-        return 0
-    client = OVHClient(settings_row, settings.ovh_endpoint)
+        return 0, []
+    client = settings_cache.ovh_client(db)
     logger = logging.getLogger(__name__)
     try:
         range_start, range_end, _ = get_sync_range(settings_row, range_days=range_days)
         consumptions = client.list_consumptions(range_start, range_end)
-        new_count = 0
-        errors: list[str] = []
+        result = IngestResult()
         for service_name, consumption_id in consumptions:
-            existing = (
-                db.query(CallRecord)
-                .filter(CallRecord.ovh_consumption_id == str(consumption_id))
-                .first()
-            )
+            existing = find_call(db, str(consumption_id))
             if existing:
-                updated_direction = infer_direction(
-                    existing.raw_payload or {},
-                    admin_phone_number=settings_row.admin_phone_number,
-                )
-                if updated_direction != existing.direction:
-                    existing.direction = updated_direction
-                    db.commit()
-                    await publish(
-                        {
-                            "type": "call_updated",
-                            "payload": {"id": existing.id, "direction": updated_direction.value},
-                        }
-                    )
+                refresh_call(db, existing, result, settings_row.admin_phone_number)
                 continue
             try:
                 payload = client.get_consumption_detail(service_name, consumption_id)
@@ -184,44 +265,47 @@ async def sync_consumptions(db: Session, publish, range_days: Optional[int] = No
                     consumption_id=str(consumption_id),
                     admin_phone_number=settings_row.admin_phone_number,
                 )
-                db.add(record)
-                db.commit()
-                db.refresh(record)
-                new_count += 1
-                await publish({"type": "new_call", "payload": {"id": record.id}})
+                insert_call(db, record, result)
             except Exception as exc:
                 db.rollback()
                 message = f"{consumption_id}: {type(exc).__name__}: {exc}"
-                errors.append(message)
+                result.errors.append(message)
                 logger.exception("Failed to sync consumption %s", consumption_id)
-                await publish(
-                    {
-                        "type": "sync_item_error",
-                        "payload": {"id": str(consumption_id), "message": message},
-                    }
-                )
-        settings_row.last_sync_at = datetime.utcnow()
-        if errors:
-            settings_row.last_error = (
-                f"Sync completed with {len(errors)} error(s). Example: {errors[0]}"
+        new_count = len(result.new_ids)
+        last_error = None
+        if result.errors:
+            last_error = (
+                f"Sync completed with {len(result.errors)} error(s). Example: {result.errors[0]}"
             )
-        else:
-            settings_row.last_error = None
-        db.commit()
-        await publish(
+        settings_cache.record_ovh_status(
+            db, last_sync_at=datetime.utcnow(), last_error=last_error
+        )
+        events = []
+        if result.new_ids or result.updated_ids:
+            events.append(calls_changed_event(db, result.new_ids, result.updated_ids))
+        events.append(
             {
                 "type": "sync_complete",
-                "payload": {"new_count": new_count, "error_count": len(errors)},
+                "payload": {
+                    "new_count": new_count,
+                    "error_count": len(result.errors),
+                    "errors": result.errors[:MAX_REPORTED_ERRORS],
+                },
             }
         )
-        if new_count:
-            await publish({"type": "summary_updated"})
-        return new_count
+        return new_count, events
     except Exception as exc:
-        settings_row.last_error = str(exc)
-        db.commit()
-        await publish({"type": "sync_error", "payload": {"message": str(exc)}})
-        return 0
+        db.rollback()
+        settings_cache.record_ovh_status(db, last_error=str(exc))
+        return 0, [{"type": "sync_error", "payload": {"message": str(exc)}}]
+
+
+async def sync_consumptions(db: Session, publish, range_days: Optional[int] = None) -> int:
+    # The OVH requests and the event queries all block; keep them off the loop.
+    new_count, events = await run_in_threadpool(run_sync_cycle, db, range_days)
+    for event in events:
+        await publish(event)
+    return new_count
 
 
 class SyncWorker:
@@ -0,0 +1,240 @@
+import csv
+import io
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+
+import orjson
+from fastapi import HTTPException
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import delete, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import TeamBoard, TeamBoardDeletion, TeamLead, TeamLeadCategory
+from app.schemas import TeamBoardChanges, TeamLeadBulkItem, TeamLeadCategoryOut, TeamLeadOut
+
+BOARD_ID = 1
+LEAD = "team_lead"
+CATEGORY = "category"
+# Clients further behind than this get the whole board again.
+DELETION_RETENTION = timedelta(days=7)
+INTERVENTION_STATUS = "En intervention"
+# Columns a bulk row cannot set to null; an empty CSV cell leaves them as they are.
+REQUIRED_FIELDS = ("team_name", "leader_first_name", "leader_last_name")
+NON_NULL_FIELDS = REQUIRED_FIELDS + ("status", "intervention_count")
+BULK_ITEMS = TypeAdapter(List[TeamLeadBulkItem])
+
+
+def _bump_board_version(db: Session) -> Optional[int]:
+    return db.execute(
+        update(TeamBoard)
+        .where(TeamBoard.id == BOARD_ID)
+        .values(version=TeamBoard.version + 1)
+        .returning(TeamBoard.version)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+
+
+def next_board_version(db: Session) -> int:
+    """Take the next board version in the session's transaction.
+
+    The UPDATE keeps the counter row locked until commit, so changes commit
+    in version order and a reader that saw version N has every change up
+    to N. Board writes wait for each other from this call to their commit:
+    take it before reading rows the change depends on, then commit soon.
+    """
+    version = _bump_board_version(db)
+    if version is None:
+        # Databases created with create_all() have no counter row yet, and
+        # another process may be adding it at the same time.
+        try:
+            with db.begin_nested():
+                db.add(TeamBoard(id=BOARD_ID, version=0, pruned_version=0))
+        except IntegrityError:
+            pass
+        version = _bump_board_version(db)
+    return version
+
+
+def record_deletions(db: Session, kind: str, entity_ids: Iterable[int], version: int) -> None:
+    rows = [{"kind": kind, "entity_id": entity_id, "version": version} for entity_id in entity_ids]
+    if rows:
+        db.execute(insert(TeamBoardDeletion), rows)
+    cutoff = datetime.utcnow() - DELETION_RETENTION
+    pruned = db.execute(
+        select(func.max(TeamBoardDeletion.version)).where(TeamBoardDeletion.deleted_at < cutoff)
+    ).scalar()
+    if pruned:
+        db.execute(delete(TeamBoardDeletion).where(TeamBoardDeletion.version <= pruned))
+        db.execute(
+            update(TeamBoard)
+            .where(TeamBoard.id == BOARD_ID)
+            .values(pruned_version=pruned)
+            .execution_options(synchronize_session=False)
+        )
+
+
+async def team_board_changes(db: AsyncSession, since: int) -> TeamBoardChanges:
+    """The team leads and categories changed or deleted after version ``since``.
+
+    The whole board comes back instead, with ``full`` set, for ``since=0``,
+    for versions older than the kept deletions and for unknown versions.
+    The version is read first: rows committed meanwhile may come twice but
+    none is missed.
+    """
+    board = (
+        await db.execute(
+            select(TeamBoard.version, TeamBoard.pruned_version).where(TeamBoard.id == BOARD_ID)
+        )
+    ).first()
+    version, pruned_version = board or (0, 0)
+    full = since <= 0 or since < pruned_version or since > version
+    leads = select(TeamLead).order_by(TeamLead.team_name, TeamLead.leader_last_name)
+    categories = select(TeamLeadCategory).order_by(
+        TeamLeadCategory.position, TeamLeadCategory.name
+    )
+    deleted = {LEAD: [], CATEGORY: []}
+    if not full:
+        leads = leads.where(TeamLead.version > since)
+        categories = categories.where(TeamLeadCategory.version > since)
+        deletions = await db.execute(
+            select(TeamBoardDeletion.kind, TeamBoardDeletion.entity_id).where(
+                TeamBoardDeletion.version > since
+            )
+        )
+        for kind, entity_id in deletions:
+            deleted.setdefault(kind, []).append(entity_id)
+    return TeamBoardChanges(
+        version=version,
+        full=full,
+        team_leads=[
+            TeamLeadOut.model_validate(lead) for lead in (await db.execute(leads)).scalars()
+        ],
+        deleted_ids=deleted[LEAD],
+        categories=[
+            TeamLeadCategoryOut.model_validate(category)
+            for category in (await db.execute(categories)).scalars()
+        ],
+        deleted_category_ids=deleted[CATEGORY],
+    )
+
+
+def parse_bulk_rows(body: bytes, content_type: str) -> List[TeamLeadBulkItem]:
+    """The rows of a JSON list or of a CSV file with a header line.
+
+    CSV files may use commas, semicolons (as spreadsheets do in French) or
+    tabs; empty cells count as missing.
+    """
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Expected UTF-8")
+    if content_type.startswith("text/csv"):
+        try:
+            dialect = csv.Sniffer().sniff(text.partition("\n")[0], delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        rows = [
+            {key.strip(): value.strip() for key, value in row.items() if key and value.strip()}
+            for row in csv.DictReader(io.StringIO(text), dialect=dialect, restval="")
+        ]
+    else:
+        try:
+            rows = orjson.loads(text)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid JSON body")
+        if not isinstance(rows, list):
+            raise HTTPException(status_code=422, detail="Expected a list of team leads")
+    try:
+        return BULK_ITEMS.validate_python(rows)
+    except ValidationError as exc:
+        raise HTTPException(
+            status_code=422, detail=exc.errors(include_url=False, include_context=False)
+        )
+
+
+def upsert_team_leads(db: Session, items: List[TeamLeadBulkItem]) -> tuple[List[TeamLead], int]:
+    """Apply every row to the session; return the leads and how many are new.
+
+    Categories and existing leads are looked up in one query each. Nothing
+    is applied when a row is invalid, and the 400 lists every invalid row.
+    """
+    category_ids = {item.category_id for item in items if item.category_id is not None}
+    category_names = {
+        item.category for item in items if item.category_id is None and item.category
+    }
+    categories = db.execute(
+        select(TeamLeadCategory.id, TeamLeadCategory.name).where(
+            or_(TeamLeadCategory.id.in_(category_ids), TeamLeadCategory.name.in_(category_names))
+        )
+    ).all()
+    known_category_ids = {category_id for category_id, _ in categories}
+    category_by_name = {name: category_id for category_id, name in categories}
+
+    lead_ids = {item.id for item in items if item.id is not None}
+    team_names = {item.team_name for item in items if item.id is None and item.team_name}
+    existing = db.execute(
+        select(TeamLead).where(or_(TeamLead.id.in_(lead_ids), TeamLead.team_name.in_(team_names)))
+    ).scalars().all()
+    lead_by_id = {lead.id: lead for lead in existing}
+    leads_by_name: dict[str, List[TeamLead]] = {}
+    for lead in existing:
+        leads_by_name.setdefault(lead.team_name, []).append(lead)
+
+    errors = []
+    seen = set()
+    matched = []
+    for row, item in enumerate(items, start=1):
+        key = item.id if item.id is not None else item.team_name
+        if key in seen:
+            errors.append(f"row {row}: {key} appears more than once")
+        seen.add(key)
+        if item.id is not None:
+            lead = lead_by_id.get(item.id)
+            if lead is None:
+                errors.append(f"row {row}: team lead {item.id} not found")
+        else:
+            same_name = leads_by_name.get(item.team_name, [])
+            if len(same_name) > 1:
+                errors.append(
+                    f"row {row}: several team leads are named {item.team_name}, give an id"
+                )
+            lead = same_name[0] if same_name else None
+            missing = [field for field in REQUIRED_FIELDS if not getattr(item, field)]
+            if lead is None and missing:
+                errors.append(f"row {row}: {', '.join(missing)} required for a new team lead")
+        if item.category_id is not None and item.category_id not in known_category_ids:
+            errors.append(f"row {row}: category {item.category_id} not found")
+        elif item.category_id is None and item.category and item.category not in category_by_name:
+            errors.append(f"row {row}: category {item.category} not found")
+        matched.append(lead)
+    if errors:
+        raise HTTPException(status_code=400, detail=errors)
+
+    now = datetime.utcnow()
+    leads = []
+    created = 0
+    for item, lead in zip(items, matched):
+        updates = item.model_dump(exclude_unset=True, exclude={"id", "category"})
+        for field in NON_NULL_FIELDS:
+            if updates.get(field, 0) is None:
+                del updates[field]
+        if "category" in item.model_fields_set and "category_id" not in item.model_fields_set:
+            updates["category_id"] = category_by_name.get(item.category)
+        if updates.get("intervention_count") is not None:
+            updates["intervention_count"] = max(0, updates["intervention_count"])
+        if lead is None:
+            lead = TeamLead(status="Disponible", intervention_count=0, created_at=now)
+            db.add(lead)
+            created += 1
+        if "status" in updates:
+            if updates["status"] != INTERVENTION_STATUS:
+                lead.intervention_started_at = None
+            elif lead.status != INTERVENTION_STATUS or not lead.intervention_started_at:
+                lead.intervention_started_at = now
+        for field, value in updates.items():
+            setattr(lead, field, value)
+        lead.updated_at = now
+        leads.append(lead)
+    return leads, created
@@ -0,0 +1,68 @@
+"""Measure bytes on the wire with and without compression.
+
+Fetches ``/calls?page_size=100`` and the initial page load (index.html plus
+the scripts and stylesheets it references) once per Accept-Encoding and
+prints the transferred sizes.
+
+    python -m scripts.compression_bench --username admin --password admin
+"""
+
+import argparse
+import json
+import re
+import urllib.error
+import urllib.request
+
+ENCODINGS = ("identity", "gzip", "br")
+ASSET_PATTERN = re.compile(r'(?:src|href)="(/assets/[^"]+)"')
+
+
+def fetch(url: str, encoding: str, token: str = None) -> tuple[int, bytes, str]:
+    headers = {"Accept-Encoding": encoding}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.read(), response.headers.get("Content-Encoding", "")
+    except urllib.error.HTTPError as exc:
+        return exc.code, exc.read(), ""
+
+
+def login(base_url: str, username: str, password: str) -> str:
+    request = urllib.request.Request(
+        f"{base_url}/auth/login",
+        data=json.dumps({"username": username, "password": password}).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())["access_token"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:1128")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    args = parser.parse_args()
+
+    token = login(args.base_url, args.username, args.password)
+    status, index, _ = fetch(f"{args.base_url}/", "identity")
+    assets = ASSET_PATTERN.findall(index.decode()) if status == 200 else []
+    print(f"initial page load: index.html + {len(assets)} assets")
+    for encoding in ENCODINGS:
+        _, calls, calls_encoding = fetch(
+            f"{args.base_url}/calls?page_size=100", encoding, token
+        )
+        page_bytes = 0
+        for path in ["/", *assets]:
+            _, body, _ = fetch(f"{args.base_url}{path}", encoding)
+            page_bytes += len(body)
+        print(
+            f"{encoding:>8}: /calls?page_size=100 {len(calls)} bytes "
+            f"({calls_encoding or 'identity'}), initial page {page_bytes} bytes"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Time the call and dashboard endpoints one request at a time.
+
+Meant to run against a database filled by scripts.seed_dataset at each
+scale. Every case is requested ``--repeat`` times after one warm-up
+request; the latency percentiles, response size and, when the backend
+runs with SQL_INSTRUMENTATION, the statement count and database time from
+Server-Timing are written as JSON so runs can be compared.
+
+    python -m scripts.endpoint_bench --username admin --password admin \\
+        --label 1m-0013 --output bench/1m-0013.json --compare bench/1m-0012.json
+"""
+
+import argparse
+import json
+import re
+import statistics
+import time
+import urllib.error
+import urllib.request
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+SERVER_TIMING_DB = re.compile(r'db;dur=([\d.]+);desc="(\d+) SQL"')
+
+
+def cases() -> list[tuple[str, str]]:
+    today = date.today()
+    week_ago = (today - timedelta(days=7)).isoformat()
+    month_ago = (today - timedelta(days=30)).isoformat()
+    return [
+        ("calls", "/calls?page=2&page_size=100"),
+        ("calls_deep_page", "/calls?page=200&page_size=100"),
+        ("calls_inbound", "/calls?direction=INBOUND&page_size=100"),
+        ("calls_outbound", "/calls?direction=OUTBOUND&page_size=100"),
+        ("calls_missed", "/calls?missed=true&page_size=100"),
+        ("calls_answered", "/calls?missed=false&page_size=100"),
+        ("calls_number", "/calls?number=0476000000&page_size=100"),
+        ("calls_number_partial", "/calls?number=7600&page_size=100"),
+        # Matches nothing, so every row is compared.
+        ("calls_number_unknown", "/calls?number=0999999999&page_size=100"),
+        ("calls_week", f"/calls?start_date={week_ago}&end_date={today}&page_size=100"),
+        (
+            "calls_inbound_missed_month",
+            f"/calls?direction=INBOUND&missed=true&start_date={month_ago}&page_size=100",
+        ),
+        ("dashboard_summary", "/dashboard/summary"),
+        ("dashboard_timeseries", "/dashboard/timeseries"),
+        ("dashboard_timeseries_30", "/dashboard/timeseries?days=30"),
+        ("dashboard_hourly", "/dashboard/hourly"),
+        ("export_csv_week", f"/calls?export=csv&start_date={week_ago}"),
+    ]
+
+
+def request(url: str, token: str) -> tuple[int, int, str]:
+    req = urllib.request.Request(url, headers={"Authorization": f"Bearer {token}"})
+    try:
+        with urllib.request.urlopen(req) as response:
+            body = response.read()
+            return response.status, len(body), response.headers.get("Server-Timing", "")
+    except urllib.error.HTTPError as exc:
+        return exc.code, len(exc.read()), ""
+
+
+def login(base_url: str, username: str, password: str) -> str:
+    req = urllib.request.Request(
+        f"{base_url}/auth/login",
+        data=json.dumps({"username": username, "password": password}).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(req) as response:
+        return json.loads(response.read())["access_token"]
+
+
+def percentile(values: list[float], ratio: float) -> float:
+    return values[max(int(len(values) * ratio) - 1, 0)]
+
+
+def run_case(base_url: str, path: str, token: str, repeat: int) -> dict:
+    request(f"{base_url}{path}", token)
+    latencies, db_times, queries = [], [], []
+    status = size = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        status, size, server_timing = request(f"{base_url}{path}", token)
+        latencies.append((time.perf_counter() - started) * 1000)
+        match = SERVER_TIMING_DB.search(server_timing)
+        if match:
+            db_times.append(float(match.group(1)))
+            queries.append(int(match.group(2)))
+    latencies.sort()
+    return {
+        "path": path,
+        "status": status,
+        "bytes": size,
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(percentile(latencies, 0.95), 1),
+        "max_ms": round(latencies[-1], 1),
+        "db_p50_ms": round(statistics.median(db_times), 1) if db_times else None,
+        "queries": max(queries) if queries else None,
+    }
+
+
+def print_comparison(results: dict, previous: dict) -> None:
+    print(f"\ncompared with {previous['label']} ({previous['created_at']}):")
+    for name, case in results["cases"].items():
+        before = previous["cases"].get(name)
+        if before is None:
+            continue
+        ratio = case["p50_ms"] / before["p50_ms"] if before["p50_ms"] else float("inf")
+        print(f"  {name:<28} p50 {before['p50_ms']:>8.1f} -> {case['p50_ms']:>8.1f} ms  x{ratio:.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:1128")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--label", default="", help="e.g. the dataset scale and schema revision")
+    parser.add_argument("--output", type=Path, help="where to write the results as JSON")
+    parser.add_argument("--compare", type=Path, help="results of an earlier run to compare with")
+    parser.add_argument("--only", help="run only cases whose name contains this text")
+    args = parser.parse_args()
+
+    token = login(args.base_url, args.username, args.password)
+    results = {
+        "label": args.label,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "base_url": args.base_url,
+        "repeat": args.repeat,
+        "cases": {},
+    }
+    for name, path in cases():
+        if args.only and args.only not in name:
+            continue
+        case = run_case(args.base_url, path, token, args.repeat)
+        results["cases"][name] = case
+        db = f" db={case['db_p50_ms']} ms/{case['queries']} SQL" if case["queries"] else ""
+        print(
+            f"{name:<28} {case['status']} p50={case['p50_ms']:>8.1f} ms "
+            f"p95={case['p95_ms']:>8.1f} ms {case['bytes']:>9} bytes{db}"
+        )
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+    if args.compare:
+        print_comparison(results, json.loads(args.compare.read_text()))
+
+
+if __name__ == "__main__":
+    main()
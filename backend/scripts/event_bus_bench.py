@@ -0,0 +1,81 @@
+"""Measure event bus publish latency and throughput per backend.
+
+Publishes ``--events`` team-lead sized events, first one at a time and then
+``--concurrency`` at once, and prints the bus statistics for each run.
+
+    python -m scripts.event_bus_bench --backend memory
+    python -m scripts.event_bus_bench --backend redis --redis-url redis://localhost:6379/0
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.event_bus import InProcessEventBus, PublishStats, RedisEventBus
+from app.events import ConnectionRegistry
+
+
+def sample_event(index: int) -> dict:
+    return {
+        "type": "team_leads_updated",
+        "payload": {
+            "team_leads": [
+                {
+                    "id": index,
+                    "team_name": f"Equipe {index}",
+                    "leader_first_name": "Jean",
+                    "leader_last_name": "Dupont",
+                    "phone": "0600000000",
+                    "status": "Disponible",
+                    "intervention_count": index,
+                }
+            ],
+            "deleted_ids": [],
+        },
+    }
+
+
+def create_bus(backend: str, redis_url: str):
+    registry = ConnectionRegistry()
+    if backend == "redis":
+        return RedisEventBus(registry, redis_url)
+    return InProcessEventBus(registry)
+
+
+async def run(backend: str, redis_url: str, events: int, concurrency: int) -> None:
+    bus = create_bus(backend, redis_url)
+    await bus.start()
+    try:
+        started = time.perf_counter()
+        for index in range(events):
+            await bus.publish(sample_event(index))
+        elapsed = time.perf_counter() - started
+        print(f"[{backend}] sequential: {events / elapsed:.0f} events/s {bus.stats()}")
+
+        bus.publish_stats = PublishStats()
+        started = time.perf_counter()
+        for offset in range(0, events, concurrency):
+            await asyncio.gather(
+                *(
+                    bus.publish(sample_event(index))
+                    for index in range(offset, min(offset + concurrency, events))
+                )
+            )
+        elapsed = time.perf_counter() - started
+        print(f"[{backend}] concurrency={concurrency}: {events / elapsed:.0f} events/s {bus.stats()}")
+    finally:
+        await bus.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", choices=["memory", "redis"], default="memory")
+    parser.add_argument("--redis-url", default="redis://localhost:6379/0")
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.backend, args.redis_url, args.events, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
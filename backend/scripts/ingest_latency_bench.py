@@ -0,0 +1,95 @@
+"""Measure the delay between a pushed call and its WebSocket event.
+
+Posts signed payloads to ``POST /ingest/calls`` one at a time and waits for
+the ``calls_changed`` event carrying each call on ``/ws``. The pushed calls
+are stored like real ones, with ``bench-`` prefixed consumption ids.
+
+    python -m scripts.ingest_latency_bench --token <jwt> --secret <INGEST_SECRET> --calls 50
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import urllib.request
+import uuid
+from datetime import datetime
+
+import websockets
+
+from app.ingest import SIGNATURE_HEADER, TIMESTAMP_HEADER, sign_ingest_body
+
+
+def post_call(url: str, secret: str, payload: dict) -> dict:
+    body = json.dumps(payload).encode()
+    timestamp = str(int(time.time()))
+    request = urllib.request.Request(
+        url,
+        data=body,
+        method="POST",
+        headers={
+            "Content-Type": "application/json",
+            TIMESTAMP_HEADER: timestamp,
+            SIGNATURE_HEADER: sign_ingest_body(secret, timestamp, body),
+        },
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+async def wait_for_call(websocket, consumption_id: str) -> None:
+    while True:
+        message = json.loads(await websocket.recv())
+        if message.get("type") == "ping":
+            await websocket.send(json.dumps({"action": "pong"}))
+            continue
+        if message.get("type") != "calls_changed":
+            continue
+        calls = message.get("payload", {}).get("calls", [])
+        if any(call["ovh_consumption_id"] == consumption_id for call in calls):
+            return
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:1128")
+    parser.add_argument("--token", required=True)
+    parser.add_argument("--secret", required=True)
+    parser.add_argument("--calls", type=int, default=50)
+    args = parser.parse_args()
+
+    ws_url = args.base_url.replace("http", "ws", 1) + f"/ws?token={args.token}&topics=calls"
+    ingest_url = f"{args.base_url}/ingest/calls"
+    push_latencies: list[float] = []
+    event_latencies: list[float] = []
+    async with websockets.connect(ws_url) as websocket:
+        for _ in range(args.calls):
+            consumption_id = f"bench-{uuid.uuid4().hex}"
+            payload = {
+                "id": consumption_id,
+                "creationDatetime": datetime.utcnow().isoformat(),
+                "calling": "0600000000",
+                "called": "0400000000",
+                "duration": 30,
+                "way": "incoming",
+            }
+            started = time.perf_counter()
+            waiter = asyncio.create_task(wait_for_call(websocket, consumption_id))
+            await asyncio.to_thread(post_call, ingest_url, args.secret, payload)
+            push_latencies.append(time.perf_counter() - started)
+            await asyncio.wait_for(waiter, timeout=10)
+            event_latencies.append(time.perf_counter() - started)
+
+    for label, latencies in (("POST response", push_latencies), ("WebSocket event", event_latencies)):
+        latencies.sort()
+        print(
+            f"{label} ms: "
+            f"p50={statistics.median(latencies) * 1000:.1f} "
+            f"p95={latencies[max(int(len(latencies) * 0.95) - 1, 0)] * 1000:.1f} "
+            f"max={latencies[-1] * 1000:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,225 @@
+"""Measure LDAP login latency against a local LDAP stand-in.
+
+Starts a minimal LDAP server in-process (binds, user and group searches,
+root DSE and an OpenLDAP 2.4 schema, with ``--latency-ms`` added to every
+response), then runs ``--logins`` sequential ``ldap_service.authenticate``
+calls over ``--users`` distinct users and prints the latency and the number
+of LDAP operations per login.
+
+    python -m scripts.ldap_login_bench --logins 200 --users 20 --latency-ms 2
+"""
+
+import argparse
+import json
+import socket
+import socketserver
+import statistics
+import threading
+import time
+from collections import Counter
+
+from ldap3.protocol.rfc4511 import (
+    BindResponse,
+    LDAPMessage,
+    MessageID,
+    PartialAttribute,
+    PartialAttributeList,
+    ProtocolOp,
+    ResultCode,
+    SearchResultDone,
+    SearchResultEntry,
+    Vals,
+)
+from ldap3.protocol.schemas.slapd24 import slapd_2_4_dsa_info, slapd_2_4_schema
+from ldap3.strategy.base import BaseStrategy
+from pyasn1.codec.ber import encoder
+
+from app.ldap_auth import LdapConfig, ldap_service
+
+BASE_DN = "dc=bench,dc=local"
+ADMIN_DN = f"uid=admin,ou=people,{BASE_DN}"
+ADMIN_PASSWORD = "admin"
+USER_PASSWORD = "secret"
+GROUP = "telephonie"
+
+ROOT_DSE = json.loads(slapd_2_4_dsa_info)["raw"]
+SCHEMA = json.loads(slapd_2_4_schema)
+SCHEMA["raw"]["attributeTypes"].append(
+    "( 1.3.6.1.4.1.99999.1 NAME 'display_name' "
+    "SYNTAX 1.3.6.1.4.1.1466.115.121.1.15 )"
+)
+
+BIND_REQUEST = 0x60
+UNBIND_REQUEST = 0x42
+SEARCH_REQUEST = 0x63
+EQUALITY_MATCH = 0xA3
+AND_FILTER = 0xA0
+OR_FILTER = 0xA1
+OPERATION_NAMES = {BIND_REQUEST: "bind", SEARCH_REQUEST: "search", UNBIND_REQUEST: "unbind"}
+
+
+def user_dn(uid: str) -> str:
+    return f"uid={uid},ou=people,{BASE_DN}"
+
+
+def read_tlv(data: bytes, position: int = 0) -> tuple[int, bytes, int]:
+    """Return the tag, value and end offset of the BER element at ``position``."""
+    tag = data[position]
+    length = data[position + 1]
+    position += 2
+    if length & 0x80:
+        octets = length & 0x7F
+        length = int.from_bytes(data[position : position + octets], "big")
+        position += octets
+    return tag, data[position : position + length], position + length
+
+
+def read_all(data: bytes) -> list[tuple[int, bytes]]:
+    elements = []
+    position = 0
+    while position < len(data):
+        tag, value, position = read_tlv(data, position)
+        elements.append((tag, value))
+    return elements
+
+
+def equality_matches(tag: int, value: bytes) -> dict[str, str]:
+    """Collect the ``(attr=value)`` terms of a filter, looking into and/or."""
+    if tag == EQUALITY_MATCH:
+        (_, attribute), (_, assertion) = read_all(value)
+        return {attribute.decode().lower(): assertion.decode()}
+    matches: dict[str, str] = {}
+    if tag in (AND_FILTER, OR_FILTER):
+        for child_tag, child_value in read_all(value):
+            matches.update(equality_matches(child_tag, child_value))
+    return matches
+
+
+class LdapStandIn(socketserver.BaseRequestHandler):
+    latency = 0.0
+    operations: Counter = Counter()
+
+    def send(self, message_id: int, name: str, operation) -> None:
+        message = LDAPMessage()
+        message["messageID"] = MessageID(message_id)
+        protocol_op = ProtocolOp()
+        protocol_op[name] = operation
+        message["protocolOp"] = protocol_op
+        self.request.sendall(encoder.encode(message))
+
+    def result(self, cls, code: str = "success"):
+        operation = cls()
+        operation["resultCode"] = ResultCode(code)
+        operation["matchedDN"] = ""
+        operation["diagnosticMessage"] = ""
+        return operation
+
+    def entry(self, dn: str, attributes: dict):
+        operation = SearchResultEntry()
+        operation["object"] = dn
+        attribute_list = PartialAttributeList()
+        for index, (name, values) in enumerate(attributes.items()):
+            attribute = PartialAttribute()
+            attribute["type"] = name
+            vals = Vals()
+            for value_index, value in enumerate(values):
+                vals[value_index] = str(value)
+            attribute["vals"] = vals
+            attribute_list[index] = attribute
+        operation["attributes"] = attribute_list
+        return operation
+
+    def search(self, request: bytes) -> list[tuple[str, dict]]:
+        elements = read_all(request)
+        base = elements[0][1].decode()
+        matches = equality_matches(*elements[6])
+        if base == "":
+            return [("", ROOT_DSE)]
+        if base == SCHEMA["schema_entry"]:
+            return [(base, SCHEMA["raw"])]
+        if "uid" in matches:
+            uid = matches["uid"]
+            return [(user_dn(uid), {"uid": [uid], "cn": [uid]})]
+        if matches.get("member", "").endswith(f",ou=people,{BASE_DN}"):
+            return [(f"cn={GROUP},ou=groups,{BASE_DN}", {"cn": [GROUP]})]
+        return []
+
+    def handle(self) -> None:
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        buffer = b""
+        while True:
+            size = BaseStrategy.compute_ldap_message_size(buffer)
+            if size == -1 or len(buffer) < size:
+                data = self.request.recv(65536)
+                if not data:
+                    return
+                buffer += data
+                continue
+            _, message, _ = read_tlv(buffer[:size])
+            buffer = buffer[size:]
+            (_, raw_id), (operation, request) = read_all(message)[:2]
+            message_id = int.from_bytes(raw_id, "big")
+            self.operations[OPERATION_NAMES.get(operation, hex(operation))] += 1
+            if operation == UNBIND_REQUEST:
+                return
+            time.sleep(self.latency)
+            if operation == BIND_REQUEST:
+                _, (_, name), (_, password) = read_all(request)
+                ok = (name.decode() == ADMIN_DN and password.decode() == ADMIN_PASSWORD) or (
+                    name.decode() != ADMIN_DN and password.decode() == USER_PASSWORD
+                )
+                code = "success" if ok else "invalidCredentials"
+                self.send(message_id, "bindResponse", self.result(BindResponse, code))
+            elif operation == SEARCH_REQUEST:
+                for dn, attributes in self.search(request):
+                    self.send(message_id, "searchResEntry", self.entry(dn, attributes))
+                self.send(message_id, "searchResDone", self.result(SearchResultDone))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    LdapStandIn.latency = args.latency_ms / 1000
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), LdapStandIn)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    config = LdapConfig(
+        enabled=True,
+        url=f"ldap://127.0.0.1:{server.server_address[1]}",
+        bind_dn=ADMIN_DN,
+        bind_password=ADMIN_PASSWORD,
+        user_base_dn=f"ou=people,{BASE_DN}",
+        user_filter="(|(uid={username})(mail={username}))",
+        group_base_dn=f"ou=groups,{BASE_DN}",
+        group_filter="(member={user_dn})",
+        group_name_attr="cn",
+        group_required=GROUP,
+        group_role_map=f"{GROUP}:OPERATEUR",
+    )
+
+    latencies: list[float] = []
+    for index in range(args.logins):
+        started = time.perf_counter()
+        ldap_service.authenticate(config, f"user{index % args.users}", USER_PASSWORD)
+        latencies.append(time.perf_counter() - started)
+    server.shutdown()
+
+    latencies.sort()
+    print(
+        f"{args.logins} logins ({args.users} users) ms: "
+        f"p50={statistics.median(latencies) * 1000:.1f} "
+        f"p95={latencies[max(int(len(latencies) * 0.95) - 1, 0)] * 1000:.1f} "
+        f"max={latencies[-1] * 1000:.1f}"
+    )
+    per_login = {
+        name: round(count / args.logins, 2) for name, count in LdapStandIn.operations.items()
+    }
+    print(f"LDAP operations per login: {per_login}")
+
+
+if __name__ == "__main__":
+    main()
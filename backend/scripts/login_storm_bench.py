@@ -0,0 +1,82 @@
+"""Measure dashboard latency while many users log in at once.
+
+Fires ``--logins`` concurrent ``POST /auth/login`` requests (shift change)
+while one client keeps polling ``GET /dashboard/summary``, then prints the
+login status codes and the dashboard latency during the storm.
+
+    python -m scripts.login_storm_bench --username admin --password admin --logins 40
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+
+def request(url: str, body: dict = None, token: str = None) -> tuple[int, bytes]:
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, headers=headers)
+    try:
+        with urllib.request.urlopen(req) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, exc.read()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:1128")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--logins", type=int, default=40)
+    args = parser.parse_args()
+
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=args.logins + 1)
+    credentials = {"username": args.username, "password": args.password}
+    status, body = request(f"{args.base_url}/auth/login", credentials)
+    token = json.loads(body)["access_token"]
+
+    storm_done = asyncio.Event()
+    latencies: list[float] = []
+
+    async def poll_dashboard() -> None:
+        while not storm_done.is_set():
+            started = time.perf_counter()
+            await loop.run_in_executor(
+                executor, request, f"{args.base_url}/dashboard/summary", None, token
+            )
+            latencies.append(time.perf_counter() - started)
+
+    poller = asyncio.create_task(poll_dashboard())
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(
+            loop.run_in_executor(executor, request, f"{args.base_url}/auth/login", credentials)
+            for _ in range(args.logins)
+        )
+    )
+    storm_seconds = time.perf_counter() - started
+    storm_done.set()
+    await poller
+
+    latencies.sort()
+    print(f"{args.logins} logins in {storm_seconds:.2f}s: {dict(Counter(code for code, _ in results))}")
+    print(
+        f"dashboard during storm ({len(latencies)} requests) ms: "
+        f"p50={statistics.median(latencies) * 1000:.1f} "
+        f"p95={latencies[max(int(len(latencies) * 0.95) - 1, 0)] * 1000:.1f} "
+        f"max={latencies[-1] * 1000:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,237 @@
+"""Check the query plans of the hot call queries; exit 1 when one degrades.
+
+Every statement comes from the app's own builders (calls_query and the
+dashboard statements) and is planned with EXPLAIN (FORMAT JSON) on the
+PostgreSQL database of DATABASE_URL. A case fails when it scans
+call_records sequentially while the table holds more than
+``--seq-scan-threshold`` rows, when it does not use the index expected
+for it, or, with ``--compare``, when it lost an index or its estimated
+cost grew more than ``--max-cost-ratio`` times since the saved run.
+
+    python -m scripts.plan_guard --seed 1m --save plans.json
+    python -m scripts.plan_guard --compare plans.json
+
+``--seed`` first replaces the calls with a scripts.seed_dataset dataset,
+so point DATABASE_URL at a scratch database when using it.
+"""
+
+import argparse
+import itertools
+import json
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import Select, select, text
+from sqlalchemy.dialects import postgresql
+
+from app.calls import (
+    calls_query,
+    dashboard_hourly_statement,
+    dashboard_summary_statement,
+    dashboard_timeseries_statement,
+    timeseries_start,
+)
+from app.database import engine
+from app.models import CallDirection, TeamLead
+from scripts.seed_dataset import SCALES, seed_dataset
+
+TABLE = "call_records"
+STARTED_AT_INDEX = "ix_call_records_started_at_is_missed"
+TRIGRAM_INDEXES = {"ix_call_records_calling_digits_trgm", "ix_call_records_called_digits_trgm"}
+PAGE_SIZE = 100
+
+
+@dataclass
+class Case:
+    name: str
+    statement: Select
+    # At least one of these must appear in the plan; empty means no expectation.
+    indexes: set[str] = field(default_factory=set)
+    index_only: bool = False
+    allow_seq_scan: bool = False
+
+
+def cases(trigram_indexes: set[str]) -> list[Case]:
+    now = datetime.utcnow()
+    ranges = {
+        "": (None, None),
+        "_day": (now - timedelta(days=1), None),
+        "_week": (now - timedelta(days=7), now),
+    }
+    directions = {"": None, "_inbound": CallDirection.INBOUND, "_outbound": CallDirection.OUTBOUND}
+    missed_values = {"": None, "_missed": True, "_answered": False}
+    result = []
+    for (direction_name, direction), (missed_name, missed), (range_name, (start, end)) in (
+        itertools.product(directions.items(), missed_values.items(), ranges.items())
+    ):
+        query = calls_query(direction=direction, missed=missed, start=start, end=end)
+        result.append(
+            Case(
+                f"calls{direction_name}{missed_name}{range_name}",
+                query.limit(PAGE_SIZE),
+                {STARTED_AT_INDEX},
+            )
+        )
+    result.append(
+        Case(
+            "calls_deep_page",
+            calls_query().offset(200 * PAGE_SIZE).limit(PAGE_SIZE),
+            {STARTED_AT_INDEX},
+        )
+    )
+    result.append(
+        Case("export_week", calls_query(start=now - timedelta(days=7)), {STARTED_AT_INDEX})
+    )
+    # Substring searches need the trigram indexes; without pg_trgm they scan the table.
+    for name, number in (("number", "0476000000"), ("number_unknown", "0999999999")):
+        result.append(
+            Case(
+                f"calls_{name}",
+                calls_query(number=number).limit(PAGE_SIZE),
+                trigram_indexes,
+                allow_seq_scan=not trigram_indexes,
+            )
+        )
+    result.extend(
+        [
+            Case("dashboard_summary", dashboard_summary_statement(), {STARTED_AT_INDEX}, True),
+            Case("dashboard_hourly", dashboard_hourly_statement(), {STARTED_AT_INDEX}, True),
+            Case(
+                "dashboard_timeseries",
+                dashboard_timeseries_statement(timeseries_start(7)),
+                {STARTED_AT_INDEX},
+                True,
+            ),
+            Case(
+                "dashboard_timeseries_30",
+                dashboard_timeseries_statement(timeseries_start(30)),
+                {STARTED_AT_INDEX},
+                True,
+            ),
+            # Loaded in full for every page of calls; small enough to scan.
+            Case("team_leads", select(TeamLead), allow_seq_scan=True),
+        ]
+    )
+    return result
+
+
+def plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from plan_nodes(child)
+
+
+def explain(connection, statement: Select) -> dict:
+    sql = statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    return connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()[0]["Plan"]
+
+
+def summarize(plan: dict) -> dict:
+    nodes = list(plan_nodes(plan))
+    return {
+        "cost": plan["Total Cost"],
+        "scans": sorted(
+            {
+                f"{node['Node Type']} {node.get('Index Name') or node.get('Relation Name')}"
+                for node in nodes
+                if "Scan" in node["Node Type"]
+            }
+        ),
+        "indexes": sorted({node["Index Name"] for node in nodes if "Index Name" in node}),
+    }
+
+
+def check(
+    case: Case,
+    plan: dict,
+    table_rows: float,
+    threshold: int,
+    previous: Optional[dict],
+    ratio: float,
+) -> list[str]:
+    problems = []
+    nodes = list(plan_nodes(plan))
+    summary = summarize(plan)
+    seq_scans = [
+        node
+        for node in nodes
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") == TABLE
+    ]
+    if seq_scans and not case.allow_seq_scan and table_rows > threshold:
+        problems.append(f"sequential scan on {TABLE} ({table_rows:.0f} rows)")
+    if case.indexes and not case.indexes & set(summary["indexes"]):
+        problems.append(f"none of {sorted(case.indexes)} used")
+    if case.index_only and not any(
+        node["Node Type"] == "Index Only Scan" and node.get("Index Name") in case.indexes
+        for node in nodes
+    ):
+        problems.append("not an index-only scan")
+    if previous:
+        lost = set(previous["indexes"]) - set(summary["indexes"]) - case.indexes
+        if lost:
+            problems.append(f"no longer uses {sorted(lost)}")
+        if previous["cost"] and summary["cost"] > previous["cost"] * ratio:
+            problems.append(f"cost {previous['cost']:.0f} -> {summary['cost']:.0f}")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seed", choices=SCALES, help="replace the calls with a seeded dataset")
+    parser.add_argument("--seq-scan-threshold", type=int, default=10_000)
+    parser.add_argument("--save", type=Path, help="write the plan summaries as JSON")
+    parser.add_argument("--compare", type=Path, help="plan summaries of an earlier run")
+    parser.add_argument("--max-cost-ratio", type=float, default=2.0)
+    parser.add_argument("--dump", type=Path, help="directory for the full JSON plans")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        sys.exit("plan_guard needs DATABASE_URL to point at PostgreSQL")
+    if args.seed:
+        seed_dataset(SCALES[args.seed], replace=True)
+    previous = json.loads(args.compare.read_text()) if args.compare else {}
+
+    summaries, failures = {}, 0
+    with engine.connect() as connection:
+        table_rows = connection.execute(
+            text("SELECT reltuples FROM pg_class WHERE relname = :table"), {"table": TABLE}
+        ).scalar()
+        existing = set(
+            connection.execute(
+                text("SELECT indexname FROM pg_indexes WHERE tablename = :table"), {"table": TABLE}
+            ).scalars()
+        )
+        print(f"{TABLE}: about {table_rows:.0f} rows")
+        for case in cases(TRIGRAM_INDEXES & existing):
+            plan = explain(connection, case.statement)
+            summaries[case.name] = summarize(plan)
+            if args.dump:
+                args.dump.mkdir(parents=True, exist_ok=True)
+                (args.dump / f"{case.name}.json").write_text(json.dumps(plan, indent=2) + "\n")
+            problems = check(
+                case,
+                plan,
+                table_rows,
+                args.seq_scan_threshold,
+                previous.get(case.name),
+                args.max_cost_ratio,
+            )
+            failures += bool(problems)
+            status = "FAIL" if problems else "ok"
+            print(
+                f"{status:>4} {case.name:<32} cost={plan['Total Cost']:>11.1f} "
+                f"{', '.join(summaries[case.name]['scans'])}"
+            )
+            for problem in problems:
+                print(f"       {problem}")
+    if args.save:
+        args.save.write_text(json.dumps(summaries, indent=2) + "\n")
+    print(f"{len(summaries) - failures}/{len(summaries)} plans ok")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Write ``.br`` and ``.gz`` copies of the frontend build next to each file.
+
+Run once at image build time; the backend serves these copies to clients
+that accept them instead of compressing on every request.
+
+    python -m scripts.precompress_static /app/static
+"""
+
+import argparse
+import gzip
+from pathlib import Path
+
+import brotli
+
+COMPRESSIBLE_SUFFIXES = {
+    ".css", ".html", ".js", ".json", ".map", ".mjs", ".svg", ".txt", ".webmanifest"
+}
+MINIMUM_SIZE = 1024
+
+
+def precompress(directory: Path) -> tuple[int, int, int]:
+    """Return the number of files compressed and their total size before and after brotli."""
+    count = original_total = compressed_total = 0
+    for path in sorted(directory.rglob("*")):
+        if not path.is_file() or path.suffix not in COMPRESSIBLE_SUFFIXES:
+            continue
+        data = path.read_bytes()
+        if len(data) < MINIMUM_SIZE:
+            continue
+        compressed = brotli.compress(data, quality=11)
+        path.with_name(path.name + ".br").write_bytes(compressed)
+        path.with_name(path.name + ".gz").write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+        count += 1
+        original_total += len(data)
+        compressed_total += len(compressed)
+    return count, original_total, compressed_total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("directory", type=Path)
+    args = parser.parse_args()
+    count, original_total, compressed_total = precompress(args.directory)
+    print(f"{count} files precompressed: {original_total} bytes -> {compressed_total} bytes (br)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Measure throughput of the hot read endpoints under concurrent clients.
+
+Each of ``--clients`` clients loops over the dashboard reads (calls,
+summary, hourly, timeseries, team leads) for ``--seconds`` seconds; the
+script then prints requests/second and latency percentiles per endpoint.
+
+    python -m scripts.read_load_bench --username admin --password admin --clients 50
+"""
+
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter, defaultdict
+
+PATHS = (
+    "/calls?page_size=100",
+    "/calls?page=2&page_size=50",
+    "/dashboard/summary",
+    "/dashboard/hourly",
+    "/dashboard/timeseries",
+    "/team-leads",
+)
+
+
+def request(url: str, token: str) -> int:
+    req = urllib.request.Request(url, headers={"Authorization": f"Bearer {token}"})
+    try:
+        with urllib.request.urlopen(req) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as exc:
+        return exc.code
+
+
+def login(base_url: str, username: str, password: str) -> str:
+    req = urllib.request.Request(
+        f"{base_url}/auth/login",
+        data=json.dumps({"username": username, "password": password}).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(req) as response:
+        return json.loads(response.read())["access_token"]
+
+
+def percentile(values: list[float], ratio: float) -> float:
+    return values[max(int(len(values) * ratio) - 1, 0)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:1128")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=20)
+    args = parser.parse_args()
+
+    token = login(args.base_url, args.username, args.password)
+    latencies: dict[str, list[float]] = defaultdict(list)
+    statuses: Counter = Counter()
+    deadline = time.perf_counter() + args.seconds
+
+    def client(offset: int) -> None:
+        index = offset
+        while time.perf_counter() < deadline:
+            path = PATHS[index % len(PATHS)]
+            index += 1
+            started = time.perf_counter()
+            status = request(f"{args.base_url}{path}", token)
+            latencies[path].append(time.perf_counter() - started)
+            statuses[status] += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(args.clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    every = sorted(value for values in latencies.values() for value in values)
+    print(
+        f"{args.clients} clients, {elapsed:.1f}s: {len(every) / elapsed:.0f} req/s, "
+        f"p50={statistics.median(every) * 1000:.1f} ms p99={percentile(every, 0.99) * 1000:.1f} ms "
+        f"statuses={dict(statuses)}"
+    )
+    for path in PATHS:
+        values = sorted(latencies[path])
+        print(
+            f"  {path}: {len(values)} requests, p50={statistics.median(values) * 1000:.1f} ms "
+            f"p99={percentile(values, 0.99) * 1000:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""Fill the database with a synthetic dataset for benchmarks.
+
+Calls are spread over ``--days`` days with more traffic on weekdays and
+during office hours, a few hundred lines receiving most of the calls, a
+tail of repeat callers, more missed calls at peak hours and log-normal
+durations. Team leads are spread over a handful of categories and
+statuses. Scales: 100k, 1m and 10m call records.
+
+    python -m scripts.seed_dataset --scale 1m --replace
+
+Uses DATABASE_URL like the backend; rows are streamed with COPY on
+PostgreSQL and inserted in batches elsewhere.
+"""
+
+import argparse
+import csv
+import io
+import json
+import math
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Iterator
+
+from sqlalchemy import delete, func, insert, select, text
+
+from app.database import engine
+from app.models import CallDirection, CallRecord, TeamLead, TeamLeadCategory
+
+SCALES = {"100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+BATCH_SIZE = 50_000
+# Share of a day's calls in each hour: quiet nights, peaks late morning and afternoon.
+HOUR_WEIGHTS = [
+    1, 1, 1, 1, 1, 2, 4, 8, 14, 18, 20, 18, 10, 12, 18, 20, 18, 14, 9, 6, 4, 3, 2, 1
+]
+WEEKDAY_WEIGHTS = [10, 10, 10, 10, 9, 5, 4]
+INBOUND_RATIO = 0.7
+CATEGORIES = ["Secours", "Logistique", "Transmissions", "Soutien", "Formation", "Encadrement"]
+TEAM_LEAD_STATUSES = (("Disponible", 70), ("En intervention", 20), ("Indisponible", 10))
+FIRST_NAMES = [
+    "Camille", "Lucas", "Léa", "Hugo", "Chloé", "Louis", "Manon", "Jules", "Inès", "Noah"
+]
+LAST_NAMES = ["Martin", "Bernard", "Dubois", "Thomas", "Robert", "Richard", "Petit", "Durand"]
+CALL_COLUMNS = (
+    "ovh_consumption_id",
+    "started_at",
+    "direction",
+    "calling_number",
+    "called_number",
+    "duration",
+    "status",
+    "is_missed",
+    "raw_payload",
+    "created_at",
+)
+
+
+def phone_number(index: int) -> str:
+    """A French number for subscriber ``index``, written the way OVH or a user might."""
+    national = f"{4 + index % 3}{76000000 + index * 7919 % 24000000:08d}"
+    style = index % 10
+    if style < 6:
+        return f"+33{national}"
+    if style < 9:
+        return f"0{national}"
+    return f"0033{national}"
+
+
+def daily_counts(rng: random.Random, count: int, start: datetime, days: int) -> list[int]:
+    weights = [WEEKDAY_WEIGHTS[(start + timedelta(days=day)).weekday()] for day in range(days)]
+    total = sum(weights)
+    counts = [int(count * weight / total * rng.uniform(0.85, 1.15)) for weight in weights]
+    counts[-1] = max(count - sum(counts[:-1]), 0)
+    return counts
+
+
+def call_times(rng: random.Random, count: int, days: int, now: datetime) -> Iterator[datetime]:
+    """Start times in chronological order, as the sync worker inserts calls."""
+    start = (now - timedelta(days=days - 1)).replace(hour=0, minute=0, second=0)
+    for day, day_count in enumerate(daily_counts(rng, count, start, days)):
+        day_start = start + timedelta(days=day)
+        # The last day only runs until now.
+        span = min(int((now - day_start).total_seconds()), 86400)
+        hours = rng.choices(range(24), weights=HOUR_WEIGHTS, k=day_count)
+        for offset in sorted(hour * 3600 + rng.randrange(3600) for hour in hours):
+            yield day_start + timedelta(seconds=offset * span // 86400)
+
+
+def call_rows(count: int, days: int, seed: int) -> Iterator[tuple]:
+    rng = random.Random(seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    lines = [phone_number(index) for index in range(max(count // 5000, 20))]
+    callers = max(count // 20, 100)
+    created_at = now.isoformat(sep=" ")
+    for index, started_at in enumerate(call_times(rng, count, days, now)):
+        inbound = rng.random() < INBOUND_RATIO
+        # Lines and callers follow a power law: a few of each make most of the traffic.
+        line = lines[int(len(lines) * rng.random() ** 2)]
+        caller = phone_number(1000 + int(callers * rng.random() ** 3))
+        missed = inbound and rng.random() < 0.08 + 0.12 * HOUR_WEIGHTS[started_at.hour] / 20
+        duration = 0 if missed else int(math.exp(rng.gauss(4.5, 1.0)))
+        status = "missed" if missed else "answered"
+        calling, called = (caller, line) if inbound else (line, caller)
+        consumption_id = f"seed-{seed}-{index}"
+        payload = {
+            "id": consumption_id,
+            "creationDatetime": started_at.isoformat(),
+            "calling": calling,
+            "called": called,
+            "duration": duration,
+            "nature": "incoming" if inbound else "outgoing",
+            "status": status,
+        }
+        yield (
+            consumption_id,
+            started_at.isoformat(sep=" "),
+            (CallDirection.INBOUND if inbound else CallDirection.OUTBOUND).name,
+            calling,
+            called,
+            duration,
+            status,
+            missed,
+            json.dumps(payload),
+            created_at,
+        )
+
+
+def copy_calls(rows: Iterator[tuple]) -> None:
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        while True:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            written = 0
+            for row in rows:
+                writer.writerow(row)
+                written += 1
+                if written == BATCH_SIZE:
+                    break
+            if not written:
+                break
+            buffer.seek(0)
+            cursor.copy_expert(
+                f"COPY call_records ({', '.join(CALL_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+            connection.commit()
+    finally:
+        connection.close()
+
+
+def insert_calls(rows: Iterator[tuple]) -> None:
+    table = CallRecord.__table__
+    batch = []
+    with engine.begin() as connection:
+        for row in rows:
+            values = dict(zip(CALL_COLUMNS, row))
+            values["started_at"] = datetime.fromisoformat(values["started_at"])
+            values["created_at"] = datetime.fromisoformat(values["created_at"])
+            values["direction"] = CallDirection[values["direction"]]
+            values["raw_payload"] = json.loads(values["raw_payload"])
+            batch.append(values)
+            if len(batch) == BATCH_SIZE:
+                connection.execute(insert(table), batch)
+                batch = []
+        if batch:
+            connection.execute(insert(table), batch)
+
+
+def seed_team_leads(count: int, seed: int) -> None:
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    with engine.begin() as connection:
+        existing = set(connection.execute(select(TeamLeadCategory.name)).scalars())
+        missing = [
+            {"name": name, "position": position}
+            for position, name in enumerate(CATEGORIES)
+            if name not in existing
+        ]
+        if missing:
+            connection.execute(insert(TeamLeadCategory), missing)
+        category_ids = list(connection.execute(select(TeamLeadCategory.id)).scalars())
+        statuses, weights = zip(*TEAM_LEAD_STATUSES)
+        leads = []
+        for index in range(count):
+            status = rng.choices(statuses, weights=weights)[0]
+            intervening = status == "En intervention"
+            leads.append(
+                {
+                    "team_name": f"Équipe {index + 1}",
+                    "leader_first_name": rng.choice(FIRST_NAMES),
+                    "leader_last_name": rng.choice(LAST_NAMES),
+                    "phone": phone_number(500_000 + index),
+                    "status": status,
+                    "intervention_started_at": (
+                        now - timedelta(minutes=rng.randrange(1, 240)) if intervening else None
+                    ),
+                    "intervention_count": rng.randrange(0, 50),
+                    # A few leads wait in no category, as after an import.
+                    "category_id": rng.choice(category_ids) if rng.random() < 0.9 else None,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            )
+        connection.execute(insert(TeamLead), leads)
+
+
+def seed_dataset(
+    count: int, days: int = 365, team_leads: int = 300, seed: int = 1, replace: bool = False
+) -> int:
+    """Insert the calls and team leads; return the number of calls in the table."""
+    if replace:
+        with engine.begin() as connection:
+            if engine.dialect.name == "postgresql":
+                connection.execute(text("TRUNCATE call_records"))
+            connection.execute(delete(CallRecord))
+            connection.execute(delete(TeamLead))
+            connection.execute(delete(TeamLeadCategory))
+    rows = call_rows(count, days, seed)
+    if engine.dialect.name == "postgresql":
+        copy_calls(rows)
+    else:
+        insert_calls(rows)
+    seed_team_leads(team_leads, seed)
+    if engine.dialect.name == "postgresql":
+        # Sets the visibility map too, as autovacuum would, so index-only scans apply.
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text("VACUUM ANALYZE call_records"))
+            connection.execute(text("VACUUM ANALYZE team_leads"))
+    with engine.connect() as connection:
+        return connection.execute(select(func.count()).select_from(CallRecord)).scalar()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", choices=SCALES, default="100k")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--team-leads", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--replace", action="store_true", help="delete existing calls, team leads and categories"
+    )
+    args = parser.parse_args()
+
+    count = SCALES[args.scale]
+    started = time.perf_counter()
+    total = seed_dataset(count, args.days, args.team_leads, args.seed, args.replace)
+    print(
+        f"{count} calls over {args.days} days and {args.team_leads} team leads seeded "
+        f"in {time.perf_counter() - started:.0f}s ({total} calls in the table)"
+    )
+
+
+if __name__ == "__main__":
+    main()
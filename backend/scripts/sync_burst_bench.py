@@ -0,0 +1,79 @@
+"""Count reload-triggering events and HTTP requests for a simulated call burst.
+
+Runs one sync cycle against an in-memory SQLite database and a fake OVH
+client returning ``--calls`` new consumptions, then compares the HTTP
+requests that ``--clients`` open dashboards would issue with per-record
+events versus the batched ``calls_changed`` event.
+
+    python -m scripts.sync_burst_bench --calls 50 --clients 20
+"""
+
+import argparse
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import ovh_client, sync
+from app.database import Base
+from app.models import OvhSettings
+
+# The dashboard reloads summary, hourly and the latest calls on each event.
+REQUESTS_PER_RELOAD = 3
+RELOAD_EVENT_TYPES = {"calls_changed"}
+
+
+class FakeOVHClient:
+    def __init__(self, call_count: int) -> None:
+        self.call_count = call_count
+
+    def list_consumptions(self, from_date=None, to_date=None):
+        return [("0033100000000", str(index)) for index in range(self.call_count)]
+
+    def get_consumption_detail(self, service_name: str, consumption_id: str) -> dict:
+        return {
+            "id": consumption_id,
+            "creationDatetime": datetime.utcnow().isoformat(),
+            "calling": "0600000000",
+            "called": "0400000000",
+            "duration": 30,
+            "way": "incoming",
+        }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--clients", type=int, default=20)
+    args = parser.parse_args()
+
+    # One shared connection: the sync cycle runs in the threadpool.
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(OvhSettings(billing_account="bench"))
+    db.commit()
+
+    ovh_client.OVHClient = lambda settings_row, endpoint: FakeOVHClient(args.calls)
+    events: list[dict] = []
+
+    async def publish(payload: dict) -> None:
+        events.append(payload)
+
+    new_count = await sync.sync_consumptions(db, publish)
+    reload_events = [event for event in events if event["type"] in RELOAD_EVENT_TYPES]
+    per_record_requests = new_count * REQUESTS_PER_RELOAD * args.clients
+    batched_requests = len(reload_events) * REQUESTS_PER_RELOAD * args.clients
+    print(f"new calls: {new_count}, events published: {[event['type'] for event in events]}")
+    print(f"HTTP requests with per-record events: {per_record_requests}")
+    print(f"HTTP requests with batched events: {batched_requests}")
+    if per_record_requests:
+        print(f"reduction: {100 * (1 - batched_requests / per_record_requests):.1f}%")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,116 @@
+"""Time setting up a board one request per team lead against the bulk endpoints.
+
+Creates ``--count`` leads with POST /team-leads, then as many with one
+POST /team-leads/bulk, updates the bulk ones again from a CSV file, and
+reverses the category order with one PATCH per category before putting
+it back with PATCH /team-lead-categories/order. Leads are added, so point the backend
+at a scratch database.
+
+    python -m scripts.team_lead_bulk_bench --username admin --password admin --count 1000
+"""
+
+import argparse
+import csv
+import io
+import json
+import time
+import urllib.request
+import uuid
+
+from scripts.endpoint_bench import SERVER_TIMING_DB, login
+
+
+def send(base_url: str, token: str, method: str, path: str, body=None, content_type=None):
+    headers = {"Authorization": f"Bearer {token}"}
+    if content_type:
+        headers["Content-Type"] = content_type
+    req = urllib.request.Request(f"{base_url}{path}", data=body, method=method, headers=headers)
+    with urllib.request.urlopen(req) as response:
+        return json.loads(response.read()), response.headers.get("Server-Timing", "")
+
+
+def send_json(base_url: str, token: str, method: str, path: str, payload):
+    return send(base_url, token, method, path, json.dumps(payload).encode(), "application/json")
+
+
+def timed(label: str, requests: int, run) -> None:
+    queries = 0
+    started = time.perf_counter()
+    for server_timing in run():
+        match = SERVER_TIMING_DB.search(server_timing)
+        queries += int(match.group(2)) if match else 0
+    elapsed = time.perf_counter() - started
+    sql = f" {queries} SQL" if queries else ""
+    print(f"{label:<44} {requests:>5} requests {elapsed * 1000:>9.0f} ms{sql}")
+
+
+def lead(prefix: str, index: int, category_id: int) -> dict:
+    return {
+        "team_name": f"{prefix} {index}",
+        "leader_first_name": "Camille",
+        "leader_last_name": f"Martin {index}",
+        "phone": f"+3360000{index:04d}",
+        "status": "Disponible",
+        "category_id": category_id,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:1128")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--count", type=int, default=1000)
+    args = parser.parse_args()
+
+    base_url, count = args.base_url, args.count
+    token = login(base_url, args.username, args.password)
+    run = uuid.uuid4().hex[:6]
+    categories = [
+        send_json(base_url, token, "POST", "/team-lead-categories", {"name": f"Bench {run} {i}"})[0]
+        for i in range(8)
+    ]
+    all_categories = send(base_url, token, "GET", "/team-lead-categories")[0]
+    all_ids = [category["id"] for category in all_categories]
+    category_ids = [category["id"] for category in categories]
+
+    def one_by_one():
+        for index in range(count):
+            payload = lead(f"Unitaire {run}", index, category_ids[index % len(category_ids)])
+            yield send_json(base_url, token, "POST", "/team-leads", payload)[1]
+
+    def bulk_json():
+        payload = [
+            lead(f"Import {run}", index, category_ids[index % len(category_ids)])
+            for index in range(count)
+        ]
+        yield send_json(base_url, token, "POST", "/team-leads/bulk", payload)[1]
+
+    def bulk_csv():
+        output = io.StringIO()
+        writer = csv.writer(output, delimiter=";")
+        writer.writerow(["team_name", "leader_last_name", "status", "category"])
+        for index in range(count):
+            category = categories[(index + 1) % len(categories)]["name"]
+            writer.writerow([f"Import {run} {index}", "Durand", "En intervention", category])
+        body = output.getvalue().encode()
+        yield send(base_url, token, "POST", "/team-leads/bulk", body, "text/csv")[1]
+
+    def reorder_one_by_one():
+        for position, category_id in enumerate(reversed(all_ids), start=1):
+            path = f"/team-lead-categories/{category_id}"
+            yield send_json(base_url, token, "PATCH", path, {"position": position})[1]
+
+    def reorder_bulk():
+        path = "/team-lead-categories/order"
+        yield send_json(base_url, token, "PATCH", path, {"ids": all_ids})[1]
+
+    timed(f"POST /team-leads x {count}", count, one_by_one)
+    timed(f"POST /team-leads/bulk, JSON, {count} created", 1, bulk_json)
+    timed(f"POST /team-leads/bulk, CSV, {count} updated", 1, bulk_csv)
+    timed(f"PATCH /team-lead-categories/<id> x {len(all_ids)}", len(all_ids), reorder_one_by_one)
+    timed(f"PATCH /team-lead-categories/order, {len(all_ids)}", 1, reorder_bulk)
+
+
+if __name__ == "__main__":
+    main()
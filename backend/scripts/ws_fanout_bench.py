@@ -0,0 +1,82 @@
+"""Measure WebSocket fan-out latency and Redis connection count.
+
+Usage (from backend/, against a running stack):
+
+    python -m scripts.ws_fanout_bench --token <jwt> --clients 200 --events 50
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import redis.asyncio as redis
+import websockets
+
+from app.events import append_event
+
+
+async def count_redis_clients(redis_client: redis.Redis) -> int:
+    return len(await redis_client.client_list())
+
+
+async def run_client(url: str, expected: int, latencies: list[float], ready: asyncio.Event) -> None:
+    async with websockets.connect(url, max_queue=None) as websocket:
+        ready.set()
+        received = 0
+        while received < expected:
+            message = json.loads(await websocket.recv())
+            if message.get("type") != "bench":
+                continue
+            latencies.append(time.time() - message["payload"]["sent_at"])
+            received += 1
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="ws://localhost:1128/ws")
+    parser.add_argument("--redis-url", default="redis://localhost:6379/0")
+    parser.add_argument("--token", required=True)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--events", type=int, default=50)
+    parser.add_argument("--interval", type=float, default=0.05)
+    args = parser.parse_args()
+
+    redis_client = redis.from_url(args.redis_url, decode_responses=True)
+    baseline_connections = await count_redis_clients(redis_client)
+    latencies: list[float] = []
+    ready_events = [asyncio.Event() for _ in range(args.clients)]
+    url = f"{args.url}?token={args.token}"
+    tasks = [
+        asyncio.create_task(run_client(url, args.events, latencies, ready))
+        for ready in ready_events
+    ]
+    await asyncio.gather(*(ready.wait() for ready in ready_events))
+    await asyncio.sleep(0.5)
+    connected_connections = await count_redis_clients(redis_client)
+
+    for index in range(args.events):
+        payload = {"type": "bench", "payload": {"index": index, "sent_at": time.time()}}
+        await append_event(redis_client, json.dumps(payload))
+        await asyncio.sleep(args.interval)
+    await asyncio.wait_for(asyncio.gather(*tasks), timeout=30)
+    await redis_client.aclose()
+
+    latencies.sort()
+    print(f"clients={args.clients} events={args.events} deliveries={len(latencies)}")
+    print(
+        "redis connections: "
+        f"before={baseline_connections} with_clients={connected_connections} "
+        f"delta={connected_connections - baseline_connections}"
+    )
+    print(
+        "latency ms: "
+        f"p50={statistics.median(latencies) * 1000:.1f} "
+        f"p95={latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f} "
+        f"max={latencies[-1] * 1000:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,6 +1,8 @@
-import { useCallback, useEffect, useState } from 'react'
+import { useCallback, useEffect, useRef, useState } from 'react'
 import {
+  ACCESS_TOKEN_STORAGE_KEY,
   changePassword,
+  currentAccessToken,
   createTeamLeadCategory,
   createUser,
   createTeamLead,
@@ -11,13 +13,14 @@ import {
   fetchCalls,
   fetchDashboardSummary,
   fetchDashboardHourly,
-  fetchTeamLeadCategories,
-  fetchTeamLeads,
+  fetchTeamLeadChanges,
   fetchMe,
   fetchLdapSettings,
   fetchOvhSettings,
   fetchUsers,
   login,
+  logout,
+  onTokenRefresh,
   saveLdapSettings,
   saveOvhSettings,
   testLdapSettings,
@@ -36,6 +39,7 @@ export type User = {
   role: 'ADMIN' | 'OPERATEUR'
   must_change_password: boolean
   source: 'local' | 'ldap'
+  ldap_removed_at?: string | null
 }
 
 const pages = {
@@ -47,23 +51,121 @@ const pages = {
   changePassword: 'Changer mot de passe'
 }
 
-const wsUrl = (token: string) => {
+type EventTopic = 'calls' | 'dashboard' | 'team_leads' | 'sync'
+
+const wsUrl = (token: string, topics: EventTopic[], since?: string | null) => {
   const protocol = window.location.protocol === 'https:' ? 'wss' : 'ws'
-  return `${protocol}://${window.location.host}/ws?token=${encodeURIComponent(token)}`
+  const params = new URLSearchParams({ token, topics: topics.join(',') })
+  if (since) params.set('since', since)
+  return `${protocol}://${window.location.host}/ws?${params.toString()}`
 }
 
 const AUTO_REFRESH_INTERVAL_MS = 2000
-const TOKEN_STORAGE_KEY = 'telephonievoip_token'
+const EVENT_RELOAD_DEBOUNCE_MS = 300
+const EVENT_RECONNECT_DELAY_MS = 2000
+const AUTH_EVENT_TYPES = new Set(['auth_ok', 'auth_failed'])
+const CALL_EVENT_TYPES = new Set(['calls_changed', 'resync_required'])
+const TEAM_EVENT_TYPES = new Set([
+  'team_leads_updated',
+  'team_lead_categories_updated',
+  'resync_required'
+])
 const PAGE_STORAGE_KEY = 'telephonievoip_page'
 const SIDEBAR_STORAGE_KEY = 'telephonievoip_sidebar_collapsed'
 
 type PageKey = keyof typeof pages
 
+type RealtimeEvent = { type: string; seq?: string; payload?: any }
+
+const parseEvent = (event: MessageEvent): RealtimeEvent | null => {
+  try {
+    const data = JSON.parse(event.data)
+    return typeof data?.type === 'string' ? data : null
+  } catch {
+    return null
+  }
+}
+
+const connectEvents = (
+  token: string,
+  topics: EventTopic[],
+  onEvent: (event: RealtimeEvent) => void
+) => {
+  let ws: WebSocket | null = null
+  let lastSeq: string | null = null
+  let closed = false
+  let retryId: number | undefined
+  // Refreshed tokens re-authenticate the open socket instead of reconnecting.
+  const unsubscribe = onTokenRefresh((refreshed) => {
+    if (refreshed && ws?.readyState === WebSocket.OPEN) {
+      ws.send(JSON.stringify({ action: 'auth', token: refreshed }))
+    }
+  })
+  const open = () => {
+    ws = new WebSocket(wsUrl(currentAccessToken() ?? token, topics, lastSeq))
+    ws.onmessage = (message) => {
+      const data = parseEvent(message)
+      if (!data) return
+      if (data.type === 'ping') {
+        ws?.send(JSON.stringify({ action: 'pong' }))
+        return
+      }
+      if (AUTH_EVENT_TYPES.has(data.type)) return
+      if (data.seq) lastSeq = data.seq
+      onEvent(data)
+    }
+    ws.onclose = () => {
+      if (!closed) retryId = window.setTimeout(open, EVENT_RECONNECT_DELAY_MS)
+    }
+  }
+  open()
+  return () => {
+    closed = true
+    unsubscribe()
+    window.clearTimeout(retryId)
+    ws?.close()
+  }
+}
+
+const mergeById = <T extends { id: number }>(
+  current: T[],
+  changed: T[],
+  deletedIds: number[] = []
+) => {
+  const changedById = new Map(changed.map((item) => [item.id, item]))
+  const deleted = new Set(deletedIds)
+  const existingIds = new Set(current.map((item) => item.id))
+  const kept = current
+    .filter((item) => !deleted.has(item.id))
+    .map((item) => changedById.get(item.id) ?? item)
+  return [...changed.filter((item) => !existingIds.has(item.id)), ...kept]
+}
+
+const hasActiveFilters = (filters: Record<string, string>) =>
+  Object.values(filters).some((value) => value !== '')
+
+const debounce = (callback: () => void, delayMs: number) => {
+  let timeoutId: number | undefined
+  const scheduled = () => {
+    window.clearTimeout(timeoutId)
+    timeoutId = window.setTimeout(callback, delayMs)
+  }
+  scheduled.cancel = () => window.clearTimeout(timeoutId)
+  return scheduled
+}
+
 const parseApiDate = (value: string) => {
   const hasTimezone = /[zZ]|[+-]\d{2}:?\d{2}$/.test(value)
   return new Date(hasTimezone ? value : `${value}Z`)
 }
 
+const mergeLatestCalls = (current: any[], changed: any[], limit: number) =>
+  mergeById(current, changed)
+    .sort(
+      (a, b) => parseApiDate(b.started_at).getTime() - parseApiDate(a.started_at).getTime()
+    )
+    .slice(0, limit)
+
 const getStoredPage = (): PageKey => {
   if (typeof window === 'undefined') {
     return 'dashboard'
@@ -80,7 +182,7 @@ const App = () => {
     if (typeof window === 'undefined') {
       return null
     }
-    return window.localStorage.getItem(TOKEN_STORAGE_KEY)
+    return window.localStorage.getItem(ACCESS_TOKEN_STORAGE_KEY)
   })
   const [user, setUser] = useState<User | null>(null)
   const [page, setPage] = useState<PageKey>(() => getStoredPage())
@@ -117,12 +219,20 @@ const App = () => {
       return
     }
     if (token) {
-      window.localStorage.setItem(TOKEN_STORAGE_KEY, token)
+      window.localStorage.setItem(ACCESS_TOKEN_STORAGE_KEY, token)
     } else {
-      window.localStorage.removeItem(TOKEN_STORAGE_KEY)
+      window.localStorage.removeItem(ACCESS_TOKEN_STORAGE_KEY)
     }
   }, [token])
 
+  useEffect(
+    () =>
+      onTokenRefresh((refreshed) => {
+        if (!refreshed) setToken(null)
+      }),
+    []
+  )
+
   useEffect(() => {
     if (typeof window === 'undefined') {
       return
@@ -210,6 +320,7 @@ const App = () => {
           <span>{user?.username}</span>
           <button
             onClick={() => {
+              logout()
               setUser(null)
               setToken(null)
             }}
@@ -234,7 +345,7 @@ const App = () => {
         {page === 'users' && isAdmin && <Users token={token} />}
         {page === 'settings' && isAdmin && <OvhSettings token={token} />}
         {page === 'changePassword' && (
-          <ChangePassword token={token} onDone={() => fetchMe(token).then(setUser)} />
+          <ChangePassword token={token} onDone={setToken} />
         )}
       </main>
     </div>
@@ -297,7 +408,13 @@ const Login = ({
   )
 }
 
-const ChangePassword = ({ token, onDone }: { token: string; onDone: () => void }) => {
+const ChangePassword = ({
+  token,
+  onDone
+}: {
+  token: string
+  onDone: (accessToken: string) => void
+}) => {
   const [currentPassword, setCurrentPassword] = useState('')
   const [newPassword, setNewPassword] = useState('')
   const [message, setMessage] = useState('')
@@ -322,9 +439,9 @@ const ChangePassword = ({ token, onDone }: { token: string; onDone: () => void }
       </label>
       <button
         onClick={async () => {
-          await changePassword(token, currentPassword, newPassword)
+          const result = await changePassword(token, currentPassword, newPassword)
           setMessage('Mot de passe mis à jour')
-          onDone()
+          onDone(result.access_token)
         }}
       >
         Valider
@@ -355,6 +472,7 @@ const Dashboard = ({ token, isAdmin }: { token: string; isAdmin: boolean }) => {
     start_date: '',
     end_date: ''
   })
+  const latestCallsFiltersRef = useRef(latestCallsFilters)
 
   const reload = async () => {
     const results = await Promise.allSettled([
@@ -385,15 +503,43 @@ const Dashboard = ({ token, isAdmin }: { token: string; isAdmin: boolean }) => {
     setLoading(false)
   }
 
+  const reloadHourly = async () => {
+    try {
+      setHourly(await fetchDashboardHourly(token))
+    } catch {
+      setHourly([])
+    }
+  }
+
+  useEffect(() => {
+    latestCallsFiltersRef.current = latestCallsFilters
+  }, [latestCallsFilters])
+
   useEffect(() => {
     reload()
-    const ws = new WebSocket(wsUrl(token))
-    ws.onmessage = () => reload()
+    const scheduleReload = debounce(() => reload(), EVENT_RELOAD_DEBOUNCE_MS)
+    const scheduleHourlyReload = debounce(() => reloadHourly(), EVENT_RELOAD_DEBOUNCE_MS)
+    const disconnect = connectEvents(token, ['dashboard'], (data) => {
+      if (!CALL_EVENT_TYPES.has(data.type)) return
+      if (!data.payload?.summary || hasActiveFilters(latestCallsFiltersRef.current)) {
+        scheduleReload()
+        return
+      }
+      setSummary(data.payload.summary)
+      setLatestCalls((prev) => mergeLatestCalls(prev, data.payload.calls ?? [], 5))
+      if (data.payload.hourly) {
+        setHourly(data.payload.hourly)
+      } else {
+        scheduleHourlyReload()
+      }
+    })
     const intervalId = window.setInterval(() => {
       reload()
     }, AUTO_REFRESH_INTERVAL_MS)
     return () => {
-      ws.close()
+      disconnect()
+      scheduleReload.cancel()
+      scheduleHourlyReload.cancel()
       window.clearInterval(intervalId)
     }
   }, [])
@@ -663,6 +809,24 @@ type TeamLeadCategory = {
   position: number
 }
 
+const mapCategory = (category: any): TeamLeadCategory => ({
+  id: category.id,
+  name: category.name,
+  position: category.position
+})
+
+const mapTeamLead = (lead: any): TeamLead => ({
+  id: lead.id,
+  teamName: lead.team_name,
+  leaderFirstName: lead.leader_first_name,
+  leaderLastName: lead.leader_last_name,
+  phone: lead.phone ?? '',
+  status: lead.status as TeamLeadStatus,
+  interventionStartedAt: lead.intervention_started_at ?? null,
+  interventionCount: lead.intervention_count ?? 0,
+  categoryId: lead.category_id ?? null
+})
+
 const knownStatusClasses: Record<string, string> = {
   Disponible: 'Disponible',
   'En intervention': 'En-intervention',
@@ -716,67 +880,77 @@ const TeamLeads = ({ token }: { token: string }) => {
   const [showCategoryCreator, setShowCategoryCreator] = useState(false)
   const [now, setNow] = useState(() => Date.now())
 
-  const loadTeamLeads = useCallback(async () => {
+  // Board version of the state on screen; null until the first load.
+  const boardVersionRef = useRef<number | null>(null)
+
+  const loadChanges = useCallback(async () => {
     try {
-      const data = await fetchTeamLeads(token)
-      const mapped = data.map((lead: any) => ({
-        id: lead.id,
-        teamName: lead.team_name,
-        leaderFirstName: lead.leader_first_name,
-        leaderLastName: lead.leader_last_name,
-        phone: lead.phone ?? '',
-        status: lead.status as TeamLeadStatus,
-        interventionStartedAt: lead.intervention_started_at ?? null,
-        interventionCount: lead.intervention_count ?? 0,
-        categoryId: lead.category_id ?? null
-      }))
-      setTeamLeads(mapped)
+      const changes = await fetchTeamLeadChanges(token, boardVersionRef.current ?? 0)
+      // An event may have moved the board further meanwhile.
+      if (boardVersionRef.current !== null && changes.version < boardVersionRef.current) return
+      boardVersionRef.current = changes.version
+      const leads = changes.team_leads.map(mapTeamLead)
+      const changedCategories = changes.categories.map(mapCategory)
+      if (changes.full) {
+        setTeamLeads(leads)
+        setCategories(changedCategories)
+      } else {
+        setTeamLeads((prev) => mergeById(prev, leads, changes.deleted_ids))
+        setCategories((prev) => mergeById(prev, changedCategories, changes.deleted_category_ids))
+      }
       setLoadError('')
+      setCategoryError('')
     } catch (error) {
       setLoadError("Impossible de charger les moyens d'équipe.")
     }
   }, [token])
 
-  const loadCategories = useCallback(async () => {
-    try {
-      const data = await fetchTeamLeadCategories(token)
-      const mapped = data.map((category: any) => ({
-        id: category.id,
-        name: category.name,
-        position: category.position
-      }))
-      setCategories(mapped)
-      setCategoryEdits((prev) =>
-        mapped.reduce((acc: Record<number, string>, category: TeamLeadCategory) => {
-          const current = prev[category.id]
-          acc[category.id] =
-            current !== undefined && current.trim() !== category.name ? current : category.name
-          return acc
-        }, {})
-      )
-      setCategoryError('')
-    } catch (error) {
-      setCategoryError('Impossible de charger les catégories.')
-    }
-  }, [token])
+  useEffect(() => {
+    setCategoryEdits((prev) =>
+      categories.reduce((acc: Record<number, string>, category: TeamLeadCategory) => {
+        const current = prev[category.id]
+        acc[category.id] =
+          current !== undefined && current.trim() !== category.name ? current : category.name
+        return acc
+      }, {})
+    )
+  }, [categories])
 
   useEffect(() => {
-    loadTeamLeads()
-    loadCategories()
-    const ws = new WebSocket(wsUrl(token))
-    ws.onmessage = () => {
-      loadTeamLeads()
-      loadCategories()
-    }
-    const intervalId = window.setInterval(() => {
-      loadTeamLeads()
-      loadCategories()
-    }, AUTO_REFRESH_INTERVAL_MS)
+    loadChanges()
+    const scheduleReload = debounce(loadChanges, EVENT_RELOAD_DEBOUNCE_MS)
+    const disconnect = connectEvents(token, ['team_leads'], (data) => {
+      if (!TEAM_EVENT_TYPES.has(data.type)) return
+      const version = data.payload?.version
+      const current = boardVersionRef.current
+      if (typeof version !== 'number' || current === null) {
+        scheduleReload()
+        return
+      }
+      if (version <= current) return
+      // Only the next version applies as is; after a gap, fetch what was missed.
+      if (version !== current + 1) {
+        scheduleReload()
+        return
+      }
+      boardVersionRef.current = version
+      if (data.type === 'team_leads_updated') {
+        setTeamLeads((prev) =>
+          mergeById(prev, data.payload.team_leads.map(mapTeamLead), data.payload.deleted_ids)
+        )
+      } else {
+        setCategories((prev) =>
+          mergeById(prev, data.payload.categories.map(mapCategory), data.payload.deleted_ids)
+        )
+      }
+    })
+    const intervalId = window.setInterval(loadChanges, AUTO_REFRESH_INTERVAL_MS)
     return () => {
-      ws.close()
+      disconnect()
+      scheduleReload.cancel()
       window.clearInterval(intervalId)
     }
-  }, [loadCategories, loadTeamLeads])
+  }, [loadChanges])
 
   useEffect(() => {
     const intervalId = window.setInterval(() => {
@@ -894,7 +1068,7 @@ const TeamLeads = ({ token }: { token: string }) => {
     try {
       await createTeamLeadCategory(token, { name: trimmed })
       setNewCategoryName('')
-      loadCategories()
+      loadChanges()
     } catch (error) {
       setCategoryError("Impossible d'ajouter la catégorie.")
     }
@@ -905,8 +1079,7 @@ const TeamLeads = ({ token }: { token: string }) => {
     if (!nextName || nextName === category.name) return
     try {
       await updateTeamLeadCategory(token, category.id, { name: nextName })
-      loadCategories()
-      loadTeamLeads()
+      loadChanges()
     } catch (error) {
       setCategoryError("Impossible de mettre à jour la catégorie.")
     }
@@ -916,7 +1089,7 @@ const TeamLeads = ({ token }: { token: string }) => {
     if (!window.confirm(`Supprimer la catégorie "${category.name}" ?`)) return
     try {
       await deleteTeamLeadCategory(token, category.id)
-      loadCategories()
+      loadChanges()
     } catch (error) {
       setCategoryError("Impossible de supprimer la catégorie.")
     }
@@ -1584,13 +1757,21 @@ const Calls = ({ token, isAdmin }: { token: string; isAdmin: boolean }) => {
   }, [load])
 
   useEffect(() => {
-    const ws = new WebSocket(wsUrl(token))
-    ws.onmessage = () => load()
+    const scheduleReload = debounce(() => load(), EVENT_RELOAD_DEBOUNCE_MS)
+    const disconnect = connectEvents(token, ['calls'], (data) => {
+      if (!CALL_EVENT_TYPES.has(data.type)) return
+      if (page === 1 && !hasActiveFilters(filters) && data.payload?.calls) {
+        setCalls((prev) => mergeLatestCalls(prev, data.payload.calls, 20))
+        return
+      }
+      scheduleReload()
+    })
     const intervalId = window.setInterval(() => {
       load()
     }, AUTO_REFRESH_INTERVAL_MS)
     return () => {
-      ws.close()
+      disconnect()
+      scheduleReload.cancel()
       window.clearInterval(intervalId)
     }
   }, [load])
@@ -1797,7 +1978,10 @@ const Users = ({ token }: { token: string }) => {
           {users.map((user) => (
             <tr key={user.id}>
               <td>{user.username}</td>
-              <td>{user.source}</td>
+              <td>
+                {user.source}
+                {user.ldap_removed_at && ' (hors groupe LDAP)'}
+              </td>
               <td>{user.role}</td>
               <td>
                 <input
@@ -1906,29 +2090,22 @@ const OvhSettings = ({ token }: { token: string }) => {
   }, [])
 
   useEffect(() => {
-    const ws = new WebSocket(wsUrl(token))
-    ws.onmessage = (event) => {
-      try {
-        const data = JSON.parse(event.data)
-        if (data.type === 'sync_complete') {
-          setSyncStatus('idle')
-          setMessage(
-            data.payload?.new_count
-              ? `Synchronisation terminée (${data.payload.new_count} nouvel(s) appel(s))`
-              : 'Synchronisation terminée'
-          )
-          load()
-        }
-        if (data.type === 'sync_error') {
-          setSyncStatus('error')
-          setErrorMessage(data.payload?.message || 'Erreur de synchronisation')
-          load()
-        }
-      } catch {
+    return connectEvents(token, ['sync'], (data) => {
+      if (data.type === 'sync_complete') {
+        setSyncStatus('idle')
+        setMessage(
+          data.payload?.new_count
+            ? `Synchronisation terminée (${data.payload.new_count} nouvel(s) appel(s))`
+            : 'Synchronisation terminée'
+        )
         load()
       }
-    }
-    return () => ws.close()
+      if (data.type === 'sync_error') {
+        setSyncStatus('error')
+        setErrorMessage(data.payload?.message || 'Erreur de synchronisation')
+        load()
+      }
+    })
   }, [])
 
   if (loading) return <div>Chargement...</div>
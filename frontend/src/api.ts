@@ -19,6 +19,112 @@ const resolveErrorMessage = async (response: Response, fallback: string) => {
   return text || fallback
 }
 
+export const ACCESS_TOKEN_STORAGE_KEY = 'telephonievoip_token'
+const REFRESH_TOKEN_STORAGE_KEY = 'telephonievoip_refresh_token'
+// Refresh once this share of the access token lifetime has elapsed.
+const TOKEN_REFRESH_RATIO = 0.8
+const TOKEN_REFRESH_MIN_DELAY_MS = 5000
+
+type TokenListener = (token: string | null) => void
+
+const tokenListeners = new Set<TokenListener>()
+let refreshing: Promise<string | null> | null = null
+let refreshTimer: number | undefined
+
+// Tokens live in localStorage so that every tab rotates the same refresh token.
+export const currentAccessToken = () => window.localStorage.getItem(ACCESS_TOKEN_STORAGE_KEY)
+
+const tokenExpiry = (token: string) => {
+  try {
+    const payload = JSON.parse(atob(token.split('.')[1].replace(/-/g, '+').replace(/_/g, '/')))
+    return typeof payload.exp === 'number' ? payload.exp * 1000 : null
+  } catch {
+    return null
+  }
+}
+
+const scheduleRefresh = () => {
+  window.clearTimeout(refreshTimer)
+  const token = currentAccessToken()
+  const expiry = token ? tokenExpiry(token) : null
+  if (!expiry || !window.localStorage.getItem(REFRESH_TOKEN_STORAGE_KEY)) return
+  const delay = Math.max((expiry - Date.now()) * TOKEN_REFRESH_RATIO, TOKEN_REFRESH_MIN_DELAY_MS)
+  refreshTimer = window.setTimeout(() => {
+    const latest = currentAccessToken()
+    if (latest !== token) {
+      scheduleRefresh()
+      return
+    }
+    refreshSession()
+  }, delay)
+}
+
+const storeSession = (result: { access_token: string; refresh_token?: string | null }) => {
+  window.localStorage.setItem(ACCESS_TOKEN_STORAGE_KEY, result.access_token)
+  if (result.refresh_token) {
+    window.localStorage.setItem(REFRESH_TOKEN_STORAGE_KEY, result.refresh_token)
+  }
+  scheduleRefresh()
+}
+
+export const clearSession = () => {
+  window.clearTimeout(refreshTimer)
+  window.localStorage.removeItem(ACCESS_TOKEN_STORAGE_KEY)
+  window.localStorage.removeItem(REFRESH_TOKEN_STORAGE_KEY)
+}
+
+export const onTokenRefresh = (listener: TokenListener) => {
+  tokenListeners.add(listener)
+  return () => {
+    tokenListeners.delete(listener)
+  }
+}
+
+export const refreshSession = () => {
+  if (!refreshing) {
+    refreshing = (async () => {
+      const refreshToken = window.localStorage.getItem(REFRESH_TOKEN_STORAGE_KEY)
+      if (!refreshToken) return null
+      const response = await fetch(`${API_BASE}/auth/refresh`, {
+        method: 'POST',
+        headers: headers(),
+        body: JSON.stringify({ refresh_token: refreshToken })
+      }).catch(() => null)
+      if (!response) {
+        scheduleRefresh()
+        return null
+      }
+      if (!response.ok) {
+        if (response.status === 401) {
+          clearSession()
+          tokenListeners.forEach((listener) => listener(null))
+        }
+        return null
+      }
+      const result = await response.json()
+      storeSession(result)
+      tokenListeners.forEach((listener) => listener(result.access_token))
+      return result.access_token as string
+    })().finally(() => {
+      refreshing = null
+    })
+  }
+  return refreshing
+}
+
+// Sends the current access token and retries once after a refresh on 401.
+const apiFetch = async (url: string, init: RequestInit = {}) => {
+  const authorized = Boolean((init.headers as Record<string, string> | undefined)?.Authorization)
+  const withToken = (token: string | null) =>
+    token && authorized
+      ? { ...init, headers: { ...init.headers, Authorization: `Bearer ${token}` } }
+      : init
+  const response = await fetch(url, withToken(currentAccessToken()))
+  if (response.status !== 401 || !authorized) return response
+  const token = await refreshSession()
+  return token ? fetch(url, withToken(token)) : response
+}
+
 export const login = async (username: string, password: string) => {
   const response = await fetch(`${API_BASE}/auth/login`, {
     method: 'POST',
@@ -26,11 +132,26 @@ export const login = async (username: string, password: string) => {
     body: JSON.stringify({ username, password })
   })
   if (!response.ok) throw new Error('Login failed')
-  return response.json()
+  const result = await response.json()
+  storeSession(result)
+  return result
+}
+
+export const logout = async () => {
+  const refreshToken = window.localStorage.getItem(REFRESH_TOKEN_STORAGE_KEY)
+  clearSession()
+  if (!refreshToken) return
+  await fetch(`${API_BASE}/auth/logout`, {
+    method: 'POST',
+    headers: headers(),
+    body: JSON.stringify({ refresh_token: refreshToken })
+  }).catch(() => null)
 }
 
+if (typeof window !== 'undefined') scheduleRefresh()
+
 export const fetchMe = async (token: string) => {
-  const response = await fetch(`${API_BASE}/me`, { headers: headers(token) })
+  const response = await apiFetch(`${API_BASE}/me`, { headers: headers(token) })
   if (!response.ok) throw new Error('Unauthorized')
   return response.json()
 }
@@ -40,13 +161,16 @@ export const changePassword = async (
   current_password: string,
   new_password: string
 ) => {
-  const response = await fetch(`${API_BASE}/auth/change-password`, {
+  const response = await apiFetch(`${API_BASE}/auth/change-password`, {
     method: 'POST',
     headers: headers(token),
     body: JSON.stringify({ current_password, new_password })
   })
   if (!response.ok) throw new Error('Change failed')
-  return response.json()
+  // The other sessions are signed out; this one gets new tokens.
+  const result = await response.json()
+  storeSession(result)
+  return result
 }
 
 export const fetchCalls = async (token: string, filters: Record<string, any>) => {
@@ -56,7 +180,7 @@ export const fetchCalls = async (token: string, filters: Record<string, any>) =>
       params.set(key, String(value))
     }
   })
-  const response = await fetch(`${API_BASE}/calls?${params.toString()}`, {
+  const response = await apiFetch(`${API_BASE}/calls?${params.toString()}`, {
     headers: headers(token)
   })
   if (!response.ok) throw new Error('Calls failed')
@@ -71,7 +195,7 @@ export const exportCallsCsv = async (token: string, filters: Record<string, any>
     }
   })
   params.set('export', 'csv')
-  const response = await fetch(`${API_BASE}/calls?${params.toString()}`, {
+  const response = await apiFetch(`${API_BASE}/calls?${params.toString()}`, {
     headers: { Authorization: `Bearer ${token}` }
   })
   if (!response.ok) throw new Error('Export failed')
@@ -85,7 +209,7 @@ export const exportCallsCsv = async (token: string, filters: Record<string, any>
 }
 
 export const fetchDashboardSummary = async (token: string) => {
-  const response = await fetch(`${API_BASE}/dashboard/summary`, {
+  const response = await apiFetch(`${API_BASE}/dashboard/summary`, {
     headers: headers(token)
   })
   if (!response.ok) throw new Error('Summary failed')
@@ -93,7 +217,7 @@ export const fetchDashboardSummary = async (token: string) => {
 }
 
 export const fetchDashboardTimeseries = async (token: string) => {
-  const response = await fetch(`${API_BASE}/dashboard/timeseries`, {
+  const response = await apiFetch(`${API_BASE}/dashboard/timeseries`, {
     headers: headers(token)
   })
   if (!response.ok) throw new Error('Timeseries failed')
@@ -101,7 +225,7 @@ export const fetchDashboardTimeseries = async (token: string) => {
 }
 
 export const fetchDashboardHourly = async (token: string) => {
-  const response = await fetch(`${API_BASE}/dashboard/hourly`, {
+  const response = await apiFetch(`${API_BASE}/dashboard/hourly`, {
     headers: headers(token)
   })
   if (!response.ok) throw new Error('Hourly failed')
@@ -109,13 +233,13 @@ export const fetchDashboardHourly = async (token: string) => {
 }
 
 export const fetchUsers = async (token: string) => {
-  const response = await fetch(`${API_BASE}/users`, { headers: headers(token) })
+  const response = await apiFetch(`${API_BASE}/users`, { headers: headers(token) })
   if (!response.ok) throw new Error('Users failed')
   return response.json()
 }
 
 export const createUser = async (token: string, payload: any) => {
-  const response = await fetch(`${API_BASE}/users`, {
+  const response = await apiFetch(`${API_BASE}/users`, {
     method: 'POST',
     headers: headers(token),
     body: JSON.stringify(payload)
@@ -125,7 +249,7 @@ export const createUser = async (token: string, payload: any) => {
 }
 
 export const updateUser = async (token: string, userId: number, payload: any) => {
-  const response = await fetch(`${API_BASE}/users/${userId}`, {
+  const response = await apiFetch(`${API_BASE}/users/${userId}`, {
     method: 'PATCH',
     headers: headers(token),
     body: JSON.stringify(payload)
@@ -135,7 +259,7 @@ export const updateUser = async (token: string, userId: number, payload: any) =>
 }
 
 export const deleteUser = async (token: string, userId: number) => {
-  const response = await fetch(`${API_BASE}/users/${userId}`, {
+  const response = await apiFetch(`${API_BASE}/users/${userId}`, {
     method: 'DELETE',
     headers: headers(token)
   })
@@ -144,7 +268,7 @@ export const deleteUser = async (token: string, userId: number) => {
 }
 
 export const fetchOvhSettings = async (token: string) => {
-  const response = await fetch(`${API_BASE}/settings/ovh`, { headers: headers(token) })
+  const response = await apiFetch(`${API_BASE}/settings/ovh`, { headers: headers(token) })
   if (!response.ok) {
     const message = await resolveErrorMessage(
       response,
@@ -158,7 +282,7 @@ export const fetchOvhSettings = async (token: string) => {
 }
 
 export const saveOvhSettings = async (token: string, payload: any) => {
-  const response = await fetch(`${API_BASE}/settings/ovh`, {
+  const response = await apiFetch(`${API_BASE}/settings/ovh`, {
     method: 'PUT',
     headers: headers(token),
     body: JSON.stringify(payload)
@@ -174,13 +298,13 @@ export const saveOvhSettings = async (token: string, payload: any) => {
 }
 
 export const fetchLdapSettings = async (token: string) => {
-  const response = await fetch(`${API_BASE}/settings/ldap`, { headers: headers(token) })
+  const response = await apiFetch(`${API_BASE}/settings/ldap`, { headers: headers(token) })
   if (!response.ok) throw new Error('LDAP settings failed')
   return response.json()
 }
 
 export const saveLdapSettings = async (token: string, payload: any) => {
-  const response = await fetch(`${API_BASE}/settings/ldap`, {
+  const response = await apiFetch(`${API_BASE}/settings/ldap`, {
     method: 'PUT',
     headers: headers(token),
     body: JSON.stringify(payload)
@@ -190,7 +314,7 @@ export const saveLdapSettings = async (token: string, payload: any) => {
 }
 
 export const testOvhSettings = async (token: string) => {
-  const response = await fetch(`${API_BASE}/settings/ovh/test`, {
+  const response = await apiFetch(`${API_BASE}/settings/ovh/test`, {
     method: 'POST',
     headers: headers(token)
   })
@@ -210,7 +334,7 @@ export const testLdapSettings = async (
   token: string,
   payload: { username?: string; password?: string }
 ) => {
-  const response = await fetch(`${API_BASE}/settings/ldap/test`, {
+  const response = await apiFetch(`${API_BASE}/settings/ldap/test`, {
     method: 'POST',
     headers: headers(token),
     body: JSON.stringify(payload)
@@ -220,7 +344,7 @@ export const testLdapSettings = async (
 }
 
 export const triggerSync = async (token: string) => {
-  const response = await fetch(`${API_BASE}/sync`, {
+  const response = await apiFetch(`${API_BASE}/sync`, {
     method: 'POST',
     headers: headers(token)
   })
@@ -229,19 +353,28 @@ export const triggerSync = async (token: string) => {
 }
 
 export const fetchTeamLeads = async (token: string) => {
-  const response = await fetch(`${API_BASE}/team-leads`, { headers: headers(token) })
+  const response = await apiFetch(`${API_BASE}/team-leads`, { headers: headers(token) })
+  if (!response.ok) throw new Error('Team leads failed')
+  return response.json()
+}
+
+// Team leads and categories changed after `since`; `full` means the lists replace the board.
+export const fetchTeamLeadChanges = async (token: string, since: number) => {
+  const response = await apiFetch(`${API_BASE}/team-leads?since=${since}`, {
+    headers: headers(token)
+  })
   if (!response.ok) throw new Error('Team leads failed')
   return response.json()
 }
 
 export const fetchTeamLeadCategories = async (token: string) => {
-  const response = await fetch(`${API_BASE}/team-lead-categories`, { headers: headers(token) })
+  const response = await apiFetch(`${API_BASE}/team-lead-categories`, { headers: headers(token) })
   if (!response.ok) throw new Error('Team lead categories failed')
   return response.json()
 }
 
 export const createTeamLeadCategory = async (token: string, payload: any) => {
-  const response = await fetch(`${API_BASE}/team-lead-categories`, {
+  const response = await apiFetch(`${API_BASE}/team-lead-categories`, {
     method: 'POST',
     headers: headers(token),
     body: JSON.stringify(payload)
@@ -255,7 +388,7 @@ export const updateTeamLeadCategory = async (
   categoryId: number,
   payload: any
 ) => {
-  const response = await fetch(`${API_BASE}/team-lead-categories/${categoryId}`, {
+  const response = await apiFetch(`${API_BASE}/team-lead-categories/${categoryId}`, {
     method: 'PATCH',
     headers: headers(token),
     body: JSON.stringify(payload)
@@ -265,7 +398,7 @@ export const updateTeamLeadCategory = async (
 }
 
 export const deleteTeamLeadCategory = async (token: string, categoryId: number) => {
-  const response = await fetch(`${API_BASE}/team-lead-categories/${categoryId}`, {
+  const response = await apiFetch(`${API_BASE}/team-lead-categories/${categoryId}`, {
     method: 'DELETE',
     headers: headers(token)
   })
@@ -274,7 +407,7 @@ export const deleteTeamLeadCategory = async (token: string, categoryId: number)
 }
 
 export const createTeamLead = async (token: string, payload: any) => {
-  const response = await fetch(`${API_BASE}/team-leads`, {
+  const response = await apiFetch(`${API_BASE}/team-leads`, {
     method: 'POST',
     headers: headers(token),
     body: JSON.stringify(payload)
@@ -284,7 +417,7 @@ export const createTeamLead = async (token: string, payload: any) => {
 }
 
 export const updateTeamLead = async (token: string, leadId: number, payload: any) => {
-  const response = await fetch(`${API_BASE}/team-leads/${leadId}`, {
+  const response = await apiFetch(`${API_BASE}/team-leads/${leadId}`, {
     method: 'PATCH',
     headers: headers(token),
     body: JSON.stringify(payload)
@@ -298,7 +431,7 @@ export const updateTeamLeadInterventionCount = async (
   leadId: number,
   delta: number
 ) => {
-  const response = await fetch(`${API_BASE}/team-leads/${leadId}/intervention-count`, {
+  const response = await apiFetch(`${API_BASE}/team-leads/${leadId}/intervention-count`, {
     method: 'POST',
     headers: headers(token),
     body: JSON.stringify({ delta })
@@ -308,7 +441,7 @@ export const updateTeamLeadInterventionCount = async (
 }
 
 export const deleteTeamLead = async (token: string, leadId: number) => {
-  const response = await fetch(`${API_BASE}/team-leads/${leadId}`, {
+  const response = await apiFetch(`${API_BASE}/team-leads/${leadId}`, {
     method: 'DELETE',
     headers: headers(token)
   })